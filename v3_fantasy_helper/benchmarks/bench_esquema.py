@@ -0,0 +1,92 @@
+"""
+Benchmark del esquema compacto del dataset de jugadores (src.esquema). Compara el
+DataFrame clásico del scraper con el compacto (Nombre como cadena pyarrow, Equipo
+y Posicion categóricas, probabilidad uint8 y URLs partidas en prefijo categórico +
+ruta): memoria en RAM (memory_usage deep) y bytes en Parquet, para un snapshot de
+las páginas sintéticas y para un histórico sintético de una temporada (un snapshot
+por jornada). Comprueba que la conversión es reversible y que el emparejamiento
+da el mismo resultado con ambos formatos (también a través de una VistaDatos, cuyo
+resultado se memoiza por la versión de la vista).
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.bench_esquema
+"""
+# LIBRERIAS EXTERNAS
+import io, random, time
+import numpy as np
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from src.scraper import EQUIPOS_URLS, parsear_equipo, construir_dataframe
+from src.esquema import compactar_dataframe, expandir_dataframe
+from src.core import emparejar_con_datos
+from src.vista_datos import VistaDatos
+from benchmarks.servidor_local import cargar_paginas
+from benchmarks.fixtures.generar_fixtures import slug_equipo
+from benchmarks.bench_pipeline import plantilla_sintetica
+
+JORNADAS = 38
+REPETICIONES = 50
+
+
+# Histórico sintético: un snapshot por jornada con las probabilidades alteradas y la fecha de cada jornada
+def historico_sintetico(datos, jornadas=JORNADAS, semilla=0):
+    rnd = np.random.default_rng(semilla)
+    partes = []
+    for j in range(jornadas):
+        parte = datos.copy()
+        parte["Probabilidad_num"] = np.clip(parte["Probabilidad_num"] + rnd.integers(-20, 21, len(parte)), 0, 100).astype(float)
+        parte["Probabilidad"] = parte["Probabilidad_num"].astype(int).astype(str) + "%"
+        partes.append(parte)
+    return pd.concat(partes, ignore_index=True)
+
+
+def bytes_parquet(df):
+    salida = io.BytesIO()
+    df.to_parquet(salida, index=False)
+    return salida.tell()
+
+
+def mejor_tiempo_ms(funcion, repeticiones=REPETICIONES):
+    funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - t0) * 1e3)
+    return min(tiempos)
+
+
+def main():
+    guardadas = cargar_paginas()
+    filas = [fila for equipo, url in EQUIPOS_URLS.items() for fila in parsear_equipo(guardadas[slug_equipo(url)].decode("utf-8"), equipo)]
+    datos = construir_dataframe(filas)
+    compacto = construir_dataframe(filas, compacto=True)
+    pd.testing.assert_frame_equal(expandir_dataframe(compacto), datos)
+
+    print(f"{'dataset':<26} | {'filas':>6} | {'KB RAM clásico':>14} | {'KB RAM compacto':>15} | {'KB Parquet clásico':>18} | {'KB Parquet compacto':>19}")
+    for nombre, df in (("snapshot (sintético)", datos), (f"temporada ({JORNADAS} jornadas)", historico_sintetico(datos))):
+        comp = compactar_dataframe(df)
+        ram = df.memory_usage(deep=True).sum(), comp.memory_usage(deep=True).sum()
+        disco = bytes_parquet(df), bytes_parquet(comp)
+        print(f"{nombre:<26} | {len(df):6d} | {ram[0] / 1024:14.1f} | {ram[1] / 1024:15.1f} | {disco[0] / 1024:18.1f} | {disco[1] / 1024:19.1f}"
+              f"   (RAM x{ram[0] / ram[1]:.1f})")
+        assert ram[1] < ram[0]
+
+    # El emparejamiento da el mismo resultado con el DataFrame clásico, el compacto y una vista del compacto
+    vista = VistaDatos(compacto)
+    for n in (15, 30, 60):
+        plantilla = plantilla_sintetica(datos, n, semilla=n)
+        esperado = emparejar_con_datos(plantilla, datos)
+        for entrada in (compacto, vista):
+            obtenido = emparejar_con_datos(plantilla, entrada)
+            pd.testing.assert_frame_equal(obtenido[0], esperado[0])
+            assert obtenido[1] == esperado[1]
+        # El resultado memoizado se entrega como copia: modificarlo no altera el siguiente rerun
+        obtenido[0].loc[0, "Equipo"] = "Modificado"
+        pd.testing.assert_frame_equal(emparejar_con_datos(plantilla, vista)[0], esperado[0])
+        tiempos = [mejor_tiempo_ms(lambda e=e: emparejar_con_datos(plantilla, e)) for e in (datos, compacto, vista)]
+        print(f"emparejar {n:2d} jugadores: clásico {tiempos[0]:.2f} ms | compacto {tiempos[1]:.2f} ms | vista (memoizado) {tiempos[2]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
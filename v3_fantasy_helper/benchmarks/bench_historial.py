@@ -0,0 +1,130 @@
+"""
+Benchmark del histórico de probabilidades (src.historial) frente a guardar un
+snapshot completo por actualización y releerlos para cada consulta. Simula una
+temporada de actualizaciones en las que solo cambia una pequeña parte de los
+jugadores y mide: bytes en disco, tiempo de registro, "cambios desde la última
+visita" y la serie (sparkline) de una plantilla. Comprueba que las respuestas
+del histórico coinciden con las calculadas a partir de los snapshots y que el
+histórico recargado desde disco es idéntico al de memoria.
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.bench_historial [--actualizaciones 300]
+"""
+# LIBRERIAS EXTERNAS
+import argparse, os, glob, tempfile, time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from src.scraper import EQUIPOS_URLS, parsear_equipo, construir_dataframe
+from src.esquema import compactar_dataframe
+from src.snapshots import guardar_snapshot, cargar_snapshot, listar_snapshots
+from src.historial import HistorialProbabilidades
+from benchmarks.servidor_local import cargar_paginas
+from benchmarks.fixtures.generar_fixtures import slug_equipo
+
+ACTUALIZACIONES = 300
+# Proporción de jugadores cuya probabilidad cambia en cada actualización
+PROPORCION_CAMBIOS = 0.03
+INTERVALO = 15*60
+TAMANO_PLANTILLA = 15
+
+
+def bytes_directorio(directorio):
+    return sum(os.path.getsize(r) for r in glob.glob(os.path.join(directorio, "*.parquet")))
+
+
+# Secuencia de DataFrames (uno por actualización) en la que cada vez cambia una pequeña parte de los jugadores
+def actualizaciones_sinteticas(datos, n, semilla=0):
+    rnd = np.random.default_rng(semilla)
+    actual = datos.copy()
+    for _ in range(n):
+        cambian = rnd.random(len(actual)) < PROPORCION_CAMBIOS
+        nuevas = np.clip(actual["Probabilidad_num"].to_numpy() + rnd.integers(-40, 41, len(actual)), 0, 100)
+        actual = actual.assign(Probabilidad_num=np.where(cambian, nuevas, actual["Probabilidad_num"]).astype(float))
+        yield actual
+
+
+# Cambios desde `momento` calculados como antes: leyendo el snapshot vigente en ese momento y el último
+def cambios_desde_snapshots(directorio, momento):
+    antes, _ = cargar_snapshot(datetime.fromtimestamp(momento, timezone.utc), directorio)
+    ahora, _ = cargar_snapshot(None, directorio)
+    unidos = antes[["Nombre", "Equipo", "Prob"]].merge(ahora[["Nombre", "Equipo", "Prob"]], on=["Nombre", "Equipo"], suffixes=("_antes", "_ahora"))
+    unidos = unidos[unidos["Prob_antes"] != unidos["Prob_ahora"]]
+    return {(n, e): (int(a), int(b)) for n, e, a, b in unidos[["Nombre", "Equipo", "Prob_antes", "Prob_ahora"]].itertuples(index=False)}
+
+
+# Serie de cada jugador releyendo todos los snapshots (quitando los valores repetidos consecutivos)
+def series_desde_snapshots(directorio, claves):
+    series = {clave: [] for clave in claves}
+    for _, ruta in listar_snapshots(directorio):
+        df = pd.read_parquet(ruta, columns=["Nombre", "Equipo", "Prob"])
+        valores = dict(zip(zip(df["Nombre"], df["Equipo"].astype(object)), df["Prob"].tolist()))
+        for clave in claves:
+            if clave in valores and (not series[clave] or series[clave][-1] != valores[clave]): series[clave].append(valores[clave])
+    return series
+
+
+def mejor_tiempo_ms(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - t0) * 1e3)
+    return min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--actualizaciones", type=int, default=ACTUALIZACIONES)
+    args = parser.parse_args()
+
+    guardadas = cargar_paginas()
+    filas = [fila for equipo, url in EQUIPOS_URLS.items() for fila in parsear_equipo(guardadas[slug_equipo(url)].decode("utf-8"), equipo)]
+    datos = construir_dataframe(filas)
+    inicio = int(time.time()) - args.actualizaciones * INTERVALO
+
+    with tempfile.TemporaryDirectory() as dir_snapshots, tempfile.TemporaryDirectory() as dir_historial:
+        historial = HistorialProbabilidades(dir_historial)
+        t_snapshots = t_historial = 0.0
+        for i, df in enumerate(actualizaciones_sinteticas(datos, args.actualizaciones)):
+            momento = inicio + i * INTERVALO
+            t0 = time.perf_counter()
+            guardar_snapshot(compactar_dataframe(df), datetime.fromtimestamp(momento, timezone.utc), dir_snapshots,
+                             retencion_dias=None, max_snapshots=None)
+            t1 = time.perf_counter()
+            historial.registrar(df, momento)
+            t_snapshots, t_historial = t_snapshots + t1 - t0, t_historial + time.perf_counter() - t1
+
+        print(f"{args.actualizaciones} actualizaciones de {len(datos)} jugadores ({PROPORCION_CAMBIOS:.0%} cambian en cada una), "
+              f"{len(historial)} cambios registrados")
+        print(f"{'':<22} | {'KB en disco':>11} | {'ms/actualización':>16} | {'ficheros':>8}")
+        print(f"{'snapshots completos':<22} | {bytes_directorio(dir_snapshots) / 1024:11.1f} | "
+              f"{t_snapshots * 1e3 / args.actualizaciones:16.2f} | {len(listar_snapshots(dir_snapshots)):8d}")
+        print(f"{'histórico de cambios':<22} | {bytes_directorio(dir_historial) / 1024:11.1f} | "
+              f"{t_historial * 1e3 / args.actualizaciones:16.2f} | {len(glob.glob(os.path.join(dir_historial, '*.parquet'))):8d}")
+
+        # Cambios desde la última visita (hace 1 día y hace 1 semana de actualizaciones)
+        for etiqueta, atras in (("1 día", 96), ("1 semana", 672)):
+            visita = inicio + max(args.actualizaciones - atras, 0) * INTERVALO + 1
+            esperado = cambios_desde_snapshots(dir_snapshots, visita)
+            cambios = historial.cambios_desde(visita)
+            assert {(n, e): (a, b) for n, e, a, b in cambios[["Nombre", "Equipo", "Antes", "Ahora"]].itertuples(index=False)} == esperado
+            print(f"cambios desde hace {etiqueta:<8}: {len(cambios):4d} jugadores | snapshots "
+                  f"{mejor_tiempo_ms(lambda: cambios_desde_snapshots(dir_snapshots, visita)):7.2f} ms | histórico "
+                  f"{mejor_tiempo_ms(lambda: historial.cambios_desde(visita)):6.2f} ms")
+
+        # Sparklines de una plantilla con toda la temporada
+        claves = list(zip(datos["Nombre"], datos["Equipo"]))[:TAMANO_PLANTILLA]
+        assert historial.sparklines(claves) == series_desde_snapshots(dir_snapshots, claves)
+        print(f"sparklines de {TAMANO_PLANTILLA} jugadores: snapshots "
+              f"{mejor_tiempo_ms(lambda: series_desde_snapshots(dir_snapshots, claves), 1):7.1f} ms | histórico "
+              f"{mejor_tiempo_ms(lambda: historial.sparklines(claves)):6.3f} ms")
+
+        recargado = HistorialProbabilidades(dir_historial)
+        assert recargado._puntos == historial._puntos and recargado._momentos == historial._momentos
+        print(f"recarga desde disco: {mejor_tiempo_ms(lambda: HistorialProbabilidades(dir_historial), 1):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark de la lectura de plantillas subidas (src.ingestion): lectura completa
+con pd.read_csv de todas las columnas (implementación anterior) frente a la
+lectura por bloques con solo las columnas necesarias y deduplicado temprano.
+Genera exportaciones CSV sintéticas de varios tamaños, comprueba que ambos
+resultados coinciden y mide el tiempo y el pico de memoria (tracemalloc).
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.bench_ingestion
+"""
+# LIBRERIAS EXTERNAS
+import io, random, time, tracemalloc
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from src.ingestion import leer_plantilla, columnas_a_leer
+
+FILAS = (10_000, 100_000, 500_000)
+JUGADORES_DISTINTOS = 3_000
+
+
+# Exportación multi-liga sintética: muchas filas repetidas y columnas que la app no usa
+def exportacion_sintetica(filas, semilla=0):
+    rnd = random.Random(semilla)
+    df = pd.DataFrame({
+        "Liga": [f"Liga {rnd.randrange(2_000)}" for _ in range(filas)],
+        "Usuario": [f"usuario_{rnd.randrange(50_000)}" for _ in range(filas)],
+        "mi_nombre": [f"Jugador {rnd.randrange(JUGADORES_DISTINTOS)}" for _ in range(filas)],
+        "POSICION": [rnd.choice(["POR", "DEF", "CEN", "DEL"]) for _ in range(filas)],
+        "Precio": [round(rnd.uniform(0.5, 20.0), 1) for _ in range(filas)],
+        "Comentario": ["Fichado en la última jornada del mercado de invierno"] * filas,
+    })
+    return df.to_csv(index=False).encode("utf-8")
+
+
+# Implementación anterior: lectura completa, renombrado y deduplicado al final
+def lectura_completa(file):
+    df = pd.read_csv(file)
+    df = df.rename(columns=columnas_a_leer(df.columns))
+    return df.drop_duplicates(subset=["Nombre"])
+
+
+def medir(funcion, datos):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    resultado = funcion(io.BytesIO(datos))
+    segundos = time.perf_counter() - t0
+    pico = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return segundos, pico, resultado
+
+
+def main():
+    print(f"{'Filas':>8} | {'MB CSV':>6} | {'completa (s / MB pico)':>22} | {'por bloques (s / MB pico)':>25}")
+    for filas in FILAS:
+        datos = exportacion_sintetica(filas, semilla=filas)
+        t_ant, m_ant, anterior = medir(lectura_completa, datos)
+        t_nue, m_nue, nuevo = medir(leer_plantilla, datos)
+        pd.testing.assert_frame_equal(anterior[["Nombre", "Posicion", "Precio"]].reset_index(drop=True), nuevo)
+        print(f"{filas:>8} | {len(datos) / 1e6:6.1f} | {t_ant:10.2f} / {m_ant:9.1f} | {t_nue:12.2f} / {m_nue:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark de la caché local de fotos (src.media) con un servidor HTTP local que
+sirve fotos JPEG sintéticas del tamaño de las de futbolfantasy.com. Compara el
+HTML del campo enlazando las fotos remotas (implementación anterior) con el que
+usa miniaturas locales en data URI: peticiones a terceros y bytes de imagen que
+descarga el navegador por render. Comprueba además que las fotos idénticas se
+guardan una sola vez y que la expulsión mantiene el disco por debajo del límite.
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.bench_media
+"""
+# LIBRERIAS EXTERNAS
+import io, re, random, tempfile, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pandas as pd
+from PIL import Image, ImageDraw
+
+# LIBRERIAS INTERNAS
+from src import media, output_generators
+from src.media import AlmacenMiniaturas
+
+NUM_FOTOS = 40
+LADO_FOTO = 300
+POSICIONES = ["POR"] + ["DEF"] * 4 + ["CEN"] * 4 + ["DEL"] * 2 + ["POR", "DEF", "DEF", "CEN", "CEN", "DEL", "DEL"]
+
+
+# Foto JPEG sintética con ruido (se comprime como una foto real, no como un color plano)
+def foto_sintetica(semilla):
+    rnd = random.Random(semilla)
+    imagen = Image.effect_noise((LADO_FOTO, LADO_FOTO), 40).convert("RGB")
+    dibujo = ImageDraw.Draw(imagen)
+    for _ in range(12):
+        x, y = rnd.randrange(LADO_FOTO), rnd.randrange(LADO_FOTO)
+        dibujo.ellipse((x - 60, y - 60, x + 60, y + 60), fill=tuple(rnd.randrange(256) for _ in range(3)))
+    salida = io.BytesIO()
+    imagen.save(salida, format="JPEG", quality=85)
+    return salida.getvalue()
+
+
+# Servidor de fotos en un puerto libre; cuenta las peticiones recibidas
+def arrancar_servidor(fotos):
+    contador = {"peticiones": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            contador["peticiones"] += 1
+            cuerpo = fotos.get(self.path)
+            self.send_response(200 if cuerpo else 404)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(cuerpo or b"")))
+            self.end_headers()
+            self.wfile.write(cuerpo or b"")
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, contador
+
+
+# Peticiones a terceros (img con URL http) y bytes de imagen que el navegador descarga para pintar el HTML
+def peso_imagenes(html, fotos):
+    remotas = re.findall(r'<img src="(http[^"]+)"', html)
+    inline = re.findall(r'<img src="(data:[^"]+)"', html)
+    return len(remotas), sum(len(fotos.get("/" + u.split("/", 3)[-1], b"")) for u in remotas), sum(len(u) for u in inline)
+
+
+def main():
+    fotos = {f"/images/jugadores/{i}.jpg": foto_sintetica(i) for i in range(NUM_FOTOS)}
+    fotos["/images/jugadores/duplicada.jpg"] = fotos["/images/jugadores/0.jpg"]
+    servidor, contador = arrancar_servidor(fotos)
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    urls = [base + ruta for ruta in fotos]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        media._ALMACEN = AlmacenMiniaturas(directorio=directorio)
+        df = pd.DataFrame({
+            "Mi_nombre": [f"Jugador {i}" for i in range(len(POSICIONES))], "Posicion": POSICIONES,
+            "Equipo": "Equipo", "Probabilidad": "70%", "Probabilidad_num": 70.0, "Perfil_URL": "#",
+            "Imagen_URL": urls[:len(POSICIONES)],
+        })
+        xi, banca = df.iloc[:11], df.iloc[11:]
+
+        html_remoto = output_generators.generar_html_alineacion_completa(xi, banca)
+        t0 = time.perf_counter()
+        media.precargar(urls).join()
+        t_precarga = time.perf_counter() - t0
+        html_local = output_generators.generar_html_alineacion_completa(xi, banca)
+
+        peticiones = contador["peticiones"]
+        media.precargar(urls)
+        assert contador["peticiones"] == peticiones, "las fotos ya guardadas no deben volver a descargarse"
+        almacen = media._ALMACEN
+        huellas = {url: e["huella"] for url, e in almacen._indice.items()}
+        assert huellas[base + "/images/jugadores/duplicada.jpg"] == huellas[base + "/images/jugadores/0.jpg"]
+        assert len(set(huellas.values())) == NUM_FOTOS, "las fotos idénticas deben compartir fichero"
+        # El índice se escribe por tandas (no una vez por foto) y lo guardado en disco está completo
+        assert almacen.estadisticas["escrituras_indice"] < almacen.estadisticas["descargas"], almacen.estadisticas
+        assert set(AlmacenMiniaturas(directorio=directorio)._indice) == set(almacen._indice)
+        # Un acierto en memoria también actualiza el último uso (la expulsión del disco es LRU real), pero solo cuando
+        # cambia con la resolución de RESOLUCION_USO: los renders seguidos no vuelven a ensuciar el índice
+        almacen.guardar_indice()
+        almacen.local(urls[0])
+        assert not almacen._indice_sucio
+        almacen._indice[urls[0]]["usado"] -= media.RESOLUCION_USO
+        usado = almacen._indice[urls[0]]["usado"]
+        almacen.local(urls[0])
+        assert almacen._indice[urls[0]]["usado"] > usado and almacen._indice_sucio
+
+        print(f"Fotos: {len(fotos)} ({sum(map(len, fotos.values())) / 1024:.0f} KB), precarga en {t_precarga:.2f} s, "
+              f"{almacen.bytes_en_disco() / 1024:.0f} KB en disco ({media.FORMATO})")
+        print(f"{'HTML del campo':<18} | {'peticiones a terceros':>21} | {'KB descargados':>14} | {'KB en data URI':>14} | {'KB HTML':>8}")
+        for nombre, html in (("fotos remotas", html_remoto), ("miniaturas", html_local)):
+            remotas, kb_remotos, kb_inline = peso_imagenes(html, fotos)
+            print(f"{nombre:<18} | {remotas:21d} | {kb_remotos / 1024:14.1f} | {kb_inline / 1024:14.1f} | {len(html) / 1024:8.1f}")
+        assert peso_imagenes(html_local, fotos)[0] == 0
+
+        # Una foto que falta en un render se encarga al hilo de precarga y está en local en el siguiente
+        nueva = base + "/images/jugadores/nueva.jpg"
+        fotos["/images/jugadores/nueva.jpg"] = foto_sintetica(NUM_FOTOS)
+        assert media.src_imagen(nueva) == nueva
+        hilo = media._PRECARGA
+        if hilo is not None: hilo.join()
+        assert media.src_imagen(nueva).startswith("data:")
+
+        # Expulsión: con un límite de ~10 miniaturas el disco nunca lo supera y se conservan las más recientes
+        limite = 10 * almacen.bytes_en_disco() // NUM_FOTOS
+        pequeno = AlmacenMiniaturas(directorio=directorio + "/limitado", max_bytes=limite)
+        pequeno.obtener_varias(urls)
+        assert pequeno.bytes_en_disco() <= limite and pequeno.estadisticas["expulsadas"] > 0
+        print(f"Expulsión: límite {limite / 1024:.0f} KB, {pequeno.bytes_en_disco() / 1024:.0f} KB en disco, "
+              f"{pequeno.estadisticas['expulsadas']} miniaturas expulsadas")
+    servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
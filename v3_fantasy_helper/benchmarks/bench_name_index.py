@@ -0,0 +1,74 @@
+"""
+Benchmark de la búsqueda de nombres: difflib.get_close_matches sobre la lista
+completa (implementación anterior) frente a NameIndex. Usa los nombres de las
+páginas sintéticas y consultas con erratas, acentos y mayúsculas cambiadas, y
+comprueba que ambos devuelven exactamente el mismo resultado.
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.bench_name_index [--consultas 2000]
+"""
+# LIBRERIAS EXTERNAS
+import argparse, difflib, random, time
+from unidecode import unidecode
+
+# LIBRERIAS INTERNAS
+from src.scraper import EQUIPOS_URLS, parsear_equipo, construir_dataframe
+from src.name_index import NameIndex
+from benchmarks.servidor_local import cargar_paginas
+from benchmarks.fixtures.generar_fixtures import slug_equipo
+
+
+# Nombres del dataset construido a partir de las páginas sintéticas
+def nombres_fixtures():
+    paginas = cargar_paginas()
+    filas = []
+    for equipo, url in EQUIPOS_URLS.items():
+        filas.extend(parsear_equipo(paginas[slug_equipo(url)].decode("utf-8"), equipo))
+    return construir_dataframe(filas)["Nombre"].tolist()
+
+
+# Genera una variante del nombre como la escribiría un usuario (erratas, sin acentos, solo apellido...)
+def variante(nombre, rnd):
+    opcion = rnd.randint(0, 5)
+    if opcion == 0: return unidecode(nombre)
+    if opcion == 1: return nombre.split()[-1]
+    if opcion == 2: return nombre.lower()
+    if opcion == 3 and len(nombre) > 3:
+        i = rnd.randrange(len(nombre) - 1)
+        return nombre[:i] + nombre[i + 1] + nombre[i] + nombre[i + 2:]
+    if opcion == 4: return nombre + rnd.choice(["s", " Jr", "z"])
+    return rnd.choice(["Lewandowski", "Vinicius", "Courtois", "Pedri", "xyz", "Ter Stegen"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--cutoff", type=float, default=0.6)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    nombres = nombres_fixtures()
+    consultas = [variante(rnd.choice(nombres), rnd) for _ in range(args.consultas)]
+
+    t0 = time.perf_counter()
+    esperado = []
+    for c in consultas:
+        cand = difflib.get_close_matches(c, nombres, n=1, cutoff=args.cutoff)
+        esperado.append(cand[0] if cand else None)
+    t_difflib = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    indice = NameIndex(nombres)
+    t_construccion = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    obtenido = [indice.buscar(c, args.cutoff) for c in consultas]
+    t_indice = time.perf_counter() - t0
+
+    distintos = [(c, e, o) for c, e, o in zip(consultas, esperado, obtenido) if e != o]
+    assert not distintos, f"NameIndex difiere de difflib: {distintos[:5]}"
+    print(f"Nombres: {len(nombres)} | Consultas: {len(consultas)} | cutoff={args.cutoff}")
+    print(f"difflib:   {t_difflib * 1e3 / len(consultas):8.3f} ms/consulta")
+    print(f"NameIndex: {t_indice * 1e3 / len(consultas):8.3f} ms/consulta  (x{t_difflib / t_indice:.1f}, construcción {t_construccion * 1e3:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
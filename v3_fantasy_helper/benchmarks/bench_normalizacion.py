@@ -0,0 +1,99 @@
+"""
+Benchmark de la normalización vectorizada (src.data_utils): normalizar_posiciones
+y limpiar_porcentajes frente a aplicar normaliza_pos y limpiar_porcentaje elemento
+a elemento con .apply, para columnas de varios tamaños, y de preparar_grupos con
+una plantilla ya marcada como normalizada (sin copia ni normalización) frente a
+una sin marcar. Comprueba que los resultados son idénticos en todos los casos y
+que analizar_plantilla_pegada interpreta como se espera una batería de líneas
+pegadas (texto libre tras la posición, alias que son prefijo de una palabra...).
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.bench_normalizacion
+"""
+# LIBRERIAS EXTERNAS
+import random, time
+import numpy as np
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from src.data_utils import (ALIAS_POSICION, normaliza_pos, limpiar_porcentaje, normalizar_posiciones, limpiar_porcentajes,
+                            marcar_normalizado, analizar_plantilla_pegada)
+from src.optimizer import preparar_grupos
+from benchmarks.bench_optimizer import plantilla_sintetica
+
+TAMANOS = (30, 1_000, 100_000)
+REPETICIONES = 20
+# Líneas pegadas y (Nombre, Posicion, Precio) esperados
+CASOS_PEGADO = [
+    ("Courtois, POR", ("Courtois", "POR", None)),
+    ("Pedri MC 12,5", ("Pedri", "CEN", "12,5")),
+    ("Lewandowski;DC;20M", ("Lewandowski", "DEL", "20M")),
+    ("Pedri, MC, Barcelona", ("Pedri", "CEN", None)),
+    ("Gavi MED (lesionado)", ("Gavi", "CEN", None)),
+    ("Mbappé; DEL; 60 millones", ("Mbappé", "DEL", "60 millones")),
+    ("Rodri CEN 1.2e6", ("Rodri", "CEN", "1.2e6")),
+    ("Ansu Fati DEL", ("Ansu Fati", "DEL", None)),
+    ("X, DEL, 3", ("X", "DEL", "3")),
+    ("Vinicius Jr. F", ("Vinicius Jr.", "DEL", None)),
+]
+
+
+def mejor_tiempo_ms(funcion, repeticiones=REPETICIONES):
+    funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - t0) * 1e3)
+    return min(tiempos)
+
+
+# Posiciones escritas como en las plantillas reales (alias, minúsculas, espacios) y algún valor inválido o vacío
+def posiciones_sinteticas(n, semilla=0):
+    rnd = random.Random(semilla)
+    alias = list(ALIAS_POSICION) + ["XX", None]
+    return pd.Series([(lambda a: a if a is None else rnd.choice([a, a.lower(), f" {a} "]))(rnd.choice(alias)) for _ in range(n)])
+
+
+# Probabilidades como las de la web ('80%', '12,5 %') y alguna celda sin porcentaje
+def porcentajes_sinteticos(n, semilla=0):
+    rnd = random.Random(semilla)
+    return pd.Series([rnd.choice([f"{rnd.randint(0, 100)}%", f"{rnd.randint(0, 99)},5 %", "-", None]) for _ in range(n)])
+
+
+# Cada línea de CASOS_PEGADO da la fila esperada; una línea sin posición reconocible se rechaza con su número
+def comprobar_plantilla_pegada():
+    for linea, esperado in CASOS_PEGADO:
+        df, errores = analizar_plantilla_pegada(linea)
+        assert not errores and tuple(df.iloc[0][["Nombre", "Posicion", "Precio"]]) == esperado, (linea, df.to_dict("records"), errores)
+    df, errores = analizar_plantilla_pegada("Pedri MC\nsolo un nombre\nPedri DEL")
+    assert df["Nombre"].tolist() == ["Pedri"] and [num for num, _, _ in errores] == [2, 3], errores
+    print(f"Plantilla pegada: {len(CASOS_PEGADO)} casos verificados.\n")
+
+
+def main():
+    comprobar_plantilla_pegada()
+    print(f"{'n':>8} | {'posiciones .apply':>17} | {'vectorizado':>11} | {'porcentajes .apply':>18} | {'vectorizado':>11}")
+    for n in TAMANOS:
+        posiciones, porcentajes = posiciones_sinteticas(n), porcentajes_sinteticos(n)
+        assert posiciones.apply(normaliza_pos).tolist() == normalizar_posiciones(posiciones).tolist()
+        pd.testing.assert_series_equal(porcentajes.apply(limpiar_porcentaje).astype(float), limpiar_porcentajes(porcentajes))
+        repeticiones = 3 if n >= 100_000 else REPETICIONES
+        tiempos = [mejor_tiempo_ms(f, repeticiones) for f in (
+            lambda: posiciones.apply(normaliza_pos), lambda: normalizar_posiciones(posiciones),
+            lambda: porcentajes.apply(limpiar_porcentaje), lambda: limpiar_porcentajes(porcentajes))]
+        print(f"{n:8d} | {tiempos[0]:14.2f} ms | {tiempos[1]:8.2f} ms | {tiempos[2]:15.2f} ms | {tiempos[3]:8.2f} ms")
+
+    # preparar_grupos: la plantilla marcada (como la que devuelve emparejar_con_datos) se usa sin copiarla
+    for n in (25, 250):
+        df = plantilla_sintetica(n, 1)
+        marcada = marcar_normalizado(df.assign(Posicion=normalizar_posiciones(df["Posicion"])))
+        sin_marca, con_marca = preparar_grupos(df), preparar_grupos(marcada)
+        for pos in sin_marca:
+            assert sin_marca[pos].registros == con_marca[pos].registros
+            assert np.array_equal(sin_marca[pos].puntuaciones, con_marca[pos].puntuaciones)
+        t_sin, t_con = mejor_tiempo_ms(lambda: preparar_grupos(df)), mejor_tiempo_ms(lambda: preparar_grupos(marcada))
+        print(f"preparar_grupos ({n} jugadores): sin marca {t_sin:.2f} ms | marcada {t_con:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
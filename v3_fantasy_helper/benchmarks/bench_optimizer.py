@@ -0,0 +1,126 @@
+"""
+Benchmark del optimizador exacto del XI (src.optimizer) con plantillas sintéticas
+de 15 a 1.000 jugadores: sin restricciones, con objetivo ponderado y con
+presupuesto + máximo por equipo. En las plantillas pequeñas comprueba la
+optimalidad contra una búsqueda exhaustiva. También mide la enumeración de los
+K mejores XI (mejores_xi) y comprueba su orden contra la búsqueda exhaustiva, también
+con presupuesto y máximo por equipo (incluido un presupuesto imposible, que debe
+devolver una lista vacía sin recorrer todas las combinaciones), y compara el barrido
+de formaciones (barrer_formaciones) con una resolución por formación.
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.bench_optimizer [--repeticiones 5]
+"""
+# LIBRERIAS EXTERNAS
+import argparse, itertools, random, time
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from src.optimizer import resolver_xi, mejores_xi, barrer_formaciones, FORMACIONES_ESTANDAR, preparar_grupos, calcular_puntuaciones, precios_numericos
+
+TAMANOS = (15, 25, 50, 100, 250, 500, 1000)
+EQUIPOS = [f"Equipo {i}" for i in range(20)]
+
+
+# Plantilla sintética con proporciones de posiciones realistas, precios y puntos esperados
+def plantilla_sintetica(n, semilla=0):
+    rnd = random.Random(semilla)
+    posiciones = (["POR"] * 2 + ["DEF"] * 5 + ["CEN"] * 5 + ["DEL"] * 3)
+    filas = []
+    for i in range(n):
+        filas.append({
+            "Mi_nombre": f"Jugador {i}",
+            "Posicion": posiciones[i % len(posiciones)] if i < len(posiciones) else rnd.choice(posiciones),
+            "Equipo": rnd.choice(EQUIPOS),
+            "Probabilidad_num": float(rnd.choice(range(0, 101, 5))),
+            "Precio": round(rnd.uniform(0.5, 15.0), 1),
+            "Puntos": round(rnd.uniform(0, 10), 1),
+        })
+    return pd.DataFrame(filas)
+
+
+# Búsqueda exhaustiva (solo para plantillas pequeñas): puntuaciones de todos los XI válidos, de mayor a menor
+def todas_las_puntuaciones(df, pesos=None, presupuesto=None, max_por_equipo=None, tactica=(3, 5, 3, 5, 1, 3, 1, 11)):
+    min_def, max_def, min_cen, max_cen, min_del, max_del, num_por, total = tactica
+    puntos = calcular_puntuaciones(df, pesos).to_numpy()
+    precios = precios_numericos(df).to_numpy()
+    valores = []
+    for combo in itertools.combinations(range(len(df)), total):
+        sub = df.iloc[list(combo)]
+        cuenta = sub["Posicion"].value_counts()
+        if cuenta.get("POR", 0) != num_por: continue
+        if not (min_def <= cuenta.get("DEF", 0) <= max_def and min_cen <= cuenta.get("CEN", 0) <= max_cen and min_del <= cuenta.get("DEL", 0) <= max_del): continue
+        if presupuesto is not None and precios[list(combo)].sum() > presupuesto: continue
+        if max_por_equipo is not None and sub["Equipo"].value_counts().max() > max_por_equipo: continue
+        valores.append(puntos[list(combo)].sum())
+    return sorted(valores, reverse=True)
+
+
+# Mejor puntuación por búsqueda exhaustiva (None si ningún XI es válido)
+def fuerza_bruta(df, **kwargs):
+    valores = todas_las_puntuaciones(df, **kwargs)
+    return valores[0] if valores else None
+
+
+def cronometrar(funcion, repeticiones):
+    t0 = time.perf_counter()
+    for _ in range(repeticiones): resultado = funcion()
+    return (time.perf_counter() - t0) * 1e3 / repeticiones, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    # Verificación de optimalidad en plantillas de 15 jugadores
+    for semilla in range(5):
+        df = plantilla_sintetica(15, semilla)
+        for kwargs in ({}, {"pesos": {"Probabilidad_num": 1, "Puntos": 5}}, {"presupuesto": 60.0, "max_por_equipo": 2}):
+            solucion, error = resolver_xi(df, **kwargs)
+            esperado = fuerza_bruta(df, **kwargs)
+            if esperado is None:
+                assert solucion is None, (semilla, kwargs)
+            else:
+                assert solucion is not None and abs(solucion.puntuacion - esperado) < 1e-9, (semilla, kwargs, solucion, esperado, error)
+        for kwargs in ({}, {"presupuesto": 90.0}, {"presupuesto": 60.0, "max_por_equipo": 2}, {"max_por_equipo": 1}, {"presupuesto": 5.0}):
+            esperado = todas_las_puntuaciones(df, **kwargs)[:50]
+            obtenido = [sol.puntuacion for sol in mejores_xi(df, k=50, **kwargs)]
+            assert len(esperado) == len(obtenido) and all(abs(a - b) < 1e-9 for a, b in zip(esperado, obtenido)), (semilla, kwargs)
+    print("Optimalidad y orden de los K mejores verificados contra búsqueda exhaustiva en plantillas de 15 jugadores.\n")
+
+    print(f"{'Jugadores':>9} | {'preparar':>9} | {'sin restr.':>10} | {'ponderado':>10} | {'presup.+equipo':>14}   (ms)")
+    for n in TAMANOS:
+        df = plantilla_sintetica(n, semilla=n)
+        t_prep, _ = cronometrar(lambda: preparar_grupos(df), args.repeticiones)
+        t_base, _ = cronometrar(lambda: resolver_xi(df), args.repeticiones)
+        t_pond, _ = cronometrar(lambda: resolver_xi(df, pesos={"Probabilidad_num": 1, "Puntos": 5}), args.repeticiones)
+        t_rest, (sol, _) = cronometrar(lambda: resolver_xi(df, presupuesto=11 * 4.0, max_por_equipo=2), args.repeticiones)
+        print(f"{n:>9} | {t_prep:9.2f} | {t_base:10.2f} | {t_pond:10.2f} | {t_rest:14.2f}   {sol.formacion if sol else '-'}")
+
+    df = plantilla_sintetica(25, semilla=25)
+    for k in (1, 10, 50):
+        t_k, soluciones = cronometrar(lambda: mejores_xi(df, k=k), args.repeticiones)
+        print(f"mejores_xi K={k:<3} (25 jugadores): {t_k:6.2f} ms  ({len(soluciones)} XI distintos)")
+    # Presupuestos ajustados o imposibles: la poda por coste mínimo alcanzable evita recorrer las combinaciones
+    for presupuesto in (50.0, 30.0, 5.0):
+        t_k, soluciones = cronometrar(lambda: mejores_xi(df, k=6, presupuesto=presupuesto), args.repeticiones)
+        print(f"mejores_xi K=6 presupuesto {presupuesto:4.0f} (25 jugadores): {t_k:6.2f} ms  ({len(soluciones)} XI distintos)")
+    assert mejores_xi(df, k=6, presupuesto=5.0) == []
+
+    # Barrido de formaciones frente a resolver cada formación por separado (mismos resultados)
+    print()
+    for n in (25, 250):
+        df = plantilla_sintetica(n, semilla=n)
+        for kwargs in ({}, {"presupuesto": 11 * 4.0, "max_por_equipo": 2}):
+            def por_separado():
+                return [resolver_xi(df, d, d, c, c, f, f, **kwargs)[0] for d, c, f in FORMACIONES_ESTANDAR]
+            t_sep, separadas = cronometrar(por_separado, args.repeticiones)
+            t_bar, barrido = cronometrar(lambda: barrer_formaciones(df, **kwargs), args.repeticiones)
+            esperado = {s.formacion: s.puntuacion for s in separadas if s is not None}
+            assert {s.formacion: s.puntuacion for s in barrido} == esperado, (n, kwargs)
+            etiqueta = "presup.+equipo" if kwargs else "sin restr."
+            print(f"barrido de {len(FORMACIONES_ESTANDAR)} formaciones ({n} jugadores, {etiqueta}): {t_bar:7.2f} ms  vs  por separado {t_sep:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark de los motores de parseo de las páginas de equipo (src.html_parsers):
+BeautifulSoup con selectores CSS (referencia) frente a lxml con XPath compilado.
+Comprueba que ambos extraen exactamente las mismas filas en las páginas
+sintéticas (benchmarks/fixtures/equipos), en las páginas reales grabadas de
+futbolfantasy.com (benchmarks/fixtures/reales, si las hay) y en una página con
+casos límite (comentarios, scripts, plantillas, clases múltiples, selectores
+vacíos...), y mide el tiempo por página de las sintéticas y de las reales. Con
+--grabar descarga las páginas reales actuales a benchmarks/fixtures/reales para
+incluirlas en la comprobación (solo se guardan las páginas de las que
+BeautifulSoup extrae jugadores, no avisos de cookies ni páginas de error).
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.bench_parser [--repeticiones 5] [--grabar]
+"""
+# LIBRERIAS EXTERNAS
+import argparse, glob, os, time
+
+# LIBRERIAS INTERNAS
+from src.scraper import EQUIPOS_URLS, descargar_paginas
+from src.html_parsers import MOTORES
+from benchmarks.servidor_local import cargar_paginas
+from benchmarks.fixtures.generar_fixtures import DIR_REALES, slug_equipo
+
+# Página con casos límite para la comprobación de equivalencia
+PAGINA_CASOS_LIMITE = """<!DOCTYPE html><html><body>
+<div class='jugador destacado'><span class='nombre'>  </span><span class='name'>Nombre Secundario</span>
+  <span class='prob'>sin dato</span><span class='badge'> 75 % </span></div>
+<div class="\tplayer\n"><strong><!-- 10% -->Pepe <b>Reina</b></strong><script>var p = "99%";</script><span>Prob. 40%</span></div>
+<div class='player-card'><template><span class='nombre'>Oculto</span></template>Ana Gómez 55%<a href='/jugadores/ana'>perfil</a><a href='/jugadores/otra'>x</a></div>
+<div class='media-body'><div class='media'><strong>Dentro De Media Body</strong><span class='label'>80%</span>
+  <img src='a.png'><img data-src='b.png'><img data-src='c.png'></div></div>
+<div class='lista-jugadores'><section><div class='row'><p>Luis</p><p>Prob. 100%</p></div></section></div>
+<div class='media'><ruby>Kanji<rt>kana</rt></ruby> Prueba <style>.x{width:50%}</style>5 %</div>
+<div class='jugador'><div class='jugador'><span class='nombre'>Anidado</span><span class='probabilidad'>15%</span></div></div>
+<div class='media'>uno dos tres cuatro cinco seis siete 30%</div>
+<div class='jugador'><span class='nombre'>JugadorJugadorJugador</span><span class='probabilidad'>Prob.Prob%</span></div>
+</body></html>"""
+
+
+# Descarga las páginas reales de todos los equipos y las guarda en DIR_REALES; devuelve los equipos que fallaron. Una
+# página de la que BeautifulSoup no extrae ningún jugador no se guarda: no serviría para comprobar el marcado real
+def grabar_paginas_reales(directorio=DIR_REALES):
+    os.makedirs(directorio, exist_ok=True)
+    respuestas, errores = descargar_paginas(EQUIPOS_URLS)
+    for equipo, respuesta in respuestas.items():
+        if not MOTORES["bs4"](respuesta.text, equipo):
+            errores[equipo] = "BeautifulSoup no extrae ningún jugador de la página"
+            continue
+        with open(os.path.join(directorio, f"{slug_equipo(EQUIPOS_URLS[equipo])}.html"), "wb") as f:
+            f.write(respuesta.content)
+    return errores
+
+
+# Páginas reales grabadas ({slug: html})
+def cargar_paginas_reales(directorio=DIR_REALES):
+    paginas = {}
+    for ruta in sorted(glob.glob(os.path.join(directorio, "*.html"))):
+        with open(ruta, encoding="utf-8", errors="replace") as f:
+            paginas[os.path.splitext(os.path.basename(ruta))[0]] = f.read()
+    return paginas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--grabar", action="store_true", help="Descarga antes las páginas reales a benchmarks/fixtures/reales")
+    args = parser.parse_args()
+
+    if args.grabar:
+        errores = grabar_paginas_reales()
+        if errores: print(f"No se pudieron grabar {len(errores)} páginas: {', '.join(sorted(errores))}")
+
+    guardadas = cargar_paginas()
+    paginas = {equipo: guardadas[slug_equipo(url)].decode("utf-8") for equipo, url in EQUIPOS_URLS.items()}
+    reales = cargar_paginas_reales()
+
+    # Equivalencia exacta (mismas filas y en el mismo orden). En las páginas reales se exige además que bs4 encuentre
+    # jugadores: una página sin filas no demuestra nada sobre el marcado
+    comprobaciones = list(paginas.items()) + [(f"real:{slug}", html) for slug, html in reales.items()] + [("Casos límite", PAGINA_CASOS_LIMITE)]
+    for equipo, html in comprobaciones:
+        referencia = MOTORES["bs4"](html, equipo)
+        obtenido = MOTORES["lxml"](html, equipo)
+        assert referencia == obtenido, (equipo, [f for f in referencia if f not in obtenido], [f for f in obtenido if f not in referencia])
+        assert referencia or not equipo.startswith("real:"), f"{equipo}: BeautifulSoup no extrae ningún jugador"
+    print(f"Equivalencia verificada en {len(paginas)} páginas sintéticas, {len(reales)} páginas reales grabadas y la "
+          f"página de casos límite ({len(MOTORES['bs4'](PAGINA_CASOS_LIMITE, 'x'))} filas).")
+    if not reales: print(f"AVISO: no hay páginas reales en {DIR_REALES}; grábalas con --grabar para comprobar el marcado real.")
+    print()
+
+    for etiqueta, grupo in (("sintéticas", paginas), ("reales", reales)):
+        if not grupo: continue
+        tiempos = {}
+        for motor, funcion in MOTORES.items():
+            t0 = time.perf_counter()
+            for _ in range(args.repeticiones):
+                for equipo, html in grupo.items(): funcion(html, equipo)
+            tiempos[motor] = (time.perf_counter() - t0) * 1e3 / (args.repeticiones * len(grupo))
+            print(f"{motor:>5}: {tiempos[motor]:7.2f} ms/página ({etiqueta})")
+        print(f"Mejora de lxml frente a bs4 en las páginas {etiqueta}: x{tiempos['bs4'] / tiempos['lxml']:.1f}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark de la cadena completa sin acceso a la red: parseo de las páginas de
+equipo sintéticas (benchmarks/fixtures/equipos, generadas por
+generar_fixtures.py), emparejamiento de plantillas sintéticas de varios tamaños,
+selección del XI, HTML de la alineación y PDF. Las etapas con caché se miden en
+frío (*_frio, vaciando las cachés antes de cada repetición) y en caliente.
+
+Los resultados se guardan en JSON (mediana y mínimo en ms por etapa) para poder
+compararlos entre versiones: con --comparar se marca como regresión toda etapa
+cuyo tiempo mínimo (la medida menos sensible al ruido de la máquina) empeore más
+que la tolerancia y el proceso termina con código 1.
+
+Uso (desde v3_fantasy_helper/):
+    python -m benchmarks.bench_pipeline --salida base.json
+    python -m benchmarks.bench_pipeline --salida nuevo.json --comparar base.json [--tolerancia 0.25]
+"""
+# LIBRERIAS EXTERNAS
+import argparse, json, platform, random, statistics, sys, time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from src.scraper import EQUIPOS_URLS, parsear_equipo, construir_dataframe
+from src.core import emparejar_con_datos, seleccionar_mejor_xi
+from src.name_index import _CACHE_BUSQUEDAS, _indice_cacheado
+from src.output_generators import _CACHE_HTML, _CACHE_PDF, _card_html, generar_html_alineacion_completa, pdf_alineacion
+from benchmarks.servidor_local import cargar_paginas
+from benchmarks.fixtures.generar_fixtures import slug_equipo
+from benchmarks.bench_name_index import variante
+
+TAMANOS_PLANTILLA = (15, 30, 60)
+POSICIONES_PLANTILLA = ["POR"] * 2 + ["DEF"] * 5 + ["CEN"] * 5 + ["DEL"] * 3
+# Proporción de nombres escritos con erratas (obligan a la búsqueda aproximada)
+PROPORCION_ERRATAS = 0.25
+TOLERANCIA = 0.25
+
+
+# Plantilla sintética de `n` jugadores del dataset, con posiciones realistas y parte de los nombres con erratas
+def plantilla_sintetica(datos, n, semilla=0):
+    rnd = random.Random(semilla)
+    nombres = rnd.sample(datos["Nombre"].tolist(), n)
+    return pd.DataFrame({
+        "Nombre": [variante(nm, rnd) if rnd.random() < PROPORCION_ERRATAS else nm for nm in nombres],
+        "Posicion": [POSICIONES_PLANTILLA[i % len(POSICIONES_PLANTILLA)] for i in range(n)],
+        "Precio": [round(rnd.uniform(0.5, 15.0), 1) for _ in range(n)],
+    })
+
+
+# Vacía las cachés de nombres para medir el emparejamiento en frío
+def _vaciar_caches():
+    _CACHE_BUSQUEDAS.clear()
+    _indice_cacheado.cache_clear()
+
+
+# Vacía las cachés de HTML (alineación completa y tarjetas) y de PDF para medir su generación en frío
+def _vaciar_caches_salida():
+    _CACHE_HTML.clear()
+    _card_html.cache_clear()
+    _CACHE_PDF.clear()
+
+
+# Ejecuta `funcion` `repeticiones` veces tras una llamada de calentamiento (llamando antes a `preparar`, fuera del
+# tiempo medido) y devuelve estadísticas en ms
+def medir(funcion, repeticiones, preparar=None):
+    if preparar: preparar()
+    funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar: preparar()
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - t0) * 1e3)
+    return {"mediana_ms": round(statistics.median(tiempos), 4), "min_ms": round(min(tiempos), 4), "repeticiones": repeticiones}
+
+
+def ejecutar(repeticiones):
+    guardadas = cargar_paginas()
+    paginas = {equipo: guardadas[slug_equipo(url)].decode("utf-8") for equipo, url in EQUIPOS_URLS.items()}
+    parsear = lambda: [fila for equipo, html in paginas.items() for fila in parsear_equipo(html, equipo)]
+    filas = parsear()
+    datos = construir_dataframe(filas)
+
+    resultados = {
+        "parse": medir(parsear, repeticiones),
+        "dataframe": medir(lambda: construir_dataframe(filas), repeticiones),
+    }
+    for n in TAMANOS_PLANTILLA:
+        plantilla = plantilla_sintetica(datos, n, semilla=n)
+        resultados[f"match_frio[{n}]"] = medir(lambda: emparejar_con_datos(plantilla, datos), repeticiones, _vaciar_caches)
+        resultados[f"match[{n}]"] = medir(lambda: emparejar_con_datos(plantilla, datos), repeticiones)
+        encontrados, _ = emparejar_con_datos(plantilla, datos)
+        resultados[f"select[{n}]"] = medir(lambda: seleccionar_mejor_xi(encontrados), repeticiones)
+        xi, error = seleccionar_mejor_xi(encontrados)
+        assert not error, error
+        df_xi = pd.DataFrame(xi)
+        banca = encontrados[~encontrados["Mi_nombre"].isin(df_xi["Mi_nombre"])]
+        html = lambda: generar_html_alineacion_completa(df_xi, banca, "#", "#")
+        resultados[f"html_frio[{n}]"] = medir(html, repeticiones, _vaciar_caches_salida)
+        resultados[f"html[{n}]"] = medir(html, repeticiones)
+        resultados[f"pdf_frio[{n}]"] = medir(lambda: pdf_alineacion(df_xi), repeticiones, _vaciar_caches_salida)
+        resultados[f"pdf[{n}]"] = medir(lambda: pdf_alineacion(df_xi), repeticiones)
+    return resultados
+
+
+# Compara dos ejecuciones etapa a etapa por tiempo mínimo; devuelve las etapas que empeoran más que `tolerancia`
+def comparar(actual, base, tolerancia=TOLERANCIA):
+    regresiones = []
+    print(f"\n{'Etapa':<16} | {'base (ms)':>10} | {'actual (ms)':>11} | {'ratio':>6}")
+    for etapa, medida in actual.items():
+        if etapa not in base: continue
+        ratio = medida["min_ms"] / base[etapa]["min_ms"] if base[etapa]["min_ms"] else float("inf")
+        marca = "  << REGRESIÓN" if ratio > 1 + tolerancia else ""
+        print(f"{etapa:<16} | {base[etapa]['min_ms']:10.3f} | {medida['min_ms']:11.3f} | {ratio:6.2f}{marca}")
+        if marca: regresiones.append(etapa)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--salida", help="Fichero JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="Empeoramiento relativo admitido (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    resultados = ejecutar(args.repeticiones)
+    informe = {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "entorno": {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__, "maquina": platform.machine()},
+        "resultados": resultados,
+    }
+    print(f"{'Etapa':<16} | {'mediana (ms)':>12} | {'mínimo (ms)':>11}")
+    for etapa, medida in resultados.items():
+        print(f"{etapa:<16} | {medida['mediana_ms']:12.3f} | {medida['min_ms']:11.3f}")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f: json.dump(informe, f, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f: base = json.load(f)["resultados"]
+        regresiones = comparar(resultados, base, args.tolerancia)
+        if regresiones:
+            print(f"\nRegresiones (> {args.tolerancia:.0%}): {', '.join(regresiones)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
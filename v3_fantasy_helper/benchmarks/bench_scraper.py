@@ -0,0 +1,64 @@
+"""
+Benchmark del scraper contra el servidor local de páginas sintéticas.
+Compara el flujo secuencial original (requests.get + pausa de 0.2 s por equipo)
+con el motor concurrente de src.scraper y comprueba que ambos producen el mismo
+DataFrame. También mide un refresco "sin cambios" con la caché de revalidación
+(peticiones condicionales con ETag o, con --sin-validadores, comparación de huellas).
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.bench_scraper [--latencia 0.15]
+"""
+# LIBRERIAS EXTERNAS
+import argparse, time, requests
+
+# LIBRERIAS INTERNAS
+from src.scraper import HEADERS, parsear_equipo, construir_dataframe, obtener_datos_laliga, crear_sesion, LimitadorHost
+from src.http_cache import CacheRevalidacion
+from benchmarks.servidor_local import ServidorEquipos
+
+
+# Réplica del scraping secuencial anterior: una conexión nueva por equipo y una pausa fija
+def scrape_secuencial(urls, pausa=0.2):
+    all_rows = []
+    for equipo, url in urls.items():
+        r = requests.get(url, headers=HEADERS, timeout=15)
+        r.raise_for_status()
+        all_rows.extend(parsear_equipo(r.text, equipo))
+        time.sleep(pausa)
+    return construir_dataframe(all_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencia", type=float, default=0.15, help="Latencia simulada por petición (s)")
+    parser.add_argument("--max-por-host", type=int, default=4)
+    parser.add_argument("--intervalo", type=float, default=0.1, help="Separación mínima entre inicios de petición (s)")
+    parser.add_argument("--sin-validadores", action="store_true", help="El servidor no envía ETag (solo se compara la huella del HTML)")
+    args = parser.parse_args()
+
+    with ServidorEquipos(latencia=args.latencia, validadores=not args.sin_validadores) as servidor:
+        t0 = time.perf_counter()
+        df_secuencial = scrape_secuencial(servidor.urls)
+        t_secuencial = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        df_concurrente, errores = obtener_datos_laliga(servidor.urls, limitador=LimitadorHost(args.max_por_host, args.intervalo))
+        t_concurrente = time.perf_counter() - t0
+
+        cache, sesion = CacheRevalidacion(), crear_sesion()
+        limitador = LimitadorHost(args.max_por_host, args.intervalo)
+        obtener_datos_laliga(servidor.urls, sesion=sesion, limitador=limitador, cache=cache)
+        t0 = time.perf_counter()
+        df_revalidado, errores_revalidacion = obtener_datos_laliga(servidor.urls, sesion=sesion, limitador=limitador, cache=cache)
+        t_revalidacion = time.perf_counter() - t0
+
+    assert not errores and not errores_revalidacion, (errores, errores_revalidacion)
+    assert df_secuencial.equals(df_concurrente), "El motor concurrente no reproduce el DataFrame secuencial"
+    assert df_secuencial.equals(df_revalidado), "La caché de revalidación no reproduce el DataFrame secuencial"
+    print(f"Equipos: {len(servidor.urls)} | Jugadores: {len(df_concurrente)} | Latencia simulada: {args.latencia:.2f} s")
+    print(f"Secuencial:  {t_secuencial:6.2f} s")
+    print(f"Concurrente: {t_concurrente:6.2f} s  (x{t_secuencial / t_concurrente:.1f})")
+    print(f"Revalidación sin cambios: {t_revalidacion:6.2f} s  (x{t_secuencial / t_revalidacion:.1f}) {cache.estadisticas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Benchmark del simulador de riesgo de la alineación (src.simulacion): tiempos de
+la simulación Monte Carlo vectorizada con 10k, 100k y 1M jornadas frente al
+cálculo exacto por convolución Poisson-binomial. A partir de 100k jornadas
+comprueba que ambas distribuciones coinciden dentro de la tolerancia.
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.bench_simulacion
+"""
+# LIBRERIAS EXTERNAS
+import time
+import numpy as np
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from benchmarks.bench_optimizer import plantilla_sintetica, cronometrar
+from src.optimizer import resolver_xi
+from src.simulacion import riesgo_analitico, simular_alineacion
+
+TOLERANCIA = 0.01
+
+
+def main():
+    for n in (15, 22, 30):
+        df = plantilla_sintetica(n, semilla=n)
+        solucion, _ = resolver_xi(df)
+        xi = pd.DataFrame(solucion.xi)
+        banca = df[~df["Mi_nombre"].isin(xi["Mi_nombre"])]
+        exacto = riesgo_analitico(xi, banca)
+        for escenarios in (10_000, 100_000, 1_000_000):
+            inicio = time.perf_counter()
+            simulado = simular_alineacion(xi, banca, escenarios, semilla=0)
+            t_mc = time.perf_counter() - inicio
+            error = np.abs(exacto["distribucion"] - simulado["distribucion"]).max()
+            assert escenarios < 100_000 or error < TOLERANCIA, (n, escenarios, error)
+            print(f"plantilla={n:>2} escenarios={escenarios:>9,}  montecarlo={t_mc * 1000:8.1f} ms  error_max={error:.4f}")
+        t_exacto, _ = cronometrar(lambda: riesgo_analitico(xi, banca), 100)
+        print(f"plantilla={n:>2} analitico={t_exacto:8.2f} ms  P(XI completo)={exacto['prob_xi_completo']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
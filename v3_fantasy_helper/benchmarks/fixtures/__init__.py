@@ -0,0 +1 @@
+# This file makes the 'fixtures' directory a Python package.
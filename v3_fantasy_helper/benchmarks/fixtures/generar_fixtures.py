@@ -0,0 +1,79 @@
+"""
+Genera las páginas de equipo sintéticas que usan los benchmarks como sustituto
+local de futbolfantasy.com. No son páginas grabadas de la web: se construyen a
+mano imitando la estructura que recorre el scraper (nodos .jugador / .media /
+.lista-jugadores .row, badges de probabilidad, placeholders 'JugadorJugadorJugador'
+y contenido de relleno) y son deterministas. Sirven para medir y comparar versiones
+del código, no para garantizar que el scraper entiende el marcado real.
+
+Uso (desde v3_fantasy_helper/):  python -m benchmarks.fixtures.generar_fixtures
+"""
+# LIBRERIAS EXTERNAS
+import os, random
+
+# LIBRERIAS INTERNAS
+from src.scraper import EQUIPOS_URLS
+
+DIR_EQUIPOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "equipos")
+# Páginas reales de futbolfantasy.com grabadas con `python -m benchmarks.bench_parser --grabar` (<slug>.html)
+DIR_REALES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reales")
+
+NOMBRES = ["Álex", "Iñaki", "Dani", "Pablo", "Sergio", "Javi", "Unai", "Marcos", "Raúl", "Óscar", "Nico", "Iker",
+           "Rubén", "Jesús", "Hugo", "Martín", "Adrián", "Lucas", "Jorge", "Gonzalo", "Mikel", "Víctor", "Aitor", "Carlos"]
+APELLIDOS = ["García", "Fernández", "Muñoz", "Sánchez", "Pérez", "Gómez", "Martínez", "Ruiz", "Jiménez", "Álvarez",
+             "Moreno", "Romero", "Navarro", "Domínguez", "Gil", "Vázquez", "Serrano", "Ramos", "Blanco", "Ortega",
+             "Delgado", "Castro", "Ortiz", "Rubio", "Marín", "Sanz", "Iglesias", "Núñez", "Medina", "Garrido"]
+
+
+# Devuelve el 'slug' del equipo a partir de su URL (ej: 'real-madrid')
+def slug_equipo(url):
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+# Genera el HTML de la página de un equipo con jugadores deterministas
+def generar_pagina(equipo, semilla, num_jugadores=26, num_noticias=60):
+    rnd = random.Random(semilla)
+    jugadores = []
+    usados = set()
+    while len(jugadores) < num_jugadores:
+        nombre = f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}" if rnd.random() < 0.7 else rnd.choice(APELLIDOS) + " " + rnd.choice(APELLIDOS)
+        if nombre in usados: continue
+        usados.add(nombre)
+        jugadores.append((nombre, rnd.choice([0, 5, 10, 25, 40, 55, 60, 70, 75, 80, 85, 90, 95, 100]), rnd.randint(1000, 99999)))
+
+    partes = [f"<!DOCTYPE html><html lang='es'><head><meta charset='utf-8'><title>{equipo} - FutbolFantasy</title>",
+              "<script>window.dataLayer = window.dataLayer || []; var p = '95%';</script></head><body>",
+              "<nav class='menu'>" + "".join(f"<a href='/laliga/equipos/{i}'>Equipo {i}</a>" for i in range(20)) + "</nav>",
+              "<div class='plantilla'>"]
+    for i, (nombre, prob, pid) in enumerate(jugadores):
+        slug = nombre.lower().replace(" ", "-")
+        perfil = f"https://www.futbolfantasy.com/jugadores/{slug}"
+        imagen = f"https://static.futbolfantasy.com/uploads/images/jugadores/ficha/{pid}.png"
+        if i % 3 == 0:
+            partes.append(
+                f"<div class='media'><a href='{perfil}'><img class='lazy' data-src='{imagen}' src='data:,'></a>"
+                f"<div class='media-body'><strong>{nombre}</strong><span class='badge'>{prob}%</span></div></div>")
+        else:
+            partes.append(
+                f"<div class='jugador'><a href='{perfil}'><img data-src='{imagen}' alt='{nombre}'></a>"
+                f"<span class='nombre'>{nombre}</span><div class='info'><span class='posicion'>POR</span>"
+                f"<span class='probabilidad'>{prob}%</span></div></div>")
+    partes.append("<div class='jugador'><span class='nombre'>JugadorJugadorJugador</span><span class='probabilidad'>Prob.Prob%</span></div>")
+    partes.append("</div><div class='lista-jugadores'>")
+    for nombre, prob, _ in jugadores[:8]:
+        partes.append(f"<div class='row'><span>{nombre} Prob. {prob}%</span></div>")
+    partes.append("</div><section class='noticias'>")
+    for i in range(num_noticias):
+        partes.append(f"<article class='noticia'><h3>Noticia {i} del {equipo}</h3><p>{' '.join(rnd.choice(APELLIDOS) for _ in range(40))}</p>"
+                      f"<div class='media'><div class='media-body'><p>Sin datos de alineación</p></div></div></article>")
+    partes.append("</section></body></html>")
+    return "".join(partes)
+
+
+if __name__ == "__main__":
+    os.makedirs(DIR_EQUIPOS, exist_ok=True)
+    for semilla, (equipo, url) in enumerate(EQUIPOS_URLS.items()):
+        ruta = os.path.join(DIR_EQUIPOS, f"{slug_equipo(url)}.html")
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(generar_pagina(equipo, semilla))
+    print(f"Generadas {len(EQUIPOS_URLS)} páginas en {DIR_EQUIPOS}")
@@ -0,0 +1,84 @@
+"""
+Servidor HTTP local que sirve las páginas de equipo sintéticas de
+benchmarks/fixtures/equipos (generadas por generar_fixtures.py), imitando las rutas de futbolfantasy.com con una
+latencia artificial por petición y validación por ETag (respuestas 304). Sustituye a la web real en los benchmarks.
+"""
+# LIBRERIAS EXTERNAS
+import os, time, hashlib, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# LIBRERIAS INTERNAS
+from src.scraper import EQUIPOS_URLS
+from benchmarks.fixtures.generar_fixtures import DIR_EQUIPOS, slug_equipo
+
+
+# Carga en memoria las páginas sintéticas ({slug: bytes})
+def cargar_paginas():
+    paginas = {}
+    for url in EQUIPOS_URLS.values():
+        slug = slug_equipo(url)
+        with open(os.path.join(DIR_EQUIPOS, f"{slug}.html"), "rb") as f:
+            paginas[slug] = f.read()
+    return paginas
+
+
+class ServidorEquipos:
+    """
+    Arranca un ThreadingHTTPServer en un puerto libre de localhost. Se usa como
+    context manager y expone `urls` con el mismo formato que EQUIPOS_URLS.
+    """
+    def __init__(self, latencia=0.15, validadores=True):
+        self.latencia = latencia
+        self.validadores = validadores
+        self.paginas = cargar_paginas()
+        self.peticiones = 0
+        self._lock = threading.Lock()
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), self._crear_handler())
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+
+    def _crear_handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with servidor._lock:
+                    servidor.peticiones += 1
+                time.sleep(servidor.latencia)
+                cuerpo = servidor.paginas.get(self.path.rstrip("/").rsplit("/", 1)[-1])
+                if cuerpo is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = '"' + hashlib.md5(cuerpo).hexdigest() + '"'
+                if servidor.validadores and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if servidor.validadores: self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @property
+    def urls(self):
+        host, puerto = self._servidor.server_address
+        return {equipo: f"http://{host}:{puerto}/laliga/equipos/{slug_equipo(url)}" for equipo, url in EQUIPOS_URLS.items()}
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._servidor.shutdown()
+        self._servidor.server_close()
@@ -5,8 +5,10 @@ import streamlit as st
 from streamlit_local_storage import LocalStorage
 
 # IMPORTACIONES DE FUNCIONES INTERNAS
-from src.scraper import scrape_laliga
-from src.state_manager import initialize_session_state, autosave_plantilla
+from src.scraper import vista_laliga
+from src.media import iniciar_precarga
+from src.historial import historial_probabilidades
+from src.state_manager import initialize_session_state, autosave_plantilla, registrar_visita
 from src.ui.sidebar import render_sidebar
 from src.ui.input_tabs import render_input_tabs
 from src.ui.results_tab import render_results_tab
@@ -48,17 +50,21 @@ st.caption("Calcula tu alineación ideal con datos de probabilidad en tiempo rea
 # FLUJO PRINCIPAL DE LA APLICACIÓN 
 
 # 1. CARGA DE DATOS PRINCIPALES
-df_laliga = scrape_laliga()
+vista = vista_laliga()
+df_laliga = vista.df
 
 if df_laliga.empty:
     st.error("🔴 No se pudieron cargar los datos de los jugadores de LaLiga. La aplicación no puede continuar.")
     st.stop()
-nombres_laliga = sorted(df_laliga["Nombre"].unique())
+nombres_laliga = vista.nombres
+iniciar_precarga(df_laliga)
+historial = historial_probabilidades()
 
 
 # 2. INICIALIZACIÓN Y GESTIÓN DE ESTADO
 initialize_session_state(localS)
 autosave_plantilla(localS)
+registrar_visita(localS)
 
 
 # 3. RENDERIZAR LA BARRA LATERAL Y OBTENER CONFIGURACIÓN
@@ -73,11 +79,11 @@ df_plantilla = pd.DataFrame()
 
 with tab1:
     # RENDERIZAR PESTAÑA DE ENTRADA Y OBTENER PLANTILLA
-    df_plantilla = render_input_tabs(nombres_laliga, df_laliga, cutoff)
+    df_plantilla = render_input_tabs(nombres_laliga, vista, cutoff)
 
 with tab2:
     # RENDERIZAR PESTAÑA DE RESULTADOS Y MOSTRAR RESULTADOS
-    render_results_tab(df_plantilla, df_laliga, cutoff, tactica)
+    render_results_tab(df_plantilla, vista, cutoff, tactica, historial)
 
 
 # FOOTER
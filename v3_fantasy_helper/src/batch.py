@@ -0,0 +1,302 @@
+"""
+Modo por lotes (sin Streamlit): calcula el XI ideal de miles de plantillas a partir
+de un snapshot del dataset de LaLiga, reutilizando el emparejamiento y la selección
+de src.core.
+
+Entrada: un fichero o un directorio con ficheros .csv y/o .jsonl.
+  - CSV: columnas Nombre, Posicion y opcionalmente Precio. Si hay una columna
+    Plantilla, cada valor distinto es una plantilla; si no, el fichero entero es una
+    plantilla cuyo identificador es el nombre del fichero. Se lee por bloques: cada
+    plantilla se procesa en cuanto se han leído todas sus filas.
+  - JSONL: una plantilla por línea, {"id": ..., "jugadores": [{"Nombre": ..., "Posicion": ..., "Precio": ...}]}.
+  Las líneas JSON no válidas, las filas sin Plantilla y los ficheros ilegibles dan una
+  fila de salida con el error, sin detener el lote.
+Salida: .jsonl o .parquet con una fila por plantilla (XI, formación, probabilidad media,
+no encontrados, jugadores sin precio conocido si hay presupuesto y error si lo hubo), en el
+mismo orden que la entrada. Los precios y el presupuesto se expresan en millones ('12M',
+'12,5' y '12.500.000 €' son el mismo precio).
+
+Uso (desde v3_fantasy_helper/):
+    python -m src.batch plantillas/ resultados.jsonl [--snapshot data/snapshots/laliga_....parquet] [--procesos 8]
+"""
+# LIBRERIAS EXTERNAS (concurrent.futures para el pool de procesos, pandas/pyarrow para leer y escribir ficheros)
+import argparse, json, logging, os, sys, time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from .core import emparejar_con_datos, seleccionar_mejor_xi
+from .optimizer import jugadores_sin_precio
+from .snapshots import listar_snapshots, DIR_SNAPSHOTS
+from .vista_datos import VistaDatos
+
+logger = logging.getLogger(__name__)
+
+# Plantillas por tarea enviada al pool (amortiza el coste de comunicación entre procesos)
+TAMANO_LOTE = 64
+# Lotes en vuelo por proceso: limita la memoria ocupada por plantillas pendientes y resultados sin escribir
+LOTES_EN_VUELO_POR_PROCESO = 2
+# Cada cuántas plantillas se informa del progreso
+INTERVALO_PROGRESO = 5_000
+# Filas por bloque al leer los CSV (la memoria no depende del tamaño del fichero)
+TAMANO_BLOQUE_CSV = 50_000
+# Campos de cada jugador del XI que se escriben en la salida
+CAMPOS_XI = ["Mi_nombre", "Nombre_web", "Posicion", "Equipo", "Probabilidad_num", "Precio"]
+
+
+# LECTURA DE PLANTILLAS (en streaming: los CSV se leen por bloques y los JSONL línea a línea)
+
+# Ficheros de entrada admitidos, en orden alfabético para que la salida sea reproducible
+# (se excluye `excluir`, el fichero de salida, por si se escribe dentro del directorio de entrada)
+def _ficheros_entrada(ruta, excluir=None):
+    if os.path.isfile(ruta): return [ruta]
+    ficheros = sorted(os.path.join(ruta, f) for f in os.listdir(ruta) if f.lower().endswith((".csv", ".jsonl")))
+    return [f for f in ficheros if excluir is None or os.path.abspath(f) != os.path.abspath(excluir)]
+
+
+# Genera (id, lista de jugadores, error) para cada plantilla de los ficheros de entrada. Los problemas de lectura
+# (línea JSON no válida, filas sin Plantilla, fichero ilegible) se devuelven como una entrada con `error`, de modo
+# que aparecen en la salida y no detienen el lote
+def leer_plantillas(ruta, excluir=None, tamano_bloque=TAMANO_BLOQUE_CSV):
+    for fichero in _ficheros_entrada(ruta, excluir):
+        base = os.path.splitext(os.path.basename(fichero))[0]
+        try:
+            if fichero.lower().endswith(".jsonl"):
+                yield from _plantillas_jsonl(fichero, base)
+            else:
+                yield from _plantillas_csv(fichero, base, tamano_bloque)
+        except (OSError, UnicodeDecodeError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+            logger.warning("No se pudo leer %s: %s", fichero, e)
+            yield base, [], f"No se pudo leer el fichero {os.path.basename(fichero)}: {type(e).__name__}: {e}"
+
+
+# Plantillas de un JSONL, una por línea (las líneas no válidas dan una entrada con error)
+def _plantillas_jsonl(fichero, base):
+    with open(fichero, encoding="utf-8") as f:
+        for num, linea in enumerate(f, start=1):
+            if not linea.strip(): continue
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError as e:
+                yield f"{base}:{num}", [], f"Línea {num} no es JSON válido: {e}"
+                continue
+            if not isinstance(registro, dict) or not isinstance(registro.get("jugadores", []), list):
+                yield f"{base}:{num}", [], f"Línea {num}: se esperaba {{\"id\": ..., \"jugadores\": [...]}}"
+                continue
+            yield str(registro.get("id", f"{base}:{num}")), registro.get("jugadores", []), None
+
+
+# Plantillas de un CSV leído por bloques. Con columna Plantilla, una primera pasada (solo esa columna) cuenta las filas
+# de cada plantilla y en la segunda cada una se entrega en cuanto se han leído todas sus filas: si el fichero está
+# agrupado por plantilla solo hay una abierta a la vez, y si no, el resultado sigue siendo correcto
+def _plantillas_csv(fichero, base, tamano_bloque):
+    columnas = pd.read_csv(fichero, nrows=0).columns
+    if "Plantilla" not in columnas:
+        bloques = pd.read_csv(fichero, dtype=str, chunksize=tamano_bloque)
+        yield base, [fila for bloque in bloques for fila in bloque.to_dict("records")], None
+        return
+
+    pendientes = Counter()
+    for bloque in pd.read_csv(fichero, usecols=["Plantilla"], dtype=str, chunksize=tamano_bloque):
+        pendientes.update(bloque["Plantilla"].dropna().tolist())
+
+    abiertas, sin_id = {}, 0
+    for bloque in pd.read_csv(fichero, dtype=str, chunksize=tamano_bloque):
+        vacias = bloque["Plantilla"].isna()
+        sin_id += int(vacias.sum())
+        for plantilla, grupo in bloque[~vacias].groupby("Plantilla", sort=False):
+            filas = abiertas.setdefault(plantilla, [])
+            filas.extend(grupo.drop(columns=["Plantilla"]).to_dict("records"))
+            if len(filas) >= pendientes[plantilla]: yield plantilla, abiertas.pop(plantilla), None
+    if sin_id:
+        yield f"{base}:sin_plantilla", [], f"{sin_id} filas de {os.path.basename(fichero)} sin identificador en la columna Plantilla"
+
+
+# Agrupa un iterable en listas de `tamano` elementos
+def _en_lotes(iterable, tamano):
+    lote = []
+    for elemento in iterable:
+        lote.append(elemento)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote: yield lote
+
+
+# PROCESADO (cada proceso del pool carga el snapshot y construye su VistaDatos una sola vez en su inicializador)
+
+_DATOS = None
+_OPCIONES = None
+
+
+def _inicializar(ruta_snapshot, opciones):
+    global _DATOS, _OPCIONES
+    datos = pd.read_parquet(ruta_snapshot)
+    # El estado de los equipos que guarda el scraper en los metadatos no se usa aquí (y pandas lo copiaría en cada operación)
+    datos.attrs.clear()
+    _DATOS = VistaDatos(datos)
+    _OPCIONES = opciones
+
+
+# Empareja y optimiza una plantilla; nunca lanza excepciones para no perder el resto del lote
+def procesar_plantilla(id_plantilla, jugadores, datos, opciones):
+    resultado = _resultado_error(id_plantilla, None)
+    try:
+        plantilla = pd.DataFrame(jugadores)
+        if "Nombre" not in plantilla or "Posicion" not in plantilla:
+            resultado["error"] = "La plantilla debe contener las columnas 'Nombre' y 'Posicion'."
+            return resultado
+        plantilla = plantilla.drop_duplicates(subset=["Nombre"], keep="first")
+        encontrados, no_encontrados = emparejar_con_datos(plantilla, datos, opciones["cutoff"])
+        resultado["no_encontrados"] = no_encontrados
+        if encontrados.empty:
+            resultado["error"] = "No se pudo emparejar ningún jugador."
+            return resultado
+        # Con presupuesto, los jugadores sin precio conocido no se pueden alinear: se informa de ellos
+        if opciones["presupuesto"] is not None: resultado["sin_precio"] = jugadores_sin_precio(encontrados)
+        xi, error = seleccionar_mejor_xi(encontrados, *opciones["tactica"], presupuesto=opciones["presupuesto"], max_por_equipo=opciones["max_por_equipo"])
+        if error:
+            resultado["error"] = error
+            return resultado
+        cuenta = pd.Series([j["Posicion"] for j in xi]).value_counts()
+        resultado["formacion"] = f"{cuenta.get('DEF', 0)}-{cuenta.get('CEN', 0)}-{cuenta.get('DEL', 0)}"
+        resultado["prob_media"] = round(float(sum(j["Probabilidad_num"] for j in xi)) / len(xi), 2)
+        resultado["xi"] = [{c: (None if pd.isna(j.get(c)) else j.get(c)) for c in CAMPOS_XI} for j in xi]
+        for jugador in resultado["xi"]:
+            if jugador["Precio"] is not None: jugador["Precio"] = str(jugador["Precio"])
+    except Exception as e:
+        resultado["error"] = f"{type(e).__name__}: {e}"
+    return resultado
+
+
+# Resultado vacío con el error de lectura de una entrada
+def _resultado_error(id_plantilla, error):
+    return {"id": id_plantilla, "formacion": None, "prob_media": None, "xi": [], "no_encontrados": [], "sin_precio": [], "error": error}
+
+
+def _procesar_lote(lote):
+    return [_resultado_error(id_plantilla, error) if error else procesar_plantilla(id_plantilla, jugadores, _DATOS, _OPCIONES)
+            for id_plantilla, jugadores, error in lote]
+
+
+# ESCRITURA DE RESULTADOS
+
+class EscritorResultados:
+    """
+    Escribe los resultados a medida que llegan, en JSONL (una línea por plantilla)
+    o en Parquet (un row group por bloque, sin acumular todo en memoria).
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.parquet = ruta.lower().endswith(".parquet")
+        self._fichero = None if self.parquet else open(ruta, "w", encoding="utf-8")
+        self._escritor = None
+
+    def escribir(self, resultados):
+        if not resultados: return
+        if not self.parquet:
+            for r in resultados: self._fichero.write(json.dumps(r, ensure_ascii=False) + "\n")
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        tabla = pa.Table.from_pylist(resultados, schema=self._esquema(pa))
+        if self._escritor is None: self._escritor = pq.ParquetWriter(self.ruta, tabla.schema)
+        self._escritor.write_table(tabla)
+
+    @staticmethod
+    def _esquema(pa):
+        jugador = pa.struct([("Mi_nombre", pa.string()), ("Nombre_web", pa.string()), ("Posicion", pa.string()),
+                             ("Equipo", pa.string()), ("Probabilidad_num", pa.float64()), ("Precio", pa.string())])
+        return pa.schema([("id", pa.string()), ("formacion", pa.string()), ("prob_media", pa.float64()),
+                          ("xi", pa.list_(jugador)), ("no_encontrados", pa.list_(pa.string())),
+                          ("sin_precio", pa.list_(pa.string())), ("error", pa.string())])
+
+    def cerrar(self):
+        if self._fichero: self._fichero.close()
+        if self._escritor: self._escritor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+# FUNCION PRINCIPAL
+
+# Procesa todas las plantillas de `entrada` y escribe los resultados en `salida`. Con procesos <= 1 se trabaja en
+# el propio proceso; si no, un pool con un número acotado de lotes en vuelo (la salida conserva el orden de entrada).
+# Devuelve estadísticas: plantillas, errores, segundos y plantillas/s
+def ejecutar_lote(entrada, salida, ruta_snapshot, opciones, procesos=None, tamano_lote=TAMANO_LOTE):
+    procesos = procesos or os.cpu_count() or 1
+    inicio = time.perf_counter()
+    total = errores = 0
+    siguiente_aviso = INTERVALO_PROGRESO
+
+    def registrar(resultados):
+        nonlocal total, errores, siguiente_aviso
+        escritor.escribir(resultados)
+        total += len(resultados)
+        errores += sum(1 for r in resultados if r["error"])
+        if total >= siguiente_aviso:
+            logger.info("%d plantillas procesadas (%.1f plantillas/s)", total, total / (time.perf_counter() - inicio))
+            siguiente_aviso += INTERVALO_PROGRESO
+
+    lotes = _en_lotes(leer_plantillas(entrada, excluir=salida), tamano_lote)
+    with EscritorResultados(salida) as escritor:
+        if procesos <= 1:
+            _inicializar(ruta_snapshot, opciones)
+            for lote in lotes: registrar(_procesar_lote(lote))
+        else:
+            with ProcessPoolExecutor(procesos, initializer=_inicializar, initargs=(ruta_snapshot, opciones)) as pool:
+                en_vuelo = deque()
+                for lote in lotes:
+                    en_vuelo.append(pool.submit(_procesar_lote, lote))
+                    if len(en_vuelo) >= procesos * LOTES_EN_VUELO_POR_PROCESO: registrar(en_vuelo.popleft().result())
+                while en_vuelo: registrar(en_vuelo.popleft().result())
+
+    segundos = time.perf_counter() - inicio
+    return {"plantillas": total, "errores": errores, "segundos": segundos, "plantillas_por_segundo": total / segundos if segundos else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entrada", help="Fichero o directorio con plantillas (.csv / .jsonl)")
+    parser.add_argument("salida", help="Fichero de resultados (.jsonl o .parquet)")
+    parser.add_argument("--snapshot", help=f"Snapshot Parquet del dataset (por defecto, el más reciente de {DIR_SNAPSHOTS})")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (por defecto, uno por CPU; 1 = sin pool)")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Plantillas por tarea")
+    parser.add_argument("--cutoff", type=float, default=0.6, help="Sensibilidad del emparejamiento de nombres")
+    parser.add_argument("--min-def", type=int, default=3)
+    parser.add_argument("--max-def", type=int, default=5)
+    parser.add_argument("--min-cen", type=int, default=3)
+    parser.add_argument("--max-cen", type=int, default=5)
+    parser.add_argument("--min-del", type=int, default=1)
+    parser.add_argument("--max-del", type=int, default=3)
+    parser.add_argument("--presupuesto", type=float, default=None, help="Presupuesto máximo del XI en millones")
+    parser.add_argument("--max-por-equipo", type=int, default=None)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    ruta_snapshot = args.snapshot
+    if ruta_snapshot is None:
+        snapshots = listar_snapshots()
+        if not snapshots: parser.error(f"No hay snapshots en {DIR_SNAPSHOTS}; indica uno con --snapshot.")
+        ruta_snapshot = snapshots[-1][1]
+    if not os.path.exists(args.entrada): parser.error(f"No existe la entrada {args.entrada}.")
+
+    opciones = {
+        "cutoff": args.cutoff,
+        "tactica": (args.min_def, args.max_def, args.min_cen, args.max_cen, args.min_del, args.max_del, 1, 11),
+        "presupuesto": args.presupuesto,
+        "max_por_equipo": args.max_por_equipo,
+    }
+    stats = ejecutar_lote(args.entrada, args.salida, ruta_snapshot, opciones, args.procesos, args.lote)
+    print(f"{stats['plantillas']} plantillas en {stats['segundos']:.1f} s "
+          f"({stats['plantillas_por_segundo']:.1f} plantillas/s, {stats['errores']} con error) -> {args.salida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
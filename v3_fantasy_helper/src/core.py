@@ -1,94 +1,95 @@
-# LIBRERÍAS EXTERNAS (difflib para comparación de cadenas, pandas para manejo de datos)
-import difflib
+# LIBRERÍAS EXTERNAS (pandas para manejo de datos, cachetools para memoizar emparejamientos)
+import hashlib, threading
 import pandas as pd
+from cachetools import LRUCache
 
 # LIBRERÍAS INTERNAS
-from .data_utils import normaliza_pos
+from .data_utils import normalizar_posiciones, marcar_normalizado
+from .name_index import indice_nombres, buscar_memoizado
+from .optimizer import resolver_xi
+from .vista_datos import VistaDatos
+from .esquema import es_compacto, expandir_dataframe
 
 # FUNCIONES PRINCIPALES
 
-# Busca el nombre más similar en una Serie de pandas usando difflib
+# Busca el nombre más similar en una Serie de pandas o en una VistaDatos (mismo resultado que difflib, usando un índice
+# precalculado por dataset y memoizando cada búsqueda hasta que cambie el dataset)
 def buscar_nombre_mas_cercano(nombre, serie_nombres, cutoff=0.6):
     if not isinstance(nombre, str) or serie_nombres.empty: return None
-    cand = difflib.get_close_matches(nombre, serie_nombres.tolist(), n=1, cutoff=cutoff)
-    return cand[0] if cand else None
+    indice = serie_nombres.indice if isinstance(serie_nombres, VistaDatos) else indice_nombres(serie_nombres)
+    return buscar_memoizado(indice, nombre, cutoff)
 
-# Empareja el DataFrame de la plantilla del usuario con los datos de LaLiga
+# Columnas del resultado de emparejar_con_datos, en el orden en que se muestran
+COLUMNAS_EMPAREJADO = ["Mi_nombre", "Nombre_web", "Equipo", "Probabilidad", "Probabilidad_num", "Posicion", "Precio", "Imagen_URL", "Perfil_URL"]
+# Emparejamientos contra una VistaDatos por (versión de la vista, huella de la plantilla, cutoff): los reruns con la
+# misma plantilla y los mismos datos no vuelven a emparejar, y un dataset nuevo invalida la entrada por su versión
+_CACHE_EMPAREJADOS = LRUCache(maxsize=64)
+_LOCK_EMPAREJADOS = threading.Lock()
+
+# Huella del contenido de una plantilla (columnas que usa el emparejamiento, con sus tipos)
+def _huella_plantilla(plantilla_df):
+    columnas = [c for c in ("Nombre", "Posicion", "Precio") if c in plantilla_df.columns]
+    huella = hashlib.blake2b(repr([(c, str(plantilla_df[c].dtype)) for c in columnas]).encode("utf-8"), digest_size=16)
+    huella.update(pd.util.hash_pandas_object(plantilla_df[columnas], index=False).to_numpy().tobytes())
+    return huella.digest()
+
+# Empareja el DataFrame de la plantilla del usuario con los datos de LaLiga en lote:
+# 1) coincidencias exactas por diccionario, 2) búsqueda aproximada memoizada solo para los nombres restantes,
+# 3) construcción del resultado con un único merge. `datos_df` puede ser una VistaDatos, que ya trae el deduplicado,
+# los nombres exactos y el índice de búsqueda calculados una sola vez por dataset, o un DataFrame en el esquema compacto
+# (solo se expanden al formato clásico las filas de los jugadores emparejados). Con una VistaDatos el resultado se
+# memoiza por la versión de la vista
 def emparejar_con_datos(plantilla_df, datos_df, cutoff=0.6):
-    encontrados = []
-    no_encontrados = []
-    
-    for _, row in plantilla_df.iterrows():
-        nombre_usuario = str(row.get("Nombre", "")).strip()
-        pos = normaliza_pos(row.get("Posicion"))
-        precio = row.get("Precio", None)
-        
-        if not nombre_usuario or not pos: continue
-        
-        match = buscar_nombre_mas_cercano(nombre_usuario, datos_df["Nombre"], cutoff=cutoff)
-        
-        if match:
-            dj = datos_df[datos_df["Nombre"] == match].iloc[0]
-            encontrados.append({
-                "Mi_nombre": nombre_usuario,
-                "Nombre_web": match,
-                "Equipo": dj["Equipo"],
-                "Probabilidad": dj["Probabilidad"],
-                "Probabilidad_num": dj["Probabilidad_num"],
-                "Posicion": pos,
-                "Precio": precio,
-                "Imagen_URL": dj.get("Imagen_URL"),
-                "Perfil_URL": dj.get("Perfil_URL")
-            })
-        else:
-            no_encontrados.append(nombre_usuario)
-            
-    return pd.DataFrame(encontrados), no_encontrados
+    if plantilla_df.empty: return pd.DataFrame(), []
+    if not isinstance(datos_df, VistaDatos): return _emparejar(plantilla_df, datos_df, cutoff)
+    clave = (datos_df.version, _huella_plantilla(plantilla_df), cutoff)
+    with _LOCK_EMPAREJADOS:
+        resultado = _CACHE_EMPAREJADOS.get(clave)
+    if resultado is None:
+        resultado = _emparejar(plantilla_df, datos_df, cutoff)
+        with _LOCK_EMPAREJADOS:
+            _CACHE_EMPAREJADOS[clave] = resultado
+    df, no_encontrados = resultado
+    return df.copy(), list(no_encontrados)
+
+# Emparejamiento sin memoizar (ver emparejar_con_datos)
+def _emparejar(plantilla_df, datos_df, cutoff):
+    vacia = pd.Series([None] * len(plantilla_df), index=plantilla_df.index, dtype=object)
+    filas = pd.DataFrame({
+        "Mi_nombre": plantilla_df["Nombre"].astype(str).str.strip() if "Nombre" in plantilla_df.columns else "",
+        "Posicion": normalizar_posiciones(plantilla_df["Posicion"]) if "Posicion" in plantilla_df.columns else vacia,
+        "Precio": plantilla_df["Precio"] if "Precio" in plantilla_df.columns else vacia,
+    }).reset_index(drop=True)
+    filas = filas[(filas["Mi_nombre"] != "") & filas["Posicion"].notna()]
+    if filas.empty: return pd.DataFrame(), []
+
+    if isinstance(datos_df, VistaDatos):
+        datos, exactos, indice = datos_df.datos, datos_df.exactos, datos_df.indice
+    else:
+        datos = datos_df.drop_duplicates(subset=["Nombre"], keep="first")
+        exactos = set(datos["Nombre"].tolist())
+        indice = indice_nombres(datos_df["Nombre"]) if not datos_df.empty else None
+    matches = {n: (n if n in exactos else (buscar_memoizado(indice, n, cutoff) if indice else None)) for n in filas["Mi_nombre"].unique()}
+    filas = filas.assign(Nombre_web=filas["Mi_nombre"].map(matches))
 
-# Selecciona el mejor XI posible basándose en la probabilidad y las restricciones tácticas
-def seleccionar_mejor_xi(df, min_def=3, max_def=5, min_cen=3, max_cen=5, min_del=1, max_del=3, num_por=1, total=11):
-    if df.empty: return [], "El dataframe de jugadores está vacío."
-    
-    df = df.copy()
-    df["Posicion"] = df["Posicion"].apply(normaliza_pos)
-    df = df.dropna(subset=["Posicion", "Probabilidad_num"])
-    
-    # Separar jugadores por posición
-    por = df[df["Posicion"] == "POR"].sort_values("Probabilidad_num", ascending=False)
-    defn = df[df["Posicion"] == "DEF"].sort_values("Probabilidad_num", ascending=False)
-    cen = df[df["Posicion"] == "CEN"].sort_values("Probabilidad_num", ascending=False)
-    deln = df[df["Posicion"] == "DEL"].sort_values("Probabilidad_num", ascending=False)
-    
-    # Validaciones previas para una mejor experiencia de usuario
-    if len(por) < num_por: return [], f"No tienes suficientes porteros (necesitas {num_por} y tienes {len(por)})."
-    if len(defn) < min_def: return [], f"No tienes suficientes defensas (necesitas {min_def} y tienes {len(defn)})."
-    if len(cen) < min_cen: return [], f"No tienes suficientes centrocampistas (necesitas {min_cen} y tienes {len(cen)})."
-    if len(deln) < min_del: return [], f"No tienes suficientes delanteros (necesitas {min_del} y tienes {len(deln)})."
+    encontrado = filas["Nombre_web"].notna()
+    no_encontrados = filas.loc[~encontrado, "Mi_nombre"].tolist()
+    if not encontrado.any(): return pd.DataFrame(), no_encontrados
 
-    # Seleccionar jugadores mínimos obligatorios
-    eleccion = []
-    eleccion.extend(por.head(num_por).to_dict("records"))
-    eleccion.extend(defn.head(min_def).to_dict("records"))
-    eleccion.extend(cen.head(min_cen).to_dict("records"))
-    eleccion.extend(deln.head(min_del).to_dict("records"))
-    
-    # Seleccionar el resto de los mejores jugadores hasta completar 11
-    faltan = total - len(eleccion)
-    restos = pd.concat([
-        defn.iloc[min_def:max_def],
-        cen.iloc[min_cen:max_cen],
-        deln.iloc[min_del:max_del]
-    ]).sort_values("Probabilidad_num", ascending=False)
-    
-    if faltan > 0 and not restos.empty:
-        eleccion.extend(restos.head(faltan).to_dict("records"))
-        
-    # Ordenar el XI final por posición para visualización
-    orden_pos = {"POR": 0, "DEF": 1, "CEN": 2, "DEL": 3}
-    eleccion = sorted(eleccion, key=lambda x: orden_pos.get(x.get("Posicion", ""), 99))
-    
-    final_xi = eleccion[:total]
-    if len(final_xi) < total:
-        return [], f"No se pudo completar un XI de {total} jugadores con tu plantilla y táctica. Solo se pudieron seleccionar {len(final_xi)}."
+    if es_compacto(datos): datos = expandir_dataframe(datos[datos["Nombre"].isin(set(matches.values()) - {None})])
+    datos = datos[["Nombre", "Equipo", "Probabilidad", "Probabilidad_num"] + [c for c in ("Imagen_URL", "Perfil_URL") if c in datos.columns]]
+    df = filas[encontrado].merge(datos, left_on="Nombre_web", right_on="Nombre", how="left", sort=False)
+    for c in ("Imagen_URL", "Perfil_URL"):
+        if c not in df.columns: df[c] = None
+    # El precio llega con el tipo de la columna original: se infiere de nuevo con solo los valores emparejados
+    df["Precio"] = pd.Series(df["Precio"].tolist(), index=df.index)
+    return marcar_normalizado(df[COLUMNAS_EMPAREJADO].reset_index(drop=True)), no_encontrados
 
-    return final_xi, None
\ No newline at end of file
+# Selecciona el mejor XI posible basándose en la probabilidad y las restricciones tácticas.
+# Usa el optimizador exacto, que admite un objetivo ponderado (`pesos`), un `presupuesto` y un `max_por_equipo`
+def seleccionar_mejor_xi(df, min_def=3, max_def=5, min_cen=3, max_cen=5, min_del=1, max_del=3, num_por=1, total=11,
+                         pesos=None, presupuesto=None, max_por_equipo=None):
+    solucion, error = resolver_xi(df, min_def, max_def, min_cen, max_cen, min_del, max_del, num_por, total,
+                                  pesos=pesos, presupuesto=presupuesto, max_por_equipo=max_por_equipo)
+    if error: return [], error
+    return solucion.xi, None
@@ -1,6 +1,11 @@
-# IMPORTACIONES DE LIBRERÍAS EXTERNAS (re para expresiones regulares, pandas para manejo de datos)
-import re
+# IMPORTACIONES DE LIBRERÍAS EXTERNAS (re para expresiones regulares, numpy y pandas para manejo de datos, cachetools para memoizar)
+import re, hashlib, threading
+import numpy as np
 import pandas as pd
+from cachetools import LRUCache
+
+# IMPORTACIONES INTERNAS
+from .ingestion import leer_plantilla
 
 # FUNCIONES AUXILIARES
 
@@ -11,66 +16,150 @@ def limpiar_porcentaje(x):
     if not m: return None
     return float(m.group(1).replace(",", "."))
 
+# Precio escrito como en las webs de fantasy: número con coma o punto decimal (o separadores de miles), exponente
+# opcional, unidad opcional (M, mill., millones, K, mil) y símbolo € opcional (ej: '12,5', '12M', '1.2 M€', '60 millones',
+# '500K', '1.200.000 €', '1.2e6')
+_PATRON_PRECIO = re.compile(
+    r"^€?\s*(?P<mantisa>\d+(?:[.,]\d+)*)(?P<exponente>e[+-]?\d+)?\s*(?P<unidad>millones|millón|mill\.?|mil|m|k)?\s*€?$",
+    re.IGNORECASE,
+)
+# A partir de este valor un precio sin unidad se interpreta en euros y no en millones
+UMBRAL_PRECIO_EUROS = 10_000
+
+# Convierte un número escrito con separadores ('12,5', '1.200.000', '1.234,5') a float
+def _numero_con_separadores(texto):
+    separadores = [c for c in texto if c in ".,"]
+    if len(separadores) > 1:
+        if len(set(separadores)) == 1: return float(texto.replace(separadores[0], ""))
+        decimal = separadores[-1]
+        texto = texto.replace("." if decimal == "," else ",", "")
+    return float(texto.replace(",", "."))
+
+# Convierte un precio (número o texto) a millones de euros; NaN si no se reconoce (un precio desconocido no es gratis)
+def precio_a_millones(x):
+    if isinstance(x, bool) or pd.isna(x): return np.nan
+    if isinstance(x, (int, float, np.number)):
+        valor, unidad = float(x), ""
+    else:
+        m = _PATRON_PRECIO.match(str(x).strip())
+        if not m: return np.nan
+        valor = _numero_con_separadores(m.group("mantisa")) * 10 ** int((m.group("exponente") or "e0")[1:])
+        unidad = (m.group("unidad") or "").lower()
+    if unidad.startswith("m") and unidad != "mil": return valor
+    if unidad in ("k", "mil"): return valor / 1_000
+    return valor / 1_000_000 if valor >= UMBRAL_PRECIO_EUROS else valor
+
+# Alias de posición aceptados y su valor estándar
+ALIAS_POSICION = {
+    "POR": "POR", "GK": "POR", "PT": "POR",
+    "DEF": "DEF", "DF": "DEF", "D": "DEF",
+    "CEN": "CEN", "MED": "CEN", "MC": "CEN", "M": "CEN", "MID": "CEN",
+    "DEL": "DEL", "DC": "DEL", "FW": "DEL", "ST": "DEL", "F": "DEL",
+}
+
 # Normaliza una posición de jugador a un valor estándar
 def normaliza_pos(p):
     if not isinstance(p, str): return None
-    p = p.strip().upper()
-    if p in ("POR", "GK", "PT"): return "POR"
-    if p in ("DEF", "DF", "D"): return "DEF"
-    if p in ("CEN", "MED", "MC", "M", "MID"): return "CEN"
-    if p in ("DEL", "DC", "FW", "ST", "F"): return "DEL"
-    return None # Devuelve None si no es una posición reconocida
+    return ALIAS_POSICION.get(p.strip().upper()) # Devuelve None si no es una posición reconocida
+
+# Marca en df.attrs de los DataFrames cuya columna Posicion ya está normalizada (el optimizador no la vuelve a copiar)
+# y valores que puede tener esa columna (las posiciones estándar o None)
+MARCA_NORMALIZADO = "posiciones_normalizadas"
+VALORES_NORMALIZADOS = ["POR", "DEF", "CEN", "DEL", None]
+
+# Versiones vectorizadas para columnas enteras, con el mismo resultado que aplicar las funciones anteriores elemento a
+# elemento: cada valor distinto se traduce una sola vez (una plantilla o un scrape solo tienen unas pocas posiciones y
+# porcentajes distintos) y el resultado se reparte con los códigos de pd.factorize
+def _traducir_valores(serie, funcion, nulo, dtype):
+    codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+    tabla = np.array([funcion(v) for v in valores] + [nulo], dtype=dtype)
+    return pd.Series(tabla[codigos], index=serie.index, name=serie.name, dtype=dtype)
+
+# Convierte una Serie de textos de porcentaje a float (NaN si no hay porcentaje)
+def limpiar_porcentajes(serie):
+    return _traducir_valores(serie, limpiar_porcentaje, np.nan, float)
+
+# Convierte una Serie de precios a millones de euros (NaN si el precio no se reconoce)
+def limpiar_precios(serie):
+    return _traducir_valores(serie, precio_a_millones, np.nan, float)
+
+# Normaliza una Serie de posiciones al valor estándar (None si no es una posición reconocida)
+def normalizar_posiciones(serie):
+    return _traducir_valores(serie, normaliza_pos, None, object)
+
+# Marca el DataFrame como normalizado (Posicion con valores estándar o None) y lo devuelve
+def marcar_normalizado(df):
+    df.attrs[MARCA_NORMALIZADO] = True
+    return df
+
+# True si el DataFrame trae la marca de posiciones normalizadas y su Posicion solo tiene valores estándar. pandas copia
+# df.attrs a los DataFrames derivados (assign, filtros, copy, concat), así que la marca sola no garantiza que nadie haya
+# escrito después alias sin normalizar: se comprueba con un isin, mucho más barato que volver a normalizar
+def esta_normalizado(df):
+    return bool(df.attrs.get(MARCA_NORMALIZADO)) and bool(df["Posicion"].isin(VALORES_NORMALIZADOS).all())
+
+# DataFrame con la columna Posicion normalizada: el mismo objeto si ya está normalizado y, si no, una copia marcada
+def con_posiciones_normalizadas(df):
+    if esta_normalizado(df): return df
+    return marcar_normalizado(df.assign(Posicion=normalizar_posiciones(df["Posicion"])))
+
+# Línea de la plantilla pegada: nombre, separador, posición como palabra completa y, opcionalmente, separador y precio
+# (ej: 'Courtois, POR', 'Pedri MC 12,5', 'Lewandowski;DC;20M'). Se compila una sola vez
+_SEPARADOR = r"(?:\s*[;,\t]\s*|\s+)"
+_ALIAS_REGEX = "|".join(sorted(ALIAS_POSICION, key=len, reverse=True))
+_PATRON_LINEA = re.compile(
+    rf"^(?P<nombre>.+?){_SEPARADOR}(?P<pos>{_ALIAS_REGEX})(?:{_SEPARADOR}(?P<precio>€?\s*\d[\d.,]*\s*(?:M€|€|M|K)?))?\s*[;,]?$",
+    re.IGNORECASE,
+)
+# Respaldo para líneas con texto libre tras la posición ('Pedri, MC, Barcelona', 'Gavi MED (lesionado)',
+# 'Mbappé; DEL; 60 millones'): la primera posición que sea una palabra completa y el resto de la línea, que solo se
+# usa como precio si precio_a_millones lo reconoce
+_PATRON_LINEA_LIBRE = re.compile(
+    rf"^(?P<nombre>.+?){_SEPARADOR}(?P<pos>{_ALIAS_REGEX})(?=$|[\s;,])\s*[;,]?\s*(?P<resto>.*)$",
+    re.IGNORECASE,
+)
+# Resultados de analizar_plantilla_pegada por hash del texto (los reruns con el mismo texto no vuelven a parsear)
+_CACHE_PLANTILLAS_PEGADAS = LRUCache(maxsize=64)
+_LOCK_PLANTILLAS_PEGADAS = threading.Lock()
+
+# Parsea en una sola pasada un texto multilínea con datos de jugadores: normaliza posiciones, descarta nombres repetidos
+# y devuelve (DataFrame, errores) donde errores es una lista de (número de línea, línea, motivo)
+def analizar_plantilla_pegada(texto):
+    clave = hashlib.blake2b(texto.encode("utf-8"), digest_size=16).digest()
+    with _LOCK_PLANTILLAS_PEGADAS:
+        resultado = _CACHE_PLANTILLAS_PEGADAS.get(clave)
+    if resultado is None:
+        filas, errores, vistos = [], [], set()
+        for num, linea in enumerate(texto.splitlines(), start=1):
+            linea = linea.strip()
+            if not linea: continue
+            match = _PATRON_LINEA.match(linea)
+            if match:
+                precio = match.group("precio")
+            else:
+                match = _PATRON_LINEA_LIBRE.match(linea)
+                if not match:
+                    errores.append((num, linea, "No se reconoce el formato 'Nombre, Posición[, Precio]'"))
+                    continue
+                resto = match.group("resto").strip().rstrip(";,").strip()
+                precio = resto if resto and not np.isnan(precio_a_millones(resto)) else None
+            nombre = match.group("nombre").strip()
+            if nombre in vistos:
+                errores.append((num, linea, "Jugador repetido (se ignora)"))
+                continue
+            vistos.add(nombre)
+            filas.append({"Nombre": nombre, "Posicion": ALIAS_POSICION[match.group("pos").upper()], "Precio": precio})
+        resultado = (marcar_normalizado(pd.DataFrame(filas)) if filas else pd.DataFrame(), errores)
+        with _LOCK_PLANTILLAS_PEGADAS:
+            _CACHE_PLANTILLAS_PEGADAS[clave] = resultado
+    df, errores = resultado
+    return df.copy(), list(errores)
 
 # Parsea un texto multilínea con datos de jugadores y lo convierte en un DataFrame
 def parsear_plantilla_pegada(texto):
-    filas = []
-    # Lista extendida de posibles posiciones para la expresión regular
-    pos_regex = "POR|GK|PT|DEF|DF|D|CEN|MED|MC|M|MID|DEL|DC|FW|ST|F"
-
-    for linea in texto.splitlines():
-        linea = linea.strip()
-        if not linea: continue
-
-        # Expresión regular para capturar nombre, posición y precio
-        match = re.match(rf"^(.*?)(?:[;,]|\s+)\s*({pos_regex})\s*(?:[;,]|\s+)?(.*)$", linea, re.IGNORECASE)
-
-        if match:
-            nombre = match.group(1).strip()
-            pos = match.group(2).strip()
-            precio_str = match.group(3).strip() if match.group(3) else None
-            filas.append({"Nombre": nombre, "Posicion": pos, "Precio": precio_str})
-        else:
-            trozos = linea.split()
-            if len(trozos) >= 2:
-                pos = trozos[-1]
-                nombre = " ".join(trozos[:-1])
-                if normaliza_pos(pos): # Usamos la función para verificar si es una posición válida
-                     filas.append({"Nombre": nombre, "Posicion": pos, "Precio": None})
-    
-    if not filas:
-        return pd.DataFrame()
-
-    df = pd.DataFrame(filas)
-    df["Posicion"] = df["Posicion"].apply(normaliza_pos)
-    df = df.drop_duplicates(subset=["Nombre"])
-    return df
+    return analizar_plantilla_pegada(texto)[0]
 
-# Lee un archivo CSV o Excel subido y lo convierte en un DataFrame, renombrando columnas comunes
+# Lee un archivo CSV o Excel subido y lo convierte en un DataFrame con las columnas Nombre, Posicion y Precio
+# (admite las variantes mi_nombre, etc.). El formato se detecta por su firma y el archivo se lee por bloques
 def df_desde_csv_subido(file):
-    try:
-        df = pd.read_csv(file)
-    except Exception:
-        file.seek(0)
-        df = pd.read_excel(file)
-    
-    col_map = {c.lower(): c for c in df.columns}
-    rename = {}
-    
-    for target in ["Nombre", "Posicion", "Precio"]:
-        match = [col_map[k] for k in col_map if k in (target.lower(), f"mi_{target.lower()}")]
-        if match: rename[match[0]] = target
-    df = df.rename(columns=rename)
-    
-    if "Nombre" in df.columns:
-        df = df.drop_duplicates(subset=["Nombre"])
-    return df
\ No newline at end of file
+    return leer_plantilla(file)
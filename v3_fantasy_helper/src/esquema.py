@@ -0,0 +1,65 @@
+# LIBRERIAS EXTERNAS (pandas con cadenas respaldadas por pyarrow)
+import pandas as pd
+
+# ESQUEMA COMPACTO DEL DATASET DE JUGADORES
+# Formato canónico para guardar muchos snapshots y temporadas: Nombre como cadena pyarrow (identificador), Equipo y
+# Posicion categóricas, la probabilidad como entero uint8 (0-100) y cada URL partida en un prefijo categórico (el
+# directorio, compartido por todos los jugadores) y una ruta final corta. El formato clásico (Probabilidad "80%",
+# Probabilidad_num float y URLs completas) se reconstruye solo para las filas que se muestran
+
+POSICIONES = ["POR", "DEF", "CEN", "DEL"]
+COLUMNAS_URL = {"Imagen_URL": "Imagen", "Perfil_URL": "Perfil"}
+CADENA = pd.StringDtype("pyarrow")
+
+
+# True si el DataFrame ya está en el esquema compacto
+def es_compacto(df):
+    return "Prob" in df.columns and "Probabilidad_num" not in df.columns
+
+
+# Probabilidad entera (uint8, 0-100) de cada fila, tanto del esquema clásico como del compacto
+def probabilidades_enteras(df):
+    if es_compacto(df): return df["Prob"]
+    return df["Probabilidad_num"].round().clip(0, 100).astype("uint8")
+
+
+# Parte cada URL en (prefijo hasta la última "/", resto): el prefijo se guarda como categoría. Con una columna sin
+# ninguna URL, rpartition devuelve una sola columna y el resultado son dos columnas vacías
+def _partir_urls(serie):
+    serie = serie.astype(CADENA)
+    if serie.isna().all():
+        return serie.astype("category"), serie
+    partes = serie.str.rpartition("/")
+    return (partes[0] + partes[1]).astype("category"), partes[2].astype(CADENA)
+
+
+# Convierte el DataFrame clásico del scraper al esquema compacto (sin modificar el original)
+def compactar_dataframe(df):
+    if es_compacto(df) or df.empty: return df
+    compacto = pd.DataFrame(index=df.index)
+    compacto["Nombre"] = df["Nombre"].astype(CADENA)
+    compacto["Equipo"] = df["Equipo"].astype("category")
+    if "Posicion" in df.columns:
+        compacto["Posicion"] = pd.Categorical(df["Posicion"], categories=POSICIONES)
+    compacto["Prob"] = probabilidades_enteras(df)
+    for columna, base in COLUMNAS_URL.items():
+        if columna in df.columns:
+            compacto[f"{base}_prefijo"], compacto[f"{base}_ruta"] = _partir_urls(df[columna])
+    return compacto.reset_index(drop=True)
+
+
+# Reconstruye el formato clásico (Probabilidad "80%", Probabilidad_num float, URLs completas) de un DataFrame compacto;
+# se aplica a las filas ya filtradas (jugadores emparejados, registros de la vista) y no al dataset entero
+def expandir_dataframe(df):
+    if not es_compacto(df): return df
+    prob = df["Prob"].to_numpy()
+    columnas = {"Equipo": df["Equipo"].to_numpy(dtype=object), "Nombre": df["Nombre"].to_numpy(dtype=object)}
+    if "Posicion" in df.columns: columnas["Posicion"] = df["Posicion"].to_numpy(dtype=object)
+    columnas["Probabilidad"] = [f"{p}%" for p in prob.tolist()]
+    for columna, base in COLUMNAS_URL.items():
+        if f"{base}_prefijo" in df.columns:
+            columnas[columna] = [None if p is None or r is None else p + r for p, r in zip(
+                df[f"{base}_prefijo"].astype(object).where(df[f"{base}_prefijo"].notna(), None).tolist(),
+                df[f"{base}_ruta"].astype(object).where(df[f"{base}_ruta"].notna(), None).tolist())]
+    columnas["Probabilidad_num"] = prob.astype("float64")
+    return pd.DataFrame(columnas, index=df.index)
@@ -0,0 +1,195 @@
+# LIBRERIAS EXTERNAS (os/glob para los segmentos, bisect para las consultas por tiempo, pandas/pyarrow para Parquet)
+import os, glob, time, bisect, threading, logging
+from datetime import datetime, timezone
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from .esquema import probabilidades_enteras
+from .snapshots import listar_snapshots
+from .scraper import suscribir_actualizaciones
+
+logger = logging.getLogger(__name__)
+
+# Directorio del histórico de probabilidades (configurable con la variable de entorno FANTASY_HISTORIAL_DIR)
+DIR_HISTORIAL = os.environ.get(
+    "FANTASY_HISTORIAL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "historial")
+)
+# Número de segmentos a partir del cual se fusionan en uno solo (sin perder ningún cambio)
+MAX_SEGMENTOS = 200
+# Cambio mínimo (puntos de probabilidad) para considerar que un jugador sube o baja
+CAMBIO_MINIMO = 1
+
+PREFIJO = "cambios_"
+FORMATO_FECHA = "%Y%m%dT%H%M%S%fZ"
+COLUMNAS = ["Nombre", "Equipo", "Momento", "Prob"]
+
+
+class HistorialProbabilidades:
+    """
+    Histórico de solo-añadir de las probabilidades de titularidad. Cada
+    actualización de los datos guarda únicamente los jugadores cuya probabilidad
+    ha cambiado (Nombre, Equipo, Momento en segundos UTC, Prob 0-100) en un
+    segmento Parquet nuevo; cuando hay demasiados segmentos se fusionan en uno.
+    En memoria se guardan los puntos de cada jugador y un registro global ordenado
+    por tiempo, de modo que "qué ha cambiado desde T" solo recorre los cambios
+    posteriores a T y la serie de un jugador no necesita releer ningún snapshot.
+    """
+    def __init__(self, directorio=DIR_HISTORIAL, max_segmentos=MAX_SEGMENTOS):
+        self.directorio = directorio
+        self.max_segmentos = max_segmentos
+        self._puntos = {}
+        self._momentos = []
+        self._claves = []
+        self._lock = threading.RLock()
+        self._cargar()
+
+    # PERSISTENCIA: un fichero cambios_<fecha>.parquet por actualización con cambios
+
+    def _segmentos(self):
+        return sorted(glob.glob(os.path.join(self.directorio, f"{PREFIJO}*.parquet")))
+
+    def _cargar(self):
+        partes = []
+        for ruta in self._segmentos():
+            try:
+                partes.append(pd.read_parquet(ruta, columns=COLUMNAS))
+            except Exception:
+                logger.exception("No se pudo leer el segmento del histórico %s", ruta)
+        if not partes: return
+        cambios = pd.concat(partes, ignore_index=True).drop_duplicates().sort_values("Momento", kind="stable")
+        for nombre, equipo, momento, prob in zip(cambios["Nombre"].tolist(), cambios["Equipo"].tolist(),
+                                                 cambios["Momento"].tolist(), cambios["Prob"].tolist()):
+            self._anadir((nombre, equipo), momento, prob)
+
+    def _escribir(self, cambios, momento):
+        os.makedirs(self.directorio, exist_ok=True)
+        base = os.path.join(self.directorio, f"{PREFIJO}{datetime.fromtimestamp(momento, timezone.utc).strftime(FORMATO_FECHA)}")
+        ruta, n = base + ".parquet", 0
+        while os.path.exists(ruta):
+            n += 1
+            ruta = f"{base}_{n}.parquet"
+        cambios.to_parquet(ruta + ".tmp", index=False)
+        os.replace(ruta + ".tmp", ruta)
+        segmentos = self._segmentos()
+        if len(segmentos) > self.max_segmentos: self._fusionar(segmentos)
+
+    # Reescribe todos los segmentos como uno solo (con el nombre del más reciente) y borra el resto
+    def _fusionar(self, segmentos):
+        todos = pd.concat([pd.read_parquet(r, columns=COLUMNAS) for r in segmentos], ignore_index=True)
+        todos.sort_values("Momento", kind="stable").to_parquet(segmentos[-1] + ".tmp", index=False)
+        os.replace(segmentos[-1] + ".tmp", segmentos[-1])
+        for ruta in segmentos[:-1]:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    def _anadir(self, clave, momento, prob):
+        momentos, probs = self._puntos.setdefault(clave, ([], []))
+        momentos.append(momento)
+        probs.append(prob)
+        self._momentos.append(momento)
+        self._claves.append(clave)
+
+    # REGISTRO
+
+    # Instante del último cambio registrado (0 si el histórico está vacío)
+    def ultimo_momento(self):
+        with self._lock:
+            return self._momentos[-1] if self._momentos else 0.0
+
+    # Registra un DataFrame de LaLiga (clásico o compacto) visto en `momento` (segundos UTC): solo se guardan los
+    # jugadores nuevos o cuya probabilidad ha cambiado. Devuelve el número de cambios registrados
+    def registrar(self, df, momento=None):
+        if df is None or df.empty: return 0
+        nombres, equipos, probs = df["Nombre"].tolist(), df["Equipo"].astype(object).tolist(), probabilidades_enteras(df).tolist()
+        with self._lock:
+            momento = max(time.time() if momento is None else float(momento), self.ultimo_momento())
+            filas = [(nombre, equipo, prob) for nombre, equipo, prob in zip(nombres, equipos, probs)
+                     if self._actual((nombre, equipo)) != prob]
+            if not filas: return 0
+            cambios = pd.DataFrame(filas, columns=["Nombre", "Equipo", "Prob"])
+            cambios.insert(2, "Momento", momento)
+            cambios["Prob"] = cambios["Prob"].astype("uint8")
+            try:
+                self._escribir(cambios, momento)
+            except OSError:
+                logger.exception("No se pudo guardar el histórico de probabilidades")
+            for nombre, equipo, prob in filas:
+                self._anadir((nombre, equipo), momento, prob)
+        return len(filas)
+
+    def _actual(self, clave):
+        puntos = self._puntos.get(clave)
+        return puntos[1][-1] if puntos else None
+
+    # CONSULTAS
+
+    # Probabilidad de un jugador vigente en `momento` (la última conocida si es None); None si aún no había dato
+    def probabilidad(self, nombre, equipo, momento=None):
+        with self._lock:
+            puntos = self._puntos.get((nombre, equipo))
+            if not puntos: return None
+            i = len(puntos[0]) if momento is None else bisect.bisect_right(puntos[0], momento)
+            return puntos[1][i - 1] if i else None
+
+    # Jugadores cuya probabilidad ha cambiado desde `momento` (al menos `minimo` puntos): DataFrame con Nombre, Equipo,
+    # Antes, Ahora, Cambio y Momento (último cambio), ordenado de la mayor subida a la mayor bajada. Los jugadores que
+    # no tenían dato en `momento` no cuentan como cambio
+    def cambios_desde(self, momento, minimo=CAMBIO_MINIMO):
+        with self._lock:
+            inicio = bisect.bisect_right(self._momentos, momento)
+            filas = []
+            for clave in dict.fromkeys(self._claves[inicio:]):
+                momentos, probs = self._puntos[clave]
+                i = bisect.bisect_right(momentos, momento)
+                if i == 0 or abs(probs[-1] - probs[i - 1]) < minimo: continue
+                filas.append((*clave, probs[i - 1], probs[-1], probs[-1] - probs[i - 1], momentos[-1]))
+        cambios = pd.DataFrame(filas, columns=["Nombre", "Equipo", "Antes", "Ahora", "Cambio", "Momento"])
+        return cambios.sort_values(["Cambio", "Nombre"], ascending=[False, True], kind="stable").reset_index(drop=True)
+
+    # Puntos (momento, prob) de un jugador desde `desde` (todos si es None), empezando por el valor vigente en `desde`
+    def serie(self, nombre, equipo, desde=None):
+        with self._lock:
+            puntos = self._puntos.get((nombre, equipo))
+            if not puntos: return []
+            momentos, probs = puntos
+            i = 0 if desde is None else max(bisect.bisect_right(momentos, desde) - 1, 0)
+            return list(zip(momentos[i:], probs[i:]))
+
+    # Valores de probabilidad para dibujar un sparkline de cada (nombre, equipo): {clave: [probs]}
+    def sparklines(self, claves, desde=None):
+        return {clave: [prob for _, prob in self.serie(*clave, desde=desde)] for clave in claves}
+
+    def __len__(self):
+        return len(self._momentos)
+
+
+# Histórico compartido por todas las sesiones del proceso
+_HISTORIAL = None
+_LOCK_HISTORIAL = threading.Lock()
+
+
+# Añade al histórico los snapshots guardados posteriores a su último cambio (p. ej. los de antes de existir el histórico)
+def importar_snapshots(historial, directorio=None):
+    snapshots = listar_snapshots(directorio) if directorio else listar_snapshots()
+    for fecha, ruta in snapshots:
+        if fecha.timestamp() <= historial.ultimo_momento(): continue
+        try:
+            historial.registrar(pd.read_parquet(ruta), fecha.timestamp())
+        except Exception:
+            logger.exception("No se pudo importar el snapshot %s al histórico", ruta)
+
+
+# Devuelve el histórico compartido. La primera vez lo carga, importa los snapshots pendientes y lo suscribe a las
+# actualizaciones de los datos, de modo que cada refresco con cambios añade un segmento
+def historial_probabilidades():
+    global _HISTORIAL
+    with _LOCK_HISTORIAL:
+        if _HISTORIAL is None:
+            historial = HistorialProbabilidades()
+            importar_snapshots(historial)
+            suscribir_actualizaciones(historial.registrar)
+            _HISTORIAL = historial
+    return _HISTORIAL
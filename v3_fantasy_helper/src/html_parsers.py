@@ -0,0 +1,141 @@
+# LIBRERIAS EXTERNAS (BeautifulSoup como motor de referencia, lxml para el motor rápido con XPath compilado)
+import re
+from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+
+# Motores de parseo disponibles: "lxml" (XPath compilado, por defecto) y "bs4" (BeautifulSoup, referencia y respaldo)
+MOTOR_POR_DEFECTO = "lxml"
+
+# Nodos candidatos a contener un jugador y selectores de nombre y probabilidad, por orden de preferencia
+SELECTOR_CANDIDATOS = ".jugador, .player, .player-card, .lista-jugadores .row, .media"
+SELECTORES_NOMBRE = [".nombre", ".name", ".player-name", ".media-body strong", "strong"]
+SELECTORES_PROB = [".probabilidad", ".prob", ".badge", ".player-prob", ".label"]
+PATRON_PROB = re.compile(r"(\d{1,3}\s?%)")
+
+
+# Añade la fila del jugador si se encontraron nombre y probabilidad válidos (común a ambos motores)
+def _anadir_fila(filas, equipo, nombre, prob, imagen_url, perfil_url):
+    if nombre and prob:
+        if "JugadorJugadorJugador" in nombre or "Prob.Prob" in prob: return
+        filas.append({
+            "Equipo": equipo,
+            "Nombre": nombre,
+            "Probabilidad": prob,
+            "Imagen_URL": imagen_url,
+            "Perfil_URL": perfil_url
+        })
+
+
+# MOTOR BS4: recorrido original con selectores CSS sobre el árbol de BeautifulSoup
+
+def parsear_bs4(html, equipo):
+    filas = []
+    soup = BeautifulSoup(html, "lxml")
+    candidates = soup.select(SELECTOR_CANDIDATOS)
+
+    for node in candidates:
+        nombre, prob, imagen_url, perfil_url = None, None, None, None
+        # Búsqueda robusta del nombre
+        for sel in SELECTORES_NOMBRE:
+            tag = node.select_one(sel)
+            if tag and tag.get_text(strip=True):
+                nombre = tag.get_text(strip=True)
+                break
+
+        if not nombre:
+            txt = node.get_text(" ", strip=True)
+            if txt and len(txt.split()) <= 6:
+                nombre = txt.split(" Prob")[0].strip()
+
+        # Búsqueda robusta de la probabilidad
+        for sel in SELECTORES_PROB:
+            tag = node.select_one(sel)
+            if tag and "%" in tag.get_text():
+                prob = tag.get_text(strip=True)
+                break
+
+        if not prob:
+            m = PATRON_PROB.search(node.get_text(" ", strip=True))
+            if m: prob = m.group(1)
+
+        # Búsqueda de imagen y perfil
+        img_tag = node.select_one("img[data-src]")
+        if img_tag:
+            imagen_url = img_tag.get("data-src")
+
+        a_tag = node.select_one("a[href*='/jugadores/']")
+        if a_tag:
+            perfil_url = a_tag.get("href")
+
+        _anadir_fila(filas, equipo, nombre, prob, imagen_url, perfil_url)
+    return filas
+
+
+# MOTOR LXML: mismos selectores traducidos a XPath compilado una sola vez. Cada candidato se resuelve con consultas
+# en C y su texto se extrae una única vez (y solo si hace falta) para los dos respaldos por texto
+
+def _clase(nombre):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {nombre} ')"
+
+
+# Primer descendiente que cumple cada selector (un selector ".a .b" admite el ancestro .a fuera del nodo, como en CSS)
+def _xpath_primero(selector):
+    partes = selector.split()
+    paso = f"*[{_clase(partes[-1][1:])}]" if partes[-1].startswith(".") else partes[-1]
+    if len(partes) == 2: paso += f"[ancestor::*[{_clase(partes[0][1:])}]]"
+    return etree.XPath(f"(.//{paso})[1]")
+
+
+_XPATH_CANDIDATOS = etree.XPath(" | ".join([
+    f"//*[{_clase('jugador')}]", f"//*[{_clase('player')}]", f"//*[{_clase('player-card')}]",
+    f"//*[{_clase('lista-jugadores')}]//*[{_clase('row')}]", f"//*[{_clase('media')}]",
+]))
+_XPATH_NOMBRE = [_xpath_primero(sel) for sel in SELECTORES_NOMBRE]
+_XPATH_PROB = [_xpath_primero(sel) for sel in SELECTORES_PROB]
+_XPATH_IMAGEN = etree.XPath("(.//img[@data-src])[1]/@data-src")
+_XPATH_PERFIL = etree.XPath("(.//a[contains(@href, '/jugadores/')])[1]/@href")
+# Textos de un nodo con la misma semántica que get_text de BeautifulSoup: sin comentarios ni el contenido de
+# script, style, template y anotaciones ruby
+_XPATH_TEXTOS = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template or ancestor::rt or ancestor::rp)]")
+
+
+# Equivalente a tag.get_text(separador, strip=True)
+def _texto(nodo, separador=""):
+    return separador.join(t for t in (s.strip() for s in _XPATH_TEXTOS(nodo)) if t)
+
+
+def parsear_lxml(html, equipo):
+    filas = []
+    raiz = lxml_html.document_fromstring(html)
+
+    for node in _XPATH_CANDIDATOS(raiz):
+        nombre, prob, texto_nodo = None, None, None
+        for xpath in _XPATH_NOMBRE:
+            tag = xpath(node)
+            if tag:
+                nombre = _texto(tag[0])
+                if nombre: break
+
+        if not nombre:
+            texto_nodo = _texto(node, " ")
+            if texto_nodo and len(texto_nodo.split()) <= 6:
+                nombre = texto_nodo.split(" Prob")[0].strip()
+
+        for xpath in _XPATH_PROB:
+            tag = xpath(node)
+            if tag and "%" in "".join(_XPATH_TEXTOS(tag[0])):
+                prob = _texto(tag[0])
+                break
+
+        if not prob:
+            if texto_nodo is None: texto_nodo = _texto(node, " ")
+            m = PATRON_PROB.search(texto_nodo)
+            if m: prob = m.group(1)
+
+        imagen = _XPATH_IMAGEN(node)
+        perfil = _XPATH_PERFIL(node)
+        _anadir_fila(filas, equipo, nombre, prob, str(imagen[0]) if imagen else None, str(perfil[0]) if perfil else None)
+    return filas
+
+
+MOTORES = {"lxml": parsear_lxml, "bs4": parsear_bs4}
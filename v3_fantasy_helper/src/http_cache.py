@@ -0,0 +1,74 @@
+# LIBRERIAS EXTERNAS (hashlib para huellas del HTML, threading para acceso concurrente, dataclasses para las entradas)
+import hashlib, threading, time
+from dataclasses import dataclass, field
+
+# ESTRUCTURAS DE DATOS
+
+# Estado de revalidación de la página de un equipo: validadores HTTP, huella del cuerpo y filas ya parseadas
+@dataclass
+class EntradaEquipo:
+    etag: str = None
+    last_modified: str = None
+    hash_cuerpo: str = None
+    filas: list = field(default_factory=list)
+    actualizado: float = 0.0
+
+
+class CacheRevalidacion:
+    """
+    Guarda, por equipo, el ETag / Last-Modified y la huella del HTML de la última
+    descarga junto con las filas parseadas. Permite enviar peticiones condicionales
+    y reutilizar las filas cuando el servidor responde 304 o el cuerpo no ha cambiado.
+    """
+    def __init__(self):
+        self._entradas = {}
+        self._lock = threading.Lock()
+        self.estadisticas = {"304": 0, "sin_cambios": 0, "parseados": 0}
+
+    def get(self, equipo):
+        with self._lock:
+            return self._entradas.get(equipo)
+
+    # Cabeceras If-None-Match / If-Modified-Since para la próxima petición del equipo
+    def cabeceras_condicionales(self, equipo):
+        entrada = self.get(equipo)
+        cabeceras = {}
+        if entrada is None: return cabeceras
+        if entrada.etag: cabeceras["If-None-Match"] = entrada.etag
+        if entrada.last_modified: cabeceras["If-Modified-Since"] = entrada.last_modified
+        return cabeceras
+
+    # Devuelve las filas del equipo a partir de la respuesta HTTP, parseando solo si el contenido ha cambiado. Si el
+    # parseo no encuentra ningún jugador se devuelve la lista vacía sin tocar la entrada (se conservan las filas buenas
+    # y, como la huella no cambia, la próxima descarga vuelve a parsear)
+    def revalidar(self, equipo, respuesta, parsear):
+        entrada = self.get(equipo)
+        if respuesta.status_code == 304 and entrada is not None:
+            self._actualizar(equipo, entrada, respuesta, entrada.hash_cuerpo, "304")
+            return entrada.filas
+
+        hash_cuerpo = hashlib.blake2b(respuesta.content, digest_size=16).hexdigest()
+        if entrada is not None and entrada.hash_cuerpo == hash_cuerpo:
+            self._actualizar(equipo, entrada, respuesta, hash_cuerpo, "sin_cambios")
+            return entrada.filas
+
+        filas = parsear(respuesta.text, equipo)
+        if not filas: return filas
+        self._actualizar(equipo, EntradaEquipo(filas=filas), respuesta, hash_cuerpo, "parseados")
+        return filas
+
+    # Registra filas ya conocidas (p. ej. de un snapshot) con los validadores y la huella con los que se obtuvieron:
+    # si se conocen, la próxima descarga se revalida sin volver a parsear; si no, se parseará completa
+    def sembrar(self, equipo, filas, momento, etag=None, last_modified=None, hash_cuerpo=None):
+        with self._lock:
+            self._entradas[equipo] = EntradaEquipo(etag=etag, last_modified=last_modified, hash_cuerpo=hash_cuerpo,
+                                                   filas=filas, actualizado=momento)
+
+    def _actualizar(self, equipo, entrada, respuesta, hash_cuerpo, motivo):
+        entrada.etag = respuesta.headers.get("ETag", entrada.etag)
+        entrada.last_modified = respuesta.headers.get("Last-Modified", entrada.last_modified)
+        entrada.hash_cuerpo = hash_cuerpo
+        entrada.actualizado = time.time()
+        with self._lock:
+            self._entradas[equipo] = entrada
+            self.estadisticas[motivo] += 1
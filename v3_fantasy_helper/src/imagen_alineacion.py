@@ -0,0 +1,157 @@
+# LIBRERIAS EXTERNAS (Pillow para dibujar la imagen, cachetools para la caché de imágenes ya generadas)
+import io, threading
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+from cachetools import LRUCache
+
+# LIBRERIAS INTERNAS
+from .output_generators import huella_alineacion, colores_probabilidad, nombre_corto
+from .media import miniaturas_locales, version as version_media
+
+# Medidas (px) del lienzo, las tarjetas y el banquillo
+ANCHO = 1000
+ALTO_CAMPO = 1120
+MARGEN = 30
+ALTO_CABECERA = 70
+ANCHO_TARJETA, ALTO_TARJETA = 150, 196
+LADO_FOTO = 96
+TARJETAS_POR_FILA_BANQUILLO = 5
+# Colores del campo y de las tarjetas
+VERDE_CLARO, VERDE_OSCURO = "#3a8f3f", "#2f7d34"
+BLANCO_LINEAS = (255, 255, 255, 170)
+FONDO = "#f0f2f6"
+TEXTO, TEXTO_SUAVE = "#1f2937", "#6b7280"
+ORDEN_LINEAS = ["DEL", "CEN", "DEF", "POR"]
+
+_CACHE_PNG = LRUCache(maxsize=32)
+_LOCK_PNG = threading.Lock()
+
+
+# Fuente TrueType (DejaVu si está instalada) o la fuente por defecto de Pillow escalada
+def _fuente(tamano, negrita=False):
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold.ttf" if negrita else "DejaVuSans.ttf", tamano)
+    except OSError:
+        return ImageFont.load_default(size=tamano)
+
+
+FUENTES = {
+    "titulo": _fuente(30, True), "formacion": _fuente(22, True), "nombre": _fuente(17, True),
+    "equipo": _fuente(13), "pill": _fuente(13, True), "seccion": _fuente(20, True),
+}
+
+
+# Franjas de césped, bandas, áreas y círculo central
+def _dibujar_campo(lienzo, caja):
+    x0, y0, x1, y1 = caja
+    dibujo = ImageDraw.Draw(lienzo, "RGBA")
+    num_franjas = 10
+    alto_franja = (y1 - y0) / num_franjas
+    for i in range(num_franjas):
+        dibujo.rectangle((x0, y0 + i * alto_franja, x1, y0 + (i + 1) * alto_franja), fill=VERDE_CLARO if i % 2 else VERDE_OSCURO)
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    ancho_area, alto_area = (x1 - x0) * 0.5, (y1 - y0) * 0.14
+    dibujo.rectangle((x0 + 12, y0 + 12, x1 - 12, y1 - 12), outline=BLANCO_LINEAS, width=3)
+    dibujo.line((x0 + 12, cy, x1 - 12, cy), fill=BLANCO_LINEAS, width=3)
+    dibujo.ellipse((cx - 80, cy - 80, cx + 80, cy + 80), outline=BLANCO_LINEAS, width=3)
+    dibujo.rectangle((cx - ancho_area / 2, y0 + 12, cx + ancho_area / 2, y0 + 12 + alto_area), outline=BLANCO_LINEAS, width=3)
+    dibujo.rectangle((cx - ancho_area / 2, y1 - 12 - alto_area, cx + ancho_area / 2, y1 - 12), outline=BLANCO_LINEAS, width=3)
+
+
+# Pega la foto recortada en círculo (o una silueta gris si no hay foto)
+def _pegar_foto(lienzo, foto, x, y):
+    mascara = Image.new("L", (LADO_FOTO, LADO_FOTO), 0)
+    ImageDraw.Draw(mascara).ellipse((0, 0, LADO_FOTO - 1, LADO_FOTO - 1), fill=255)
+    if foto is None:
+        foto = Image.new("RGBA", (LADO_FOTO, LADO_FOTO), "#d1d5db")
+        silueta = ImageDraw.Draw(foto)
+        silueta.ellipse((LADO_FOTO * 0.32, LADO_FOTO * 0.16, LADO_FOTO * 0.68, LADO_FOTO * 0.52), fill="#9ca3af")
+        silueta.ellipse((LADO_FOTO * 0.14, LADO_FOTO * 0.58, LADO_FOTO * 0.86, LADO_FOTO * 1.2), fill="#9ca3af")
+    else:
+        lado = min(foto.size)
+        foto = foto.crop(((foto.width - lado) // 2, 0, (foto.width + lado) // 2, lado)).resize((LADO_FOTO, LADO_FOTO), Image.LANCZOS)
+    lienzo.paste(foto, (int(x), int(y)), ImageChops.multiply(foto.getchannel("A"), mascara))
+
+
+# Texto centrado horizontalmente en `cx`
+def _texto_centrado(dibujo, cx, y, texto, fuente, color):
+    dibujo.text((cx, y), texto, font=fuente, fill=color, anchor="ma")
+
+
+# Tarjeta de un jugador con su esquina superior izquierda en (x, y), con el mismo contenido que la tarjeta HTML
+def _dibujar_tarjeta(lienzo, jugador, foto, x, y):
+    dibujo = ImageDraw.Draw(lienzo, "RGBA")
+    prob = jugador.get("Probabilidad_num", 0) or 0
+    color_bg, color_txt, border_col = colores_probabilidad(prob)
+    dibujo.rounded_rectangle((x + 3, y + 5, x + ANCHO_TARJETA + 3, y + ALTO_TARJETA + 5), radius=14, fill=(0, 0, 0, 60))
+    dibujo.rounded_rectangle((x, y, x + ANCHO_TARJETA, y + ALTO_TARJETA), radius=14, fill="white")
+
+    dibujo.rounded_rectangle((x + 8, y + 8, x + 52, y + 28), radius=9, fill="#e5e7eb")
+    dibujo.text((x + 30, y + 18), str(jugador.get("Posicion", "")), font=FUENTES["pill"], fill=TEXTO, anchor="mm")
+    dibujo.rounded_rectangle((x + ANCHO_TARJETA - 56, y + 8, x + ANCHO_TARJETA - 8, y + 28), radius=9, fill=color_bg)
+    dibujo.text((x + ANCHO_TARJETA - 32, y + 18), f"{int(prob)}%", font=FUENTES["pill"], fill=color_txt, anchor="mm")
+
+    _pegar_foto(lienzo, foto, x + (ANCHO_TARJETA - LADO_FOTO) / 2, y + 34)
+    cx = x + ANCHO_TARJETA / 2
+    _texto_centrado(dibujo, cx, y + 138, nombre_corto(str(jugador.get("Mi_nombre", "N/A"))), FUENTES["nombre"], TEXTO)
+    _texto_centrado(dibujo, cx, y + 160, str(jugador.get("Equipo", "N/A")), FUENTES["equipo"], TEXTO_SUAVE)
+    ancho_barra = (ANCHO_TARJETA - 24) * min(max(prob, 0), 100) / 100
+    if ancho_barra >= 6: dibujo.rounded_rectangle((x + 12, y + ALTO_TARJETA - 14, x + 12 + ancho_barra, y + ALTO_TARJETA - 8), radius=3, fill=border_col)
+
+
+# Coordenadas x de `n` tarjetas repartidas en el ancho disponible (una sola, centrada)
+def _posiciones_x(n, x0, x1):
+    if n == 1: return [(x0 + x1 - ANCHO_TARJETA) / 2]
+    hueco = (x1 - x0 - n * ANCHO_TARJETA) / n
+    return [x0 + hueco / 2 + i * (ANCHO_TARJETA + hueco) for i in range(n)]
+
+
+def _renderizar_png(df_xi, df_banca):
+    xi = df_xi.to_dict("records")
+    banca = df_banca.to_dict("records") if df_banca is not None else []
+    fotos = miniaturas_locales([j.get("Imagen_URL") for j in xi + banca])
+
+    lineas = {pos: [j for j in xi if j.get("Posicion") == pos] for pos in ORDEN_LINEAS}
+    formacion = f"{len(lineas['DEF'])}-{len(lineas['CEN'])}-{len(lineas['DEL'])}"
+    filas_banquillo = -(-len(banca) // TARJETAS_POR_FILA_BANQUILLO)
+    alto_banquillo = 60 + filas_banquillo * (ALTO_TARJETA + 20) if banca else 0
+    lienzo = Image.new("RGBA", (ANCHO, ALTO_CABECERA + ALTO_CAMPO + alto_banquillo + MARGEN), FONDO)
+    dibujo = ImageDraw.Draw(lienzo)
+
+    dibujo.text((MARGEN, ALTO_CABECERA / 2), "Mi XI ideal", font=FUENTES["titulo"], fill=TEXTO, anchor="lm")
+    dibujo.rounded_rectangle((ANCHO - MARGEN - 110, 18, ANCHO - MARGEN, ALTO_CABECERA - 14), radius=12, fill=TEXTO)
+    dibujo.text((ANCHO - MARGEN - 55, ALTO_CABECERA / 2 + 2), formacion, font=FUENTES["formacion"], fill="white", anchor="mm")
+
+    campo = (MARGEN, ALTO_CABECERA, ANCHO - MARGEN, ALTO_CABECERA + ALTO_CAMPO)
+    _dibujar_campo(lienzo, campo)
+    alto_linea = ALTO_CAMPO / len(ORDEN_LINEAS)
+    for i, pos in enumerate(ORDEN_LINEAS):
+        y = campo[1] + i * alto_linea + (alto_linea - ALTO_TARJETA) / 2
+        for jugador, x in zip(lineas[pos], _posiciones_x(len(lineas[pos]), campo[0], campo[2])):
+            _dibujar_tarjeta(lienzo, jugador, fotos.get(jugador.get("Imagen_URL")), x, y)
+
+    if banca:
+        y = campo[3] + 20
+        dibujo.text((ANCHO / 2, y), "BANQUILLO", font=FUENTES["seccion"], fill=TEXTO_SUAVE, anchor="ma")
+        for f in range(filas_banquillo):
+            fila = banca[f * TARJETAS_POR_FILA_BANQUILLO:(f + 1) * TARJETAS_POR_FILA_BANQUILLO]
+            y_fila = y + 40 + f * (ALTO_TARJETA + 20)
+            for jugador, x in zip(fila, _posiciones_x(TARJETAS_POR_FILA_BANQUILLO, MARGEN, ANCHO - MARGEN)[:len(fila)]):
+                _dibujar_tarjeta(lienzo, jugador, fotos.get(jugador.get("Imagen_URL")), x, y_fila)
+
+    salida = io.BytesIO()
+    lienzo.convert("RGB").save(salida, format="PNG", optimize=True)
+    return salida.getvalue()
+
+
+# Imagen PNG de la alineación (campo, tarjetas y banquillo) para compartir, sin navegador: se dibuja con Pillow con
+# las fotos que ya están en local (silueta para el resto) y se guarda por huella de la alineación y versión de las
+# miniaturas, de modo que pedirla otra vez no vuelve a dibujarla salvo que hayan llegado fotos nuevas
+def generar_png_alineacion(df_xi, df_banca=None) -> bytes:
+    clave = (huella_alineacion(df_xi, df_banca), version_media())
+    with _LOCK_PNG:
+        png = _CACHE_PNG.get(clave)
+    if png is None:
+        png = _renderizar_png(df_xi, df_banca)
+        with _LOCK_PNG:
+            _CACHE_PNG[clave] = png
+    return png
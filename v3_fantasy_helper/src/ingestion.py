@@ -0,0 +1,103 @@
+# LIBRERIAS EXTERNAS (pandas para leer CSV por bloques; openpyxl se importa solo al leer un .xlsx)
+import pandas as pd
+
+# Firmas (magic bytes) de los formatos admitidos
+FIRMA_XLSX = b"PK\x03\x04"
+FIRMA_XLS = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+# Columnas que se leen del archivo (admitiendo la variante mi_<columna>) y filas por bloque
+COLUMNAS_PLANTILLA = ["Nombre", "Posicion", "Precio"]
+TAMANO_BLOQUE = 50_000
+
+
+# Detecta el formato del archivo por sus primeros bytes: "xlsx", "xls" o "csv" (deja el puntero al principio)
+def detectar_formato(file):
+    file.seek(0)
+    cabecera = file.read(8)
+    file.seek(0)
+    if cabecera.startswith(FIRMA_XLSX): return "xlsx"
+    if cabecera.startswith(FIRMA_XLS): return "xls"
+    return "csv"
+
+
+# Columnas del archivo que se renombran a Nombre/Posicion/Precio ({original: destino}); sin distinguir mayúsculas
+def columnas_a_leer(columnas):
+    col_map = {str(c).lower(): c for c in columnas}
+    rename = {}
+    for target in COLUMNAS_PLANTILLA:
+        match = [col_map[k] for k in col_map if k in (target.lower(), f"mi_{target.lower()}")]
+        if match: rename[match[0]] = target
+    return rename
+
+
+# Bloques de filas de un CSV con solo las columnas necesarias, todas leídas como texto
+def _bloques_csv(file, tamano_bloque):
+    cabecera = pd.read_csv(file, nrows=0).columns
+    file.seek(0)
+    rename = columnas_a_leer(cabecera)
+    if not rename: return
+    for bloque in pd.read_csv(file, usecols=list(rename), dtype={c: str for c in rename}, chunksize=tamano_bloque):
+        yield bloque.rename(columns=rename)
+
+
+# Bloques de filas de un .xlsx recorriendo la primera hoja en modo solo lectura (sin cargar el libro entero)
+def _bloques_xlsx(file, tamano_bloque):
+    from openpyxl import load_workbook
+    libro = load_workbook(file, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        cabecera = next(filas, None)
+        if cabecera is None: return
+        rename = columnas_a_leer([c for c in cabecera if c is not None])
+        if not rename: return
+        indices = [(i, rename[c]) for i, c in enumerate(cabecera) if c in rename and cabecera.index(c) == i]
+        bloque = []
+        for fila in filas:
+            bloque.append([fila[i] if i < len(fila) else None for i, _ in indices])
+            if len(bloque) == tamano_bloque:
+                yield _bloque_excel(bloque, indices)
+                bloque = []
+        if bloque: yield _bloque_excel(bloque, indices)
+    finally:
+        libro.close()
+
+
+# Convierte filas leídas de Excel en un bloque con las columnas como texto (igual que en el CSV)
+def _bloque_excel(filas, indices):
+    df = pd.DataFrame(filas, columns=[destino for _, destino in indices], dtype=object)
+    return df.apply(lambda s: s.astype(str).where(s.notna()))
+
+
+# Los .xls antiguos no admiten lectura incremental: se leen de una vez pero solo con las columnas necesarias
+def _bloques_xls(file, tamano_bloque):
+    cabecera = pd.read_excel(file, nrows=0).columns
+    file.seek(0)
+    rename = columnas_a_leer(cabecera)
+    if not rename: return
+    yield pd.read_excel(file, usecols=list(rename), dtype={c: str for c in rename}).rename(columns=rename)
+
+
+LECTORES = {"csv": _bloques_csv, "xlsx": _bloques_xlsx, "xls": _bloques_xls}
+
+
+# Lee la plantilla de un archivo subido por bloques, descartando en cada bloque los nombres ya vistos, de modo que
+# la memoria depende del número de jugadores distintos y no del tamaño del archivo
+def leer_plantilla_por_bloques(file, tamano_bloque=TAMANO_BLOQUE):
+    vistos = set()
+    for bloque in LECTORES[detectar_formato(file)](file, tamano_bloque):
+        if "Nombre" in bloque.columns:
+            claves = bloque["Nombre"].fillna("\0")
+            bloque = bloque[~claves.duplicated() & ~claves.isin(vistos)]
+            vistos.update(claves.loc[bloque.index])
+        yield bloque
+
+
+# Lee la plantilla completa de un archivo subido (CSV o Excel). El precio se convierte a número si todos los valores
+# lo son, como haría pandas al inferir tipos
+def leer_plantilla(file, tamano_bloque=TAMANO_BLOQUE):
+    bloques = list(leer_plantilla_por_bloques(file, tamano_bloque))
+    if not bloques: return pd.DataFrame()
+    df = pd.concat(bloques, ignore_index=True)
+    if "Precio" in df.columns:
+        numerico = pd.to_numeric(df["Precio"], errors="coerce")
+        if numerico.notna().sum() == df["Precio"].notna().sum(): df["Precio"] = numerico
+    return df
@@ -0,0 +1,317 @@
+# LIBRERIAS EXTERNAS (Pillow para redimensionar las fotos, cachetools para la caché en memoria)
+import os, io, json, time, atexit, base64, hashlib, threading, logging
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, features
+from cachetools import LRUCache
+
+# LIBRERIAS INTERNAS
+from .scraper import crear_sesion, suscribir_actualizaciones, LimitadorHost, TIMEOUT_PETICION
+
+logger = logging.getLogger(__name__)
+
+# Directorio de miniaturas de las fotos de jugadores (configurable con la variable de entorno FANTASY_MEDIA_DIR)
+DIR_MINIATURAS = os.environ.get(
+    "FANTASY_MEDIA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "miniaturas")
+)
+# Tamaño máximo de la caché en disco (FANTASY_MEDIA_MAX_MB); al superarlo se borran las miniaturas usadas hace más tiempo
+MAX_BYTES_DISCO = int(float(os.environ.get("FANTASY_MEDIA_MAX_MB", 64)) * 1024 * 1024)
+# Lado máximo (px) y calidad de las miniaturas: WebP si Pillow lo soporta, si no JPEG sobre fondo oscuro
+TAMANO_MINIATURA = 128
+CALIDAD = 75
+FORMATO, MIME, EXTENSION = ("WEBP", "image/webp", ".webp") if features.check("webp") else ("JPEG", "image/jpeg", ".jpg")
+FONDO_JPEG = "#1a202c"
+# Descargas simultáneas y tiempo (s) durante el que no se reintenta una foto cuya descarga ha fallado
+MAX_DESCARGAS = 4
+REINTENTO_FALLIDAS = 600
+# Segundos mínimos entre dos escrituras del índice en disco: los cambios intermedios se acumulan y se escriben juntos
+INTERVALO_GUARDADO_INDICE = 5
+# Resolución (s) de la hora de último uso del índice: usos más seguidos no la cambian ni obligan a reescribir el índice
+RESOLUCION_USO = 60
+IMAGEN_POR_DEFECTO = "https://static.futbolfantasy.com/images/default-black.jpg"
+
+
+class AlmacenMiniaturas:
+    """
+    Caché local de las fotos de jugadores. Cada foto se descarga una sola vez, se
+    reduce a una miniatura WebP/JPEG y se guarda en disco con el nombre de la huella
+    de su contenido (las URLs que apuntan a la misma imagen comparten fichero). Un
+    índice JSON relaciona cada URL con su huella y la última vez que se usó; cuando
+    el disco supera `max_bytes` se borran primero las miniaturas usadas hace más tiempo.
+    El índice se reescribe como mucho cada INTERVALO_GUARDADO_INDICE segundos y al
+    terminar cada tanda de descargas, no tras cada miniatura, y solo si algo ha
+    cambiado: la hora de último uso se actualiza con una resolución de RESOLUCION_USO.
+    """
+    def __init__(self, directorio=DIR_MINIATURAS, max_bytes=MAX_BYTES_DISCO, tamano=TAMANO_MINIATURA):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.tamano = tamano
+        self.version = 0
+        self.estadisticas = {"memoria": 0, "disco": 0, "descargas": 0, "fallos": 0, "expulsadas": 0, "escrituras_indice": 0}
+        self._memoria = LRUCache(maxsize=1024)
+        self._fallidas = {}
+        self._lock = threading.RLock()
+        self._sesion = None
+        self._limitador = LimitadorHost()
+        self._indice = self._cargar_indice()
+        self._indice_sucio = False
+        self._ultimo_guardado = 0.0
+
+    # ÍNDICE EN DISCO: {url: {"huella", "bytes", "usado"}} y ficheros objetos/<2 primeros>/<huella><extensión>
+
+    def _ruta_indice(self):
+        return os.path.join(self.directorio, "indice.json")
+
+    def _ruta_objeto(self, huella):
+        return os.path.join(self.directorio, "objetos", huella[:2], huella + EXTENSION)
+
+    def _cargar_indice(self):
+        try:
+            with open(self._ruta_indice(), encoding="utf-8") as f:
+                indice = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {url: e for url, e in indice.items() if os.path.exists(self._ruta_objeto(e["huella"]))}
+
+    def _escribir_indice(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        with open(self._ruta_indice() + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._indice, f)
+        os.replace(self._ruta_indice() + ".tmp", self._ruta_indice())
+
+    # Escribe el índice si tiene cambios pendientes; sin `forzar`, solo si ha pasado INTERVALO_GUARDADO_INDICE desde
+    # la última escritura
+    def guardar_indice(self, forzar=True):
+        with self._lock:
+            if not self._indice_sucio: return
+            if not forzar and time.time() - self._ultimo_guardado < INTERVALO_GUARDADO_INDICE: return
+            try:
+                self._escribir_indice()
+            except OSError:
+                logger.exception("No se pudo guardar el índice de miniaturas")
+                return
+            self._indice_sucio = False
+            self._ultimo_guardado = time.time()
+            self.estadisticas["escrituras_indice"] += 1
+
+    # Bytes ocupados en disco (cada huella cuenta una sola vez)
+    def bytes_en_disco(self):
+        with self._lock:
+            return sum({e["huella"]: e["bytes"] for e in self._indice.values()}.values())
+
+    # Actualiza la hora de último uso de una entrada del índice (y lo marca para guardar) si ha cambiado de verdad
+    def _marcar_uso(self, entrada):
+        ahora = time.time()
+        if ahora - entrada["usado"] < RESOLUCION_USO: return
+        entrada["usado"] = ahora
+        self._indice_sucio = True
+
+    # Miniatura codificada de una URL si ya está en memoria o en disco (sin red); None si no está
+    def local(self, url):
+        with self._lock:
+            datos = self._memoria.get(url)
+            entrada = self._indice.get(url)
+            if datos is not None:
+                # El uso también cuenta para la expulsión del disco aunque la foto se sirva desde memoria
+                if entrada is not None: self._marcar_uso(entrada)
+                self.estadisticas["memoria"] += 1
+                return datos
+        if entrada is None: return None
+        try:
+            with open(self._ruta_objeto(entrada["huella"]), "rb") as f:
+                datos = f.read()
+        except OSError:
+            with self._lock:
+                self._indice.pop(url, None)
+                self._indice_sucio = True
+            return None
+        with self._lock:
+            self._marcar_uso(entrada)
+            self._memoria[url] = datos
+            self.estadisticas["disco"] += 1
+        return datos
+
+    # True si la descarga de la URL ha fallado hace menos de REINTENTO_FALLIDAS segundos (no se vuelve a intentar aún)
+    def fallida_reciente(self, url):
+        return time.time() - self._fallidas.get(url, 0) < REINTENTO_FALLIDAS
+
+    # Miniatura codificada de una URL, descargándola una única vez si no está en local. None si no se puede obtener
+    def obtener(self, url):
+        datos = self.local(url)
+        if datos is not None: return datos
+        if self.fallida_reciente(url): return None
+        datos = self._descargar(url)
+        if datos is None:
+            self._fallidas[url] = time.time()
+            return None
+        self._guardar(url, datos)
+        return datos
+
+    # Descarga en paralelo las miniaturas que faltan de una lista de URLs y guarda el índice una vez al terminar.
+    # Devuelve {url: bytes o None}
+    def obtener_varias(self, urls, max_descargas=MAX_DESCARGAS):
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=max_descargas) as ex:
+            resultado = dict(zip(urls, ex.map(self.obtener, urls)))
+        self.guardar_indice()
+        return resultado
+
+    def _descargar(self, url):
+        if self._sesion is None: self._sesion = crear_sesion()
+        try:
+            with self._limitador.turno(urlparse(url).netloc):
+                r = self._sesion.get(url, timeout=TIMEOUT_PETICION)
+            r.raise_for_status()
+            imagen = Image.open(io.BytesIO(r.content))
+            imagen.thumbnail((self.tamano, self.tamano), Image.LANCZOS)
+            datos = codificar(imagen)
+        except Exception as e:
+            logger.warning("No se pudo descargar la foto %s: %s", url, e)
+            with self._lock: self.estadisticas["fallos"] += 1
+            return None
+        with self._lock: self.estadisticas["descargas"] += 1
+        return datos
+
+    def _guardar(self, url, datos):
+        huella = hashlib.blake2b(datos, digest_size=16).hexdigest()
+        ruta = self._ruta_objeto(huella)
+        with self._lock:
+            try:
+                if not os.path.exists(ruta):
+                    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+                    with open(ruta + ".tmp", "wb") as f: f.write(datos)
+                    os.replace(ruta + ".tmp", ruta)
+                self._indice[url] = {"huella": huella, "bytes": len(datos), "usado": time.time()}
+                self._indice_sucio = True
+                self._expulsar()
+                self.guardar_indice(forzar=False)
+            except OSError:
+                logger.exception("No se pudo guardar la miniatura de %s", url)
+            self._memoria[url] = datos
+            self.version += 1
+
+    # Borra las miniaturas usadas hace más tiempo hasta que el disco vuelve a estar por debajo del límite
+    def _expulsar(self):
+        ultimo_uso, tamanos = {}, {}
+        for e in self._indice.values():
+            ultimo_uso[e["huella"]] = max(ultimo_uso.get(e["huella"], 0), e["usado"])
+            tamanos[e["huella"]] = e["bytes"]
+        total = sum(tamanos.values())
+        if total <= self.max_bytes: return
+        expulsadas = set()
+        for huella in sorted(ultimo_uso, key=ultimo_uso.get):
+            if total <= self.max_bytes: break
+            try:
+                os.remove(self._ruta_objeto(huella))
+            except FileNotFoundError:
+                pass
+            total -= tamanos[huella]
+            expulsadas.add(huella)
+        for url in [u for u, e in self._indice.items() if e["huella"] in expulsadas]:
+            del self._indice[url]
+            self._memoria.pop(url, None)
+        self.estadisticas["expulsadas"] += len(expulsadas)
+
+
+# Reduce una imagen PIL a los bytes de la miniatura (WebP con transparencia o JPEG sobre fondo oscuro)
+def codificar(imagen):
+    salida = io.BytesIO()
+    if FORMATO == "WEBP":
+        if imagen.mode not in ("RGB", "RGBA"): imagen = imagen.convert("RGBA")
+        imagen.save(salida, format="WEBP", quality=CALIDAD, method=4)
+    else:
+        imagen = imagen.convert("RGBA")
+        fondo = Image.new("RGB", imagen.size, FONDO_JPEG)
+        fondo.paste(imagen, mask=imagen.getchannel("A"))
+        fondo.save(salida, format="JPEG", quality=CALIDAD, optimize=True)
+    return salida.getvalue()
+
+
+def _url_valida(url):
+    return url if url and str(url).startswith("http") else IMAGEN_POR_DEFECTO
+
+
+# Almacén compartido por todas las sesiones del proceso, URLs pendientes de precargar (en orden de llegada) y el único
+# hilo que las descarga (el índice pendiente se guarda al salir)
+_ALMACEN = AlmacenMiniaturas()
+_PENDIENTES = {}
+_PRECARGA = None
+_PRECARGA_INICIADA = False
+_LOCK_PRECARGA = threading.Lock()
+atexit.register(lambda: _ALMACEN.guardar_indice())
+
+
+# Miniaturas (PIL RGBA) de varias fotos que ya están en local ({url: imagen o None}). Nunca espera a la red: las que
+# faltan se encargan a la precarga y estarán disponibles (con otra version()) en la siguiente petición
+def miniaturas_locales(urls):
+    urls = list(urls)
+    datos = {u: _ALMACEN.local(u) for u in dict.fromkeys(_url_valida(u) for u in urls)}
+    _encargar([u for u, d in datos.items() if d is None])
+    imagenes = {u: Image.open(io.BytesIO(d)).convert("RGBA") for u, d in datos.items() if d is not None}
+    return {url: imagenes.get(_url_valida(url)) for url in urls}
+
+
+# `src` de una foto para las tarjetas HTML: data URI de la miniatura si ya está en local y, si no, la URL original
+# (nunca espera a la red: la foto se encarga a la precarga y estará lista en las siguientes recargas)
+def src_imagen(url):
+    url = _url_valida(url)
+    datos = _ALMACEN.local(url)
+    if datos is None:
+        _encargar([url])
+        return url
+    return f"data:{MIME};base64,{base64.b64encode(datos).decode('ascii')}"
+
+
+# Contador que cambia cada vez que se añade una miniatura (invalida el HTML memoizado que aún usaba URLs remotas)
+def version():
+    return _ALMACEN.version
+
+
+# Descarga en segundo plano las miniaturas de las URLs que aún no están en local. Devuelve el hilo de precarga (None si
+# no falta ninguna)
+def precargar(urls):
+    return _encargar([u for u in dict.fromkeys(_url_valida(u) for u in urls) if _ALMACEN.local(u) is None])
+
+
+# Añade URLs que no están en local a las pendientes y arranca el hilo de precarga si no está ya en marcha (las URLs
+# cuya descarga acaba de fallar no se encargan hasta que pase REINTENTO_FALLIDAS)
+def _encargar(urls):
+    global _PRECARGA
+    with _LOCK_PRECARGA:
+        for url in urls:
+            if not _ALMACEN.fallida_reciente(url): _PENDIENTES.setdefault(url, None)
+        if _PRECARGA is None and _PENDIENTES:
+            _PRECARGA = threading.Thread(target=_procesar_pendientes, name="fantasy-media", daemon=True)
+            _PRECARGA.start()
+        return _PRECARGA
+
+
+# Bucle del hilo de precarga: descarga por tandas las URLs pendientes (incluidas las que se encargan mientras tanto) y
+# termina cuando no queda ninguna o cuando el proceso se está cerrando
+def _procesar_pendientes():
+    global _PRECARGA
+    while True:
+        with _LOCK_PRECARGA:
+            tanda = list(_PENDIENTES)
+            if not tanda or not threading.main_thread().is_alive():
+                _PRECARGA = None
+                return
+        try:
+            _ALMACEN.obtener_varias(tanda)
+        except Exception:
+            logger.exception("Fallo en la precarga de miniaturas")
+        finally:
+            with _LOCK_PRECARGA:
+                for url in tanda: _PENDIENTES.pop(url, None)
+
+
+# Una sola vez por proceso (los reruns de Streamlit vuelven aquí sin coste): precarga las fotos del dataset actual y
+# se suscribe a las actualizaciones de los datos para precargar las de cada refresco
+def iniciar_precarga(df_laliga):
+    global _PRECARGA_INICIADA
+    with _LOCK_PRECARGA:
+        if _PRECARGA_INICIADA: return
+        suscribir_actualizaciones(lambda df, momento: precargar(df["Imagen_URL"]))
+        _PRECARGA_INICIADA = True
+    if "Imagen_URL" in df_laliga.columns: precargar(df_laliga["Imagen_URL"])
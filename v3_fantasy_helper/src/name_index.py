@@ -0,0 +1,144 @@
+# LIBRERIAS EXTERNAS (difflib para la puntuación exacta, numpy para cotas vectorizadas, unidecode para normalizar nombres, cachetools para la caché LRU)
+import difflib, hashlib, re, threading
+from collections import Counter
+from functools import lru_cache
+import numpy as np
+from unidecode import unidecode
+from cachetools import LRUCache
+
+# Número de candidatos por trigramas que se puntúan primero para acotar la búsqueda
+NUM_SEMILLAS = 5
+# Número máximo de búsquedas memoizadas (compartidas por todas las sesiones del proceso)
+TAMANO_CACHE_BUSQUEDAS = 50_000
+
+
+# Normaliza un nombre para comparaciones: sin acentos, en minúsculas y con los tokens separados por un espacio
+def normalizar_nombre(nombre):
+    if not isinstance(nombre, str): return ""
+    return " ".join(re.findall(r"[a-z0-9]+", unidecode(nombre).lower()))
+
+
+# Trigramas de una clave normalizada (con relleno para dar peso a inicios y finales de palabra)
+def _trigramas(clave):
+    clave = f"  {clave} "
+    return {clave[i:i + 3] for i in range(len(clave) - 2)}
+
+
+class NameIndex:
+    """
+    Índice de nombres de jugadores para buscar el más parecido a uno dado con el
+    mismo resultado que difflib.get_close_matches(nombre, nombres, n=1, cutoff).
+
+    Se construye una vez por dataset y guarda: las claves normalizadas (sin acentos,
+    minúsculas, tokenizadas), un índice invertido de trigramas para generar
+    candidatos y una matriz de frecuencias de caracteres con la que se calcula, de
+    forma vectorizada, la misma cota superior que SequenceMatcher.quick_ratio. Solo
+    se puntúan con SequenceMatcher los candidatos cuya cota puede superar al mejor
+    encontrado, por lo que el resultado es idéntico al de difflib.
+    """
+    def __init__(self, nombres):
+        self.nombres = sorted({n for n in nombres if isinstance(n, str)})
+        self.version = hashlib.blake2b("\x1f".join(self.nombres).encode("utf-8"), digest_size=8).hexdigest()
+        self._exactos = set(self.nombres)
+        self._ids = {n: i for i, n in enumerate(self.nombres)}
+        self._por_clave = {}
+        for n in self.nombres:
+            self._por_clave.setdefault(normalizar_nombre(n), []).append(n)
+
+        alfabeto = sorted({c for n in self.nombres for c in n})
+        self._columna = {c: i for i, c in enumerate(alfabeto)}
+        self._frecuencias = np.zeros((len(self.nombres), len(alfabeto)), dtype=np.int32)
+        for i, n in enumerate(self.nombres):
+            for c, k in Counter(n).items():
+                self._frecuencias[i, self._columna[c]] = k
+        self._longitudes = np.array([len(n) for n in self.nombres], dtype=np.float64)
+
+        trigramas = {}
+        for i, n in enumerate(self.nombres):
+            for t in _trigramas(normalizar_nombre(n)):
+                trigramas.setdefault(t, []).append(i)
+        self._trigramas = {t: np.array(ids, dtype=np.int32) for t, ids in trigramas.items()}
+
+    def __len__(self):
+        return len(self.nombres)
+
+    # Nombres del índice cuya clave normalizada coincide exactamente con la de `nombre`
+    def buscar_normalizado(self, nombre):
+        return list(self._por_clave.get(normalizar_nombre(nombre), []))
+
+    # Cota superior (quick_ratio) de la similitud entre `nombre` y cada nombre del índice
+    def _cotas(self, nombre):
+        cuenta = [(self._columna[c], k) for c, k in Counter(nombre).items() if c in self._columna]
+        if cuenta:
+            columnas, veces = zip(*cuenta)
+            comunes = np.minimum(self._frecuencias[:, list(columnas)], np.array(veces, dtype=np.int32)).sum(axis=1)
+        else:
+            comunes = np.zeros(len(self.nombres), dtype=np.int64)
+        total = self._longitudes + len(nombre)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total > 0, 2.0 * comunes / total, 1.0)
+
+    # Candidatos iniciales: coincidencias exactas por clave normalizada y los nombres con más trigramas
+    # en común con `nombre` (solo sirven para acotar antes la búsqueda, no deciden el resultado)
+    def _semillas(self, nombre, num=NUM_SEMILLAS):
+        semillas = [self._ids[n] for n in self.buscar_normalizado(nombre)]
+        listas = [self._trigramas[t] for t in _trigramas(normalizar_nombre(nombre)) if t in self._trigramas]
+        if listas:
+            votos = np.bincount(np.concatenate(listas), minlength=len(self.nombres))
+            semillas.extend(np.argsort(-votos, kind="stable")[:num].tolist())
+        return semillas
+
+    # Nombre más parecido con similitud >= cutoff (mismo resultado que difflib.get_close_matches con n=1) o None
+    def buscar(self, nombre, cutoff=0.6):
+        if not isinstance(nombre, str) or not self.nombres: return None
+        if nombre in self._exactos: return nombre
+
+        cotas = self._cotas(nombre)
+        sm = difflib.SequenceMatcher()
+        sm.set_seq2(nombre)
+        mejor = (-1.0, None)
+        puntuados = set()
+
+        def puntuar(i):
+            puntuados.add(i)
+            sm.set_seq1(self.nombres[i])
+            return max(mejor, (sm.ratio(), self.nombres[i]))
+
+        for i in self._semillas(nombre):
+            if cotas[i] >= cutoff: mejor = puntuar(i)
+
+        candidatos = np.flatnonzero(cotas >= max(cutoff, mejor[0]))
+        for i in candidatos[np.argsort(-cotas[candidatos], kind="stable")].tolist():
+            if cotas[i] < mejor[0]: break
+            if i not in puntuados: mejor = puntuar(i)
+
+        return mejor[1] if mejor[0] >= cutoff else None
+
+
+@lru_cache(maxsize=8)
+def _indice_cacheado(nombres):
+    return NameIndex(nombres)
+
+
+# Devuelve el índice de una Serie (o lista) de nombres, reutilizándolo mientras el dataset no cambie
+# (tolist convierte de golpe las cadenas pyarrow del esquema compacto en lugar de iterarlas una a una)
+def indice_nombres(serie_nombres):
+    return _indice_cacheado(tuple(serie_nombres.tolist() if hasattr(serie_nombres, "tolist") else serie_nombres))
+
+
+# Caché LRU de búsquedas por (nombre, cutoff, versión del dataset) compartida entre sesiones y reruns
+_CACHE_BUSQUEDAS = LRUCache(maxsize=TAMANO_CACHE_BUSQUEDAS)
+_LOCK_BUSQUEDAS = threading.Lock()
+_SIN_RESULTADO = object()
+
+
+# Igual que indice.buscar, pero cada (nombre, cutoff) se resuelve una sola vez por versión del dataset
+def buscar_memoizado(indice, nombre, cutoff=0.6):
+    clave = (nombre, cutoff, indice.version)
+    with _LOCK_BUSQUEDAS:
+        resultado = _CACHE_BUSQUEDAS.get(clave, _SIN_RESULTADO)
+    if resultado is _SIN_RESULTADO:
+        resultado = indice.buscar(nombre, cutoff)
+        with _LOCK_BUSQUEDAS:
+            _CACHE_BUSQUEDAS[clave] = resultado
+    return resultado
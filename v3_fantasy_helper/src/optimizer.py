@@ -0,0 +1,465 @@
+# LIBRERIAS EXTERNAS (numpy para sumas prefijas, pandas para manejo de datos, heapq para la enumeración best-first)
+import heapq, itertools
+from dataclasses import dataclass, field
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from .data_utils import con_posiciones_normalizadas, limpiar_precios
+
+# Orden de las posiciones en el XI
+POSICIONES = ("POR", "DEF", "CEN", "DEL")
+ORDEN_POS = {"POR": 0, "DEF": 1, "CEN": 2, "DEL": 3}
+# Objetivo por defecto: maximizar la suma de probabilidades de titularidad
+PESOS_POR_DEFECTO = {"Probabilidad_num": 1.0}
+# Resolución con la que se discretiza el presupuesto para calcular cotas (número de cubetas)
+CUBETAS_PRESUPUESTO = 200
+# Máximo de XI que expande la enumeración de los K mejores antes de devolver los encontrados hasta entonces
+MAX_EXPANSIONES = 20_000
+# Formaciones habituales (DEF, CEN, DEL) que se comparan en el barrido
+FORMACIONES_ESTANDAR = ((3, 4, 3), (3, 5, 2), (4, 3, 3), (4, 4, 2), (4, 5, 1), (5, 3, 2), (5, 4, 1))
+
+
+# ESTRUCTURAS DE DATOS
+
+# Resultado de una optimización: jugadores del XI (registros), formación 'DEF-CEN-DEL', valor del objetivo y, con
+# presupuesto, los jugadores que no se han tenido en cuenta por no tener un precio conocido
+@dataclass
+class SolucionXI:
+    xi: list = field(default_factory=list)
+    formacion: str = None
+    puntuacion: float = 0.0
+    sin_precio: list = field(default_factory=list)
+
+
+# Jugadores de una posición ordenados por puntuación descendente, con sus sumas prefijas y datos para restricciones
+@dataclass
+class GrupoPosicion:
+    jugadores: pd.DataFrame
+    puntuaciones: np.ndarray
+    prefijos: np.ndarray
+    precios: np.ndarray
+    equipos: list
+    registros: list = None
+
+    def __post_init__(self):
+        if self.registros is None: self.registros = self.jugadores.to_dict("records")
+
+    def __len__(self):
+        return len(self.puntuaciones)
+
+    # Mejor suma posible eligiendo `k` jugadores a partir del índice `inicio`
+    def mejor_suma(self, k, inicio=0):
+        return self.prefijos[inicio + k] - self.prefijos[inicio]
+
+    # Subgrupo con los jugadores en las posiciones `indices` (manteniendo el orden)
+    def filtrar(self, indices):
+        p = self.puntuaciones[indices]
+        return GrupoPosicion(self.jugadores.iloc[indices], p, np.concatenate([[0.0], np.cumsum(p)]),
+                             self.precios[indices], [self.equipos[i] for i in indices], [self.registros[i] for i in indices])
+
+
+# FUNCIONES AUXILIARES
+
+# Puntuación de cada jugador: combinación lineal de columnas numéricas (ej: {"Probabilidad_num": 1, "Puntos": 0.5})
+def calcular_puntuaciones(df, pesos=None):
+    pesos = pesos or PESOS_POR_DEFECTO
+    total = pd.Series(0.0, index=df.index)
+    for columna, peso in pesos.items():
+        total = total + peso * pd.to_numeric(df[columna], errors="coerce").fillna(0.0)
+    return total
+
+
+# Convierte la columna Precio a millones (acepta '12,5', '12M', '1.2 M€', '500K'...); los precios desconocidos o
+# sin columna Precio son NaN, nunca 0, para que no cuenten como jugadores gratis con presupuesto
+def precios_numericos(df):
+    if "Precio" not in df.columns: return pd.Series(np.nan, index=df.index)
+    return limpiar_precios(df["Precio"])
+
+
+# Nombres de los jugadores con posición y probabilidad cuyo precio no se conoce (se excluyen cuando hay presupuesto)
+def jugadores_sin_precio(df):
+    nombres = df["Mi_nombre"] if "Mi_nombre" in df.columns else df.get("Nombre", pd.Series(df.index.astype(str), index=df.index))
+    validos = df["Posicion"].notna() & df["Probabilidad_num"].notna()
+    return nombres[validos & precios_numericos(df).isna()].tolist()
+
+
+# Índices que ordenan `valores` de mayor a menor con el mismo desempate que Series.sort_values(ascending=False)
+def _orden_descendente(valores):
+    posiciones = np.arange(len(valores))[::-1]
+    return posiciones[valores[::-1].argsort(kind="quicksort")][::-1]
+
+
+# Normaliza posiciones (salvo que el DataFrame ya traiga la marca de normalizado, en cuyo caso no se copia), descarta
+# jugadores sin datos y agrupa por posición ordenando por puntuación. Se indexa por posición con arrays de numpy y los
+# registros se convierten una sola vez para toda la plantilla. Con `con_precio` (hay presupuesto) se descartan también
+# los jugadores sin precio conocido; sin él los precios no intervienen y los desconocidos valen 0
+def preparar_grupos(df, pesos=None, con_precio=False):
+    df = con_posiciones_normalizadas(df)
+    df = df.dropna(subset=["Posicion", "Probabilidad_num"])
+    precios = precios_numericos(df)
+    if con_precio:
+        df, precios = df[precios.notna()], precios[precios.notna()]
+    precios = precios.fillna(0.0).to_numpy(dtype=float)
+    puntuaciones = calcular_puntuaciones(df, pesos).to_numpy(dtype=float)
+    equipos = df["Equipo"].tolist() if "Equipo" in df.columns else [None] * len(df)
+    posiciones = df["Posicion"].to_numpy()
+    registros = df.to_dict("records")
+
+    grupos = {}
+    for pos in POSICIONES:
+        indices = np.flatnonzero(posiciones == pos)
+        orden = indices[_orden_descendente(puntuaciones[indices])]
+        p = puntuaciones[orden]
+        grupos[pos] = GrupoPosicion(
+            jugadores=df.iloc[orden],
+            puntuaciones=p,
+            prefijos=np.concatenate([[0.0], np.cumsum(p)]),
+            precios=precios[orden],
+            equipos=[equipos[i] for i in orden],
+            registros=[registros[i] for i in orden],
+        )
+    return grupos
+
+
+# Formaciones (DEF, CEN, DEL) que respetan los mínimos/máximos, suman el total y caben en la plantilla, en orden de
+# preferencia para los empates: más defensas y, a igualdad, más centrocampistas (el desempate de la selección original,
+# que completaba los huecos libres con los sobrantes ordenados DEF, CEN, DEL)
+def formaciones_posibles(grupos, min_def=3, max_def=5, min_cen=3, max_cen=5, min_del=1, max_del=3, num_por=1, total=11):
+    huecos = total - num_por
+    formaciones = []
+    for d in range(min(max_def, len(grupos["DEF"])), min_def - 1, -1):
+        for c in range(min(max_cen, len(grupos["CEN"])), min_cen - 1, -1):
+            f = huecos - d - c
+            if min_del <= f <= min(max_del, len(grupos["DEL"])):
+                formaciones.append((d, c, f))
+    return formaciones
+
+
+# Valor del mejor XI de una formación sin restricciones adicionales (O(1) gracias a las sumas prefijas)
+def puntuacion_formacion(grupos, formacion, num_por=1):
+    d, c, f = formacion
+    return grupos["POR"].mejor_suma(num_por) + grupos["DEF"].mejor_suma(d) + grupos["CEN"].mejor_suma(c) + grupos["DEL"].mejor_suma(f)
+
+
+# Mejor XI sin restricciones tal y como lo elegía la selección original: los mínimos de cada posición y los huecos
+# libres para los mejores sobrantes (hasta el máximo de cada posición), ordenados juntos (DEF, CEN, DEL) con el mismo
+# desempate que Series.sort_values, de modo que en los empates se elige el mismo XI y en el mismo orden.
+# Devuelve {pos: índices en el orden en que se eligen}
+def _xi_voraz(grupos, minimos, maximos, huecos):
+    elegidos = {pos: list(range(minimos[pos])) for pos in POSICIONES}
+    sobrantes = [(pos, i) for pos in ("DEF", "CEN", "DEL") for i in range(minimos[pos], min(maximos[pos], len(grupos[pos])))]
+    valores = np.array([grupos[pos].puntuaciones[i] for pos, i in sobrantes], dtype=float)
+    for j in _orden_descendente(valores)[:huecos - sum(minimos.values())]:
+        pos, i = sobrantes[j]
+        elegidos[pos].append(i)
+    return elegidos
+
+
+# Registros del XI a partir de los índices elegidos en cada posición, ordenados por posición
+def _registros(grupos, elegidos):
+    xi = []
+    for pos in POSICIONES:
+        xi.extend(dict(grupos[pos].registros[i]) for i in elegidos.get(pos, []))
+    return xi
+
+
+# Descarta los jugadores que nunca pueden estar en un XI óptimo: aquellos con al menos `k` rivales de su posición
+# con mejor o igual puntuación y menor o igual precio (del mismo equipo si hay límite por equipo), ya que siempre
+# queda alguno fuera del XI por el que cambiarlo sin empeorar la solución ni romper restricciones
+def podar_dominados(grupo, k, por_equipo=False):
+    n = len(grupo)
+    if n <= k: return grupo
+    s, p = grupo.puntuaciones, grupo.precios
+    indice = np.arange(n)
+    domina = (s[:, None] >= s[None, :]) & (p[:, None] <= p[None, :]) & (indice[:, None] != indice[None, :])
+    domina &= (s[:, None] > s[None, :]) | (p[:, None] < p[None, :]) | (indice[:, None] < indice[None, :])
+    if por_equipo:
+        equipos = np.array(grupo.equipos, dtype=object)
+        domina &= equipos[:, None] == equipos[None, :]
+    return grupo.filtrar(np.flatnonzero(domina.sum(axis=0) < k))
+
+
+# Para j = 0..k, mejor suma de puntuaciones eligiendo exactamente j jugadores del grupo con coste <= c, para cada c en
+# unidades de presupuesto. Los precios se redondean hacia abajo, por lo que la tabla es siempre una cota superior válida
+def _tabla_presupuesto(grupo, k, unidad, capacidad):
+    tabla = np.full((k + 1, capacidad + 1), -np.inf)
+    tabla[0, :] = 0.0
+    costes = np.floor(grupo.precios / unidad).astype(int)
+    for puntos, coste in zip(grupo.puntuaciones, costes):
+        if coste > capacidad: continue
+        for j in range(k, 0, -1):
+            np.maximum(tabla[j, coste:], tabla[j - 1, :capacidad + 1 - coste] + puntos, out=tabla[j, coste:])
+    return tabla
+
+
+# Índices (c - c1) y máscara c1 <= c de la convolución para un tamaño dado
+@lru_cache(maxsize=4)
+def _indices_convolucion(n):
+    idx = np.arange(n)
+    diferencia = idx[:, None] - idx[None, :]
+    return diferencia.clip(0), diferencia < 0
+
+
+# Convolución (max, +): resultado[c] = max_{c1 <= c} a[c1] + b[c - c1]
+def _convolucion_max(a, b):
+    diferencia, invalida = _indices_convolucion(len(a))
+    matriz = a[None, :] + b[diferencia]
+    matriz[invalida] = -np.inf
+    return matriz.max(axis=1)
+
+
+class CotasPresupuesto:
+    """
+    Cotas superiores con presupuesto ("mochila" por posiciones, ignorando el límite por equipo):
+    para una secuencia de posiciones (pos, k) devuelve, por cada presupuesto restante, la mejor
+    puntuación alcanzable. Las tablas por posición y las combinaciones se calculan una sola vez
+    y se comparten entre todas las formaciones.
+    """
+    def __init__(self, grupos, maximos, presupuesto, cubetas=None):
+        self.cubetas = cubetas or CUBETAS_PRESUPUESTO
+        self.unidad = presupuesto / self.cubetas if presupuesto > 0 else 1.0
+        self.tablas = {pos: _tabla_presupuesto(grupos[pos], k, self.unidad, self.cubetas) for pos, k in maximos.items()}
+        self._memo = {(): np.zeros(self.cubetas + 1)}
+
+    def resto(self, secuencia):
+        secuencia = tuple(secuencia)
+        if secuencia not in self._memo:
+            (pos, k), cola = secuencia[0], secuencia[1:]
+            self._memo[secuencia] = _convolucion_max(self.tablas[pos][k], self.resto(cola))
+        return self._memo[secuencia]
+
+    # Índice de cubeta correspondiente a un presupuesto restante
+    def cubeta(self, restante):
+        return min(int(restante / self.unidad), self.cubetas)
+
+
+# Ramificación y poda dentro de una formación con presupuesto y/o máximo de jugadores por equipo.
+# Las cotas combinan sumas prefijas (sin restricciones) y, con presupuesto, una mochila por posiciones.
+# Devuelve (puntuación, {pos: índices}) del mejor XI que supera `umbral`, o (umbral, None) si no hay ninguno
+def _ramificar_y_podar(grupos, requeridos, umbral, presupuesto=None, max_por_equipo=None, cotas_presupuesto=None):
+    orden = [(pos, k) for pos, k in requeridos if k > 0]
+    # Cota optimista y coste mínimo de las posiciones posteriores a cada una
+    resto_puntos = [0.0] * (len(orden) + 1)
+    resto_coste = [0.0] * (len(orden) + 1)
+    mas_baratos = {pos: np.concatenate([[0.0], np.cumsum(np.sort(grupos[pos].precios))]) for pos, _ in orden}
+    for i in range(len(orden) - 1, -1, -1):
+        pos, k = orden[i]
+        resto_puntos[i] = resto_puntos[i + 1] + grupos[pos].mejor_suma(k)
+        resto_coste[i] = resto_coste[i + 1] + mas_baratos[pos][k]
+
+    # Con presupuesto: mejor puntuación de las posiciones posteriores según el presupuesto restante
+    resto_mochila = None
+    if presupuesto is not None:
+        cotas_presupuesto = cotas_presupuesto or CotasPresupuesto(grupos, dict(orden), presupuesto)
+        resto_mochila = [cotas_presupuesto.resto(orden[i:]) for i in range(len(orden) + 1)]
+        if resto_mochila[0][-1] <= umbral: return umbral, None
+
+    def cota_resto(nivel, restante):
+        if resto_mochila is None: return resto_puntos[nivel]
+        if restante < 0: return -np.inf
+        return resto_mochila[nivel][cotas_presupuesto.cubeta(restante)]
+
+    mejor = [umbral, None]
+    elegidos = {pos: [] for pos, _ in orden}
+    cuentas = {}
+
+    def explorar(nivel, inicio, faltan, puntos, coste):
+        if faltan == 0:
+            nivel, inicio = nivel + 1, 0
+            if nivel == len(orden):
+                if puntos > mejor[0]: mejor[0], mejor[1] = puntos, {p: list(ix) for p, ix in elegidos.items()}
+                return
+            faltan = orden[nivel][1]
+        pos = orden[nivel][0]
+        grupo = grupos[pos]
+        for i in range(inicio, len(grupo) - faltan + 1):
+            # Las puntuaciones están ordenadas: si la cota desde i no mejora, tampoco lo hará desde i+1
+            if puntos + grupo.mejor_suma(faltan, i) + resto_puntos[nivel + 1] <= mejor[0]: return
+            precio = grupo.precios[i]
+            if presupuesto is not None:
+                minimo_pos = mas_baratos[pos][faltan - 1] if faltan > 1 else 0.0
+                if coste + precio + minimo_pos + resto_coste[nivel + 1] > presupuesto: continue
+                restante = presupuesto - coste - precio - minimo_pos
+                if puntos + grupo.puntuaciones[i] + grupo.mejor_suma(faltan - 1, i + 1) + cota_resto(nivel + 1, restante) <= mejor[0]: continue
+            equipo = grupo.equipos[i]
+            if max_por_equipo is not None and equipo is not None and cuentas.get(equipo, 0) >= max_por_equipo: continue
+            elegidos[pos].append(i)
+            cuentas[equipo] = cuentas.get(equipo, 0) + 1
+            explorar(nivel, i + 1, faltan - 1, puntos + grupo.puntuaciones[i], coste + precio)
+            cuentas[equipo] -= 1
+            elegidos[pos].pop()
+
+    if orden: explorar(0, 0, orden[0][1], 0.0, 0.0)
+    return mejor[0], mejor[1]
+
+
+# FUNCIONES PRINCIPALES
+
+# Resuelve de forma exacta el mejor XI: maximiza la suma ponderada de `pesos` respetando la táctica y,
+# opcionalmente, un presupuesto máximo (columna Precio) y un máximo de jugadores por Equipo.
+# Devuelve (SolucionXI, None) o (None, mensaje de error)
+def resolver_xi(df, min_def=3, max_def=5, min_cen=3, max_cen=5, min_del=1, max_del=3, num_por=1, total=11,
+                pesos=None, presupuesto=None, max_por_equipo=None):
+    if df.empty: return None, "El dataframe de jugadores está vacío."
+    grupos = preparar_grupos(df, pesos, con_precio=presupuesto is not None)
+    sin_precio = jugadores_sin_precio(con_posiciones_normalizadas(df)) if presupuesto is not None else []
+    aviso = f" No se han tenido en cuenta {len(sin_precio)} jugadores sin precio conocido: {', '.join(map(str, sin_precio))}." if sin_precio else ""
+
+    # Validaciones previas para una mejor experiencia de usuario
+    if len(grupos["POR"]) < num_por: return None, f"No tienes suficientes porteros (necesitas {num_por} y tienes {len(grupos['POR'])}).{aviso}"
+    if len(grupos["DEF"]) < min_def: return None, f"No tienes suficientes defensas (necesitas {min_def} y tienes {len(grupos['DEF'])}).{aviso}"
+    if len(grupos["CEN"]) < min_cen: return None, f"No tienes suficientes centrocampistas (necesitas {min_cen} y tienes {len(grupos['CEN'])}).{aviso}"
+    if len(grupos["DEL"]) < min_del: return None, f"No tienes suficientes delanteros (necesitas {min_del} y tienes {len(grupos['DEL'])}).{aviso}"
+
+    formaciones = formaciones_posibles(grupos, min_def, max_def, min_cen, max_cen, min_del, max_del, num_por, total)
+    if not formaciones:
+        posibles = num_por + min(max_def, len(grupos["DEF"])) + min(max_cen, len(grupos["CEN"])) + min(max_del, len(grupos["DEL"]))
+        return None, f"No se pudo completar un XI de {total} jugadores con tu plantilla y táctica. Solo se pudieron seleccionar {min(posibles, total)}.{aviso}"
+
+    # Sin restricciones, el mismo XI que la selección original (también en los empates)
+    if presupuesto is None and max_por_equipo is None:
+        elegidos = _xi_voraz(grupos, {"POR": num_por, "DEF": min_def, "CEN": min_cen, "DEL": min_del},
+                             {"POR": num_por, "DEF": max_def, "CEN": max_cen, "DEL": max_del}, total)
+        puntuacion = sum(grupos[pos].puntuaciones[ix].sum() for pos, ix in elegidos.items() if ix)
+        return SolucionXI(_registros(grupos, elegidos), f"{len(elegidos['DEF'])}-{len(elegidos['CEN'])}-{len(elegidos['DEL'])}", float(puntuacion)), None
+
+    # Cota de cada formación sin restricciones; se recorren de mejor a peor (en empate, por orden de preferencia)
+    cotas = sorted(((puntuacion_formacion(grupos, f, num_por), i, f) for i, f in enumerate(formaciones)), key=lambda x: (-x[0], x[1]))
+
+    maximos = {"POR": num_por, "DEF": max(f[0] for f in formaciones), "CEN": max(f[1] for f in formaciones), "DEL": max(f[2] for f in formaciones)}
+    grupos = {pos: podar_dominados(grupos[pos], maximos[pos], por_equipo=max_por_equipo is not None) for pos in POSICIONES}
+    cotas_presupuesto = CotasPresupuesto(grupos, maximos, presupuesto) if presupuesto is not None else None
+    mejor_puntuacion, mejor = -np.inf, None
+    for cota, _, (d, c, f) in cotas:
+        if cota <= mejor_puntuacion: break
+        puntuacion, elegidos = _ramificar_y_podar(grupos, [("POR", num_por), ("DEF", d), ("CEN", c), ("DEL", f)],
+                                                  mejor_puntuacion, presupuesto, max_por_equipo, cotas_presupuesto)
+        if elegidos is not None: mejor_puntuacion, mejor = puntuacion, (elegidos, f"{d}-{c}-{f}")
+
+    if mejor is None:
+        return None, f"Ninguna alineación de tu plantilla cumple las restricciones de presupuesto y jugadores por equipo.{aviso}"
+    return SolucionXI(_registros(grupos, mejor[0]), mejor[1], float(mejor_puntuacion), sin_precio), None
+
+
+# Coste mínimo de cualquier selección alcanzable desde `indices` (ordenados) bajando jugadores en un grupo: el j-ésimo
+# elegido nunca puede tener un índice menor que indices[j]. Se eligen de la restricción más estricta (el último) a la
+# más laxa el jugador más barato aún libre, lo que da el mínimo exacto porque cada tramo [indices[j], n) contiene al
+# siguiente
+def _coste_minimo_alcanzable(grupo, indices, por_precio):
+    usados, coste = set(), 0.0
+    for inicio in reversed(indices):
+        for i in por_precio:
+            if i >= inicio and i not in usados:
+                usados.add(i)
+                coste += grupo.precios[i]
+                break
+    return coste
+
+
+# Enumera los `k` mejores XI distintos (de mayor a menor puntuación) que respetan la táctica, con su formación.
+# Búsqueda best-first sobre las listas ordenadas de cada posición: se parte del mejor XI de cada formación y
+# cada sucesor baja un único jugador al siguiente de su posición que no esté ya elegido, así que los XI salen
+# en orden sin generar combinaciones. Con presupuesto no se encola ningún XI desde el que sea imposible llegar a
+# uno que quepa (coste mínimo alcanzable por posición), y los que no cumplen las restricciones no se devuelven.
+# Como el máximo por equipo no admite una poda equivalente, la búsqueda se corta tras `max_expansiones` XI y devuelve
+# los encontrados hasta entonces (para el mejor XI con restricciones exigentes, resolver_xi es exacto)
+def mejores_xi(df, k=10, min_def=3, max_def=5, min_cen=3, max_cen=5, min_del=1, max_del=3, num_por=1, total=11,
+               pesos=None, presupuesto=None, max_por_equipo=None, max_expansiones=MAX_EXPANSIONES):
+    if df.empty or k <= 0: return []
+    grupos = preparar_grupos(df, pesos, con_precio=presupuesto is not None)
+    if len(grupos["POR"]) < num_por: return []
+    formaciones = formaciones_posibles(grupos, min_def, max_def, min_cen, max_cen, min_del, max_del, num_por, total)
+    if not formaciones: return []
+    if presupuesto is not None or max_por_equipo is not None:
+        # Un jugador con al menos (huecos de su posición + k - 1) rivales que lo dominan no puede estar en ninguno de los
+        # k mejores XI: cambiándolo por cada dominador libre salen k XI válidos distintos que no puntúan menos
+        maximos = {"POR": num_por, "DEF": max(f[0] for f in formaciones), "CEN": max(f[1] for f in formaciones), "DEL": max(f[2] for f in formaciones)}
+        grupos = {pos: podar_dominados(grupos[pos], maximos[pos] + k - 1, por_equipo=max_por_equipo is not None) for pos in POSICIONES}
+
+    # Coste mínimo alcanzable de cada (posición, índices), memoizado: los estados comparten casi todas sus posiciones
+    por_precio = {pos: np.argsort(grupos[pos].precios, kind="stable").tolist() for pos in POSICIONES}
+    costes = {}
+
+    def alcanzable(estado):
+        if presupuesto is None: return True
+        total_minimo = 0.0
+        for pos, indices in zip(POSICIONES, estado):
+            clave = (pos, indices)
+            if clave not in costes: costes[clave] = _coste_minimo_alcanzable(grupos[pos], indices, por_precio[pos])
+            total_minimo += costes[clave]
+        # Tolerancia para los redondeos de sumar los mismos precios en otro orden
+        return total_minimo <= presupuesto + 1e-9
+
+    monticulo, visitados, contador = [], set(), itertools.count()
+    for d, c, f in formaciones:
+        estado = (tuple(range(num_por)), tuple(range(d)), tuple(range(c)), tuple(range(f)))
+        visitados.add(estado)
+        if alcanzable(estado):
+            heapq.heappush(monticulo, (-puntuacion_formacion(grupos, (d, c, f), num_por), next(contador), estado))
+
+    soluciones, expansiones = [], 0
+    while monticulo and len(soluciones) < k and expansiones < max_expansiones:
+        negativo, _, estado = heapq.heappop(monticulo)
+        expansiones += 1
+        elegidos = dict(zip(POSICIONES, (list(ix) for ix in estado)))
+        if _cumple_restricciones(grupos, elegidos, presupuesto, max_por_equipo):
+            formacion = f"{len(estado[1])}-{len(estado[2])}-{len(estado[3])}"
+            soluciones.append(SolucionXI(_registros(grupos, elegidos), formacion, float(-negativo)))
+
+        for p, indices in enumerate(estado):
+            grupo = grupos[POSICIONES[p]]
+            for j, i in enumerate(indices):
+                siguiente = i + 1
+                if siguiente >= len(grupo) or (j + 1 < len(indices) and indices[j + 1] == siguiente): continue
+                nuevo = estado[:p] + (indices[:j] + (siguiente,) + indices[j + 1:],) + estado[p + 1:]
+                if nuevo in visitados: continue
+                visitados.add(nuevo)
+                if not alcanzable(nuevo): continue
+                delta = grupo.puntuaciones[siguiente] - grupo.puntuaciones[i]
+                heapq.heappush(monticulo, (negativo - delta, next(contador), nuevo))
+    return soluciones
+
+
+# Mejor XI de cada formación (por defecto las FORMACIONES_ESTANDAR), ordenados de mejor a peor. Las posiciones se
+# ordenan una sola vez: sin restricciones cada formación cuesta O(1) con las sumas prefijas y, con presupuesto o
+# máximo por equipo, la poda de dominados y las cotas de presupuesto se comparten entre todas las formaciones.
+# Las formaciones que no caben en la plantilla o no cumplen las restricciones no aparecen en el resultado
+def barrer_formaciones(df, formaciones=FORMACIONES_ESTANDAR, num_por=1, total=11, pesos=None, presupuesto=None, max_por_equipo=None):
+    if df.empty: return []
+    grupos = preparar_grupos(df, pesos, con_precio=presupuesto is not None)
+    if len(grupos["POR"]) < num_por: return []
+    formaciones = [f for f in formaciones if sum(f) == total - num_por
+                   and f[0] <= len(grupos["DEF"]) and f[1] <= len(grupos["CEN"]) and f[2] <= len(grupos["DEL"])]
+    if not formaciones: return []
+
+    soluciones = []
+    if presupuesto is None and max_por_equipo is None:
+        for d, c, f in formaciones:
+            elegidos = {"POR": list(range(num_por)), "DEF": list(range(d)), "CEN": list(range(c)), "DEL": list(range(f))}
+            soluciones.append(SolucionXI(_registros(grupos, elegidos), f"{d}-{c}-{f}", float(puntuacion_formacion(grupos, (d, c, f), num_por))))
+    else:
+        maximos = {"POR": num_por, "DEF": max(f[0] for f in formaciones), "CEN": max(f[1] for f in formaciones), "DEL": max(f[2] for f in formaciones)}
+        grupos = {pos: podar_dominados(grupos[pos], maximos[pos], por_equipo=max_por_equipo is not None) for pos in POSICIONES}
+        cotas_presupuesto = CotasPresupuesto(grupos, maximos, presupuesto) if presupuesto is not None else None
+        for d, c, f in formaciones:
+            puntuacion, elegidos = _ramificar_y_podar(grupos, [("POR", num_por), ("DEF", d), ("CEN", c), ("DEL", f)],
+                                                      -np.inf, presupuesto, max_por_equipo, cotas_presupuesto)
+            if elegidos is not None: soluciones.append(SolucionXI(_registros(grupos, elegidos), f"{d}-{c}-{f}", float(puntuacion)))
+    return sorted(soluciones, key=lambda s: -s.puntuacion)
+
+
+# Comprueba el presupuesto y el máximo por equipo de una selección {pos: índices}
+def _cumple_restricciones(grupos, elegidos, presupuesto=None, max_por_equipo=None):
+    if presupuesto is not None:
+        if sum(grupos[pos].precios[ix].sum() for pos, ix in elegidos.items() if ix) > presupuesto: return False
+    if max_por_equipo is not None:
+        cuentas = {}
+        for pos, ix in elegidos.items():
+            for i in ix:
+                equipo = grupos[pos].equipos[i]
+                if equipo is None: continue
+                cuentas[equipo] = cuentas.get(equipo, 0) + 1
+                if cuentas[equipo] > max_por_equipo: return False
+    return True
@@ -0,0 +1,57 @@
+# LIBRERIAS EXTERNAS (threading para el hilo en segundo plano, datetime para la cadencia, logging para errores sin UI)
+import threading, time, logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Cadencia de refresco (s) en días normales y en vísperas de jornada
+CADENCIA_NORMAL = 15*60
+CADENCIA_PREVIA_JORNADA = 5*60
+# Días habituales de partido (0=lunes ... 6=domingo)
+DIAS_JORNADA = (5, 6)
+# Antelación (s) con la que se refresca un equipo antes de que caduque y frecuencia de comprobación del hilo
+MARGEN_REFRESCO = 60
+INTERVALO_COMPROBACION = 15
+
+
+# Cadencia por defecto: más rápida el día antes de un día de partido, cuando más se mueven las probabilidades
+def cadencia_por_defecto(ahora, dias_jornada=DIAS_JORNADA):
+    manana = (ahora.weekday() + 1) % 7
+    return CADENCIA_PREVIA_JORNADA if manana in dias_jornada else CADENCIA_NORMAL
+
+
+class RefrescoSegundoPlano(threading.Thread):
+    """
+    Hilo daemon que mantiene caliente una CacheEquipos: en cada comprobación ajusta
+    el TTL según la función de cadencia y refresca los equipos que van a caducar
+    dentro del margen, antes de que ninguna visita tenga que esperar a la red.
+    La caché sustituye su DataFrame de forma atómica al terminar cada refresco.
+    """
+    def __init__(self, cache, cadencia=cadencia_por_defecto, margen=MARGEN_REFRESCO, intervalo=INTERVALO_COMPROBACION):
+        super().__init__(name="fantasy-prefetch", daemon=True)
+        self.cache = cache
+        self.cadencia = cadencia
+        self.margen = margen
+        self.intervalo = intervalo
+        self.ultimo_ciclo = None
+        self.ultimos_errores = {}
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.is_set():
+            try:
+                self.ciclo()
+            except Exception:
+                logger.exception("Error en el refresco en segundo plano de los datos de LaLiga")
+            self._parar.wait(self.intervalo)
+
+    # Una pasada de refresco: ajusta el TTL y descarga los equipos próximos a caducar
+    def ciclo(self):
+        self.cache.ttl = self.cadencia(datetime.now())
+        equipos = self.cache.equipos_caducados(margen=self.margen)
+        if equipos:
+            self.ultimos_errores = self.cache.refresh_teams(equipos)
+        self.ultimo_ciclo = time.time()
+
+    def detener(self):
+        self._parar.set()
@@ -1,11 +1,24 @@
-# LIBRERIAS EXTERNAS (time y requests para scraping, pandas para manejo de datos, streamlit para UI, BeautifulSoup para parseo HTML)
-import time, re, requests
+# LIBRERIAS EXTERNAS (time, threading y requests para scraping concurrente y caché por equipo, pandas para manejo de datos, streamlit para UI)
+import os, time, threading, logging, requests
+from datetime import datetime, timezone
 import pandas as pd
 import streamlit as st
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 
 # LIBRERIAS INTERNAS
-from .data_utils import limpiar_porcentaje
+from .data_utils import limpiar_porcentajes
+from .html_parsers import MOTORES, MOTOR_POR_DEFECTO, parsear_bs4
+from .http_cache import CacheRevalidacion
+from .prefetch import RefrescoSegundoPlano, cadencia_por_defecto, MARGEN_REFRESCO
+from .snapshots import guardar_snapshot, cargar_ultimo_snapshot
+from .vista_datos import VistaDatos
+from .esquema import compactar_dataframe, expandir_dataframe
+
+logger = logging.getLogger(__name__)
 
 # URLs de los equipos de LaLiga en FutbolFantasy
 EQUIPOS_URLS = {
@@ -34,75 +47,368 @@ EQUIPOS_URLS = {
 # Cabecera de la petición HTTP
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0 Safari/537.36"}
 
-# Función de scraping con caché de Streamlit
-@st.cache_data(ttl=15*60, show_spinner="Cargando datos de jugadores de LaLiga (puede tardar unos segundos)...")
-# Realiza scraping de los datos de probabilidad de los jugadores de todos los equipos de LaLiga
-def scrape_laliga():
-    all_rows = []
-    for equipo, url in EQUIPOS_URLS.items():
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=15)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.text, "lxml")
-            candidates = soup.select(".jugador, .player, .player-card, .lista-jugadores .row, .media")
-            
-            for node in candidates:
-                nombre, prob, imagen_url, perfil_url = None, None, None, None
-                # Búsqueda robusta del nombre
-                for sel in [".nombre", ".name", ".player-name", ".media-body strong", "strong"]:
-                    tag = node.select_one(sel)
-                    if tag and tag.get_text(strip=True):
-                        nombre = tag.get_text(strip=True)
-                        break
-
-                if not nombre:
-                    txt = node.get_text(" ", strip=True)
-                    if txt and len(txt.split()) <= 6:
-                        nombre = txt.split(" Prob")[0].strip()
-
-                # Búsqueda robusta de la probabilidad
-                for sel in [".probabilidad", ".prob", ".badge", ".player-prob", ".label"]:
-                    tag = node.select_one(sel)
-                    if tag and "%" in tag.get_text():
-                        prob = tag.get_text(strip=True)
-                        break
-
-                if not prob:
-                    m = re.search(r"(\d{1,3}\s?%)", node.get_text(" ", strip=True))
-                    if m: prob = m.group(1)
-
-                # Búsqueda de imagen y perfil
-                img_tag = node.select_one("img[data-src]")
-                if img_tag:
-                    imagen_url = img_tag.get("data-src")
-
-                a_tag = node.select_one("a[href*='/jugadores/']")
-                if a_tag:
-                    perfil_url = a_tag.get("href")
-
-                # Añadir si se encontraron ambos datos y son válidos
-                if nombre and prob:
-                    if "JugadorJugadorJugador" in nombre or "Prob.Prob" in prob: continue
-                    all_rows.append({
-                        "Equipo": equipo, 
-                        "Nombre": nombre, 
-                        "Probabilidad": prob,
-                        "Imagen_URL": imagen_url,
-                        "Perfil_URL": perfil_url
-                    })
-            
-            time.sleep(0.2) # Pequeña pausa para no saturar el servidor
-        
-        except requests.exceptions.RequestException as e:
-            st.toast(f"Error al cargar datos de {equipo}: {e}", icon="⚠️")
-            continue
-    
+# Límites de cortesía con el servidor: conexiones simultáneas por host y separación mínima (s) entre inicios de petición
+MAX_CONEXIONES_POR_HOST = 4
+INTERVALO_MIN_POR_HOST = 0.1
+TIMEOUT_PETICION = 15
+# Motor de parseo de las páginas de equipo ("lxml" o "bs4"); FANTASY_PARSER permite cambiarlo sin tocar el código
+MOTOR_PARSEO = os.environ.get("FANTASY_PARSER", MOTOR_POR_DEFECTO)
+
+
+# Controla cuántas peticiones simultáneas recibe cada host y espacia sus inicios (sustituye a las pausas fijas)
+class LimitadorHost:
+    def __init__(self, max_concurrencia=MAX_CONEXIONES_POR_HOST, intervalo_min=INTERVALO_MIN_POR_HOST):
+        self.max_concurrencia = max_concurrencia
+        self.intervalo_min = intervalo_min
+        self._semaforos = {}
+        self._proximo_inicio = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def turno(self, host):
+        with self._lock:
+            semaforo = self._semaforos.setdefault(host, threading.BoundedSemaphore(self.max_concurrencia))
+        with semaforo:
+            with self._lock:
+                ahora = time.monotonic()
+                inicio = max(ahora, self._proximo_inicio.get(host, ahora))
+                self._proximo_inicio[host] = inicio + self.intervalo_min
+            if inicio > ahora: time.sleep(inicio - ahora)
+            yield
+
+
+# Crea una sesión HTTP con conexiones keep-alive reutilizables entre equipos
+def crear_sesion(max_conexiones=MAX_CONEXIONES_POR_HOST):
+    sesion = requests.Session()
+    sesion.headers.update(HEADERS)
+    adaptador = HTTPAdapter(pool_connections=max_conexiones, pool_maxsize=max_conexiones)
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    return sesion
+
+
+# Descarga concurrentemente las páginas de los equipos. Devuelve ({equipo: respuesta HTTP}, {equipo: error})
+def descargar_paginas(urls, sesion=None, limitador=None, timeout=TIMEOUT_PETICION, cabeceras_por_equipo=None):
+    sesion = sesion or crear_sesion()
+    limitador = limitador or LimitadorHost()
+    cabeceras_por_equipo = cabeceras_por_equipo or {}
+
+    def descargar(equipo, url):
+        with limitador.turno(urlsplit(url).netloc):
+            r = sesion.get(url, timeout=timeout, headers=cabeceras_por_equipo.get(equipo))
+        r.raise_for_status()
+        return r
+
+    respuestas, errores = {}, {}
+    if not urls: return respuestas, errores
+    with ThreadPoolExecutor(max_workers=min(len(urls), limitador.max_concurrencia * 2)) as pool:
+        futuros = {equipo: pool.submit(descargar, equipo, url) for equipo, url in urls.items()}
+        for equipo, futuro in futuros.items():
+            try:
+                respuestas[equipo] = futuro.result()
+            except requests.exceptions.RequestException as e:
+                errores[equipo] = str(e)
+    return respuestas, errores
+
+
+# Extrae los jugadores (nombre, probabilidad, imagen y perfil) del HTML de la página de un equipo con el motor indicado
+# (por defecto MOTOR_PARSEO). Si el motor rápido falla con una página o no extrae ningún jugador, se recurre a
+# BeautifulSoup: la equivalencia entre motores solo está comprobada en las páginas de benchmarks/fixtures
+def parsear_equipo(html, equipo, motor=None):
+    motor = motor or MOTOR_PARSEO
+    try:
+        filas = MOTORES[motor](html, equipo)
+    except Exception as e:
+        if motor == "bs4": raise
+        logger.warning("Fallo del parser %s en %s (%s); se usa BeautifulSoup", motor, equipo, e)
+        return parsear_bs4(html, equipo)
+    if not filas and motor != "bs4":
+        filas = parsear_bs4(html, equipo)
+        if filas: logger.warning("El parser %s no extrajo jugadores de %s y BeautifulSoup sí (%d); se usa BeautifulSoup",
+                                 motor, equipo, len(filas))
+    return filas
+
+
+# Construye el DataFrame final (limpieza de probabilidades, duplicados y orden) a partir de las filas de todos los equipos
+def construir_dataframe(all_rows, compacto=False):
     if not all_rows:
         return pd.DataFrame()
 
     df = pd.DataFrame(all_rows).drop_duplicates()
-    df["Probabilidad_num"] = df["Probabilidad"].apply(limpiar_porcentaje)
+    df["Probabilidad_num"] = limpiar_porcentajes(df["Probabilidad"])
     df = df.dropna(subset=["Probabilidad_num"])
-    
+
     df = df.drop_duplicates(subset=['Nombre', 'Equipo']).sort_values("Probabilidad_num", ascending=False)
-    return df.reset_index(drop=True)
\ No newline at end of file
+    df = df.reset_index(drop=True)
+    return compactar_dataframe(df) if compacto else df
+
+
+# Forma canónica de un DataFrame del scraper para comparar contenidos: pasa por el esquema compacto (mismos tipos
+# tanto si viene de un snapshot como de un parseo) y ordena filas y columnas
+def _forma_canonica(df):
+    df = expandir_dataframe(compactar_dataframe(df))
+    return df.sort_values(["Equipo", "Nombre"], kind="stable").reset_index(drop=True)[sorted(df.columns)]
+
+
+# True si dos DataFrames del scraper tienen el mismo contenido aunque difieran el orden de las filas o los tipos
+def mismo_contenido(a, b):
+    if a.empty or b.empty: return a.empty and b.empty
+    if len(a) != len(b) or set(a.columns) != set(b.columns): return False
+    return _forma_canonica(a).equals(_forma_canonica(b))
+
+
+# Descarga y parsea todos los equipos sin pasar por la caché de Streamlit. Devuelve (DataFrame, {equipo: error})
+# Con una CacheRevalidacion se envían peticiones condicionales y solo se parsean los equipos cuya página ha cambiado
+def obtener_datos_laliga(urls=EQUIPOS_URLS, sesion=None, limitador=None, cache=None):
+    cabeceras = {equipo: cache.cabeceras_condicionales(equipo) for equipo in urls} if cache else None
+    respuestas, errores = descargar_paginas(urls, sesion=sesion, limitador=limitador, cabeceras_por_equipo=cabeceras)
+    all_rows = []
+    for equipo in urls:
+        if equipo not in respuestas: continue
+        if cache is None:
+            all_rows.extend(parsear_equipo(respuestas[equipo].text, equipo))
+        else:
+            all_rows.extend(cache.revalidar(equipo, respuestas[equipo], parsear_equipo))
+    return construir_dataframe(all_rows), errores
+
+
+# Tiempo de vida de los datos de cada equipo y espera tras fallos consecutivos (s), con crecimiento exponencial
+TTL_EQUIPO = 15*60
+BACKOFF_BASE = 30
+BACKOFF_MAX = 15*60
+
+
+# Estado de refresco de un equipo: último éxito, fallos consecutivos y momento a partir del cual se puede reintentar
+@dataclass
+class EstadoEquipo:
+    ultimo_ok: float = None
+    fallos: int = 0
+    reintentar_desde: float = 0.0
+    ultimo_error: str = None
+
+
+class CacheEquipos:
+    """
+    Caché por equipo de los datos de LaLiga. Cada equipo tiene su propio TTL y su
+    propio estado de fallos con backoff exponencial, de modo que solo se vuelven a
+    descargar los equipos caducados y, si uno falla, se siguen sirviendo sus
+    últimas filas buenas. Una página que no se puede parsear o que no trae ningún
+    jugador cuenta como fallo, igual que un error HTTP. Las descargas pasan por la
+    caché de revalidación HTTP.
+    """
+    def __init__(self, urls=EQUIPOS_URLS, ttl=TTL_EQUIPO, ttl_por_equipo=None, backoff_base=BACKOFF_BASE,
+                 backoff_max=BACKOFF_MAX, sesion=None, limitador=None):
+        self.urls = dict(urls)
+        self.ttl = ttl
+        self.ttl_por_equipo = dict(ttl_por_equipo or {})
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sesion = sesion or crear_sesion()
+        self.limitador = limitador
+        self.revalidacion = CacheRevalidacion()
+        self._estados = {equipo: EstadoEquipo() for equipo in self.urls}
+        self._df = pd.DataFrame()
+        self._vista = None
+        self._lock_refresco = threading.RLock()
+        self.suscriptores = []
+
+    def estado(self, equipo):
+        return self._estados[equipo]
+
+    # Equipos sin datos o con el TTL vencido (o a menos de `margen` s de vencer) que no están esperando por un fallo reciente
+    def equipos_caducados(self, ahora=None, margen=0):
+        ahora = (time.time() if ahora is None else ahora) + margen
+        caducados = []
+        for equipo, estado in self._estados.items():
+            if ahora - margen < estado.reintentar_desde: continue
+            ttl = self.ttl_por_equipo.get(equipo, self.ttl)
+            if estado.ultimo_ok is None or ahora - estado.ultimo_ok >= ttl:
+                caducados.append(equipo)
+        return caducados
+
+    # Descarga solo los equipos indicados (todos si es None) y recompone el DataFrame. Devuelve {equipo: error}
+    def refresh_teams(self, equipos=None):
+        equipos = list(self.urls) if equipos is None else [e for e in equipos if e in self.urls]
+        if not equipos: return {}
+        with self._lock_refresco:
+            urls = {equipo: self.urls[equipo] for equipo in equipos}
+            cabeceras = {equipo: self.revalidacion.cabeceras_condicionales(equipo) for equipo in urls}
+            respuestas, errores = descargar_paginas(urls, sesion=self.sesion, limitador=self.limitador, cabeceras_por_equipo=cabeceras)
+            ahora = time.time()
+            for equipo in equipos:
+                estado = self._estados[equipo]
+                if equipo in respuestas:
+                    try:
+                        if not self.revalidacion.revalidar(equipo, respuestas[equipo], parsear_equipo):
+                            errores[equipo] = "La página no contiene ningún jugador"
+                    except Exception as e:
+                        logger.exception("No se pudo parsear la página de %s", equipo)
+                        errores[equipo] = f"Error al parsear la página: {e}"
+                if equipo not in errores:
+                    estado.ultimo_ok, estado.fallos, estado.reintentar_desde, estado.ultimo_error = ahora, 0, 0.0, None
+                else:
+                    estado.fallos += 1
+                    estado.ultimo_error = errores[equipo]
+                    estado.reintentar_desde = ahora + min(self.backoff_base * 2 ** (estado.fallos - 1), self.backoff_max)
+            df_nuevo = self._componer()
+            # Si el contenido no cambia se conserva el DataFrame anterior (misma vista, sin snapshot ni notificación)
+            if not mismo_contenido(df_nuevo, self._df):
+                self._df = df_nuevo
+                self._notificar(df_nuevo, ahora)
+        return errores
+
+    # Refresca únicamente los equipos caducados. Devuelve {equipo: error}
+    def refrescar_caducados(self):
+        with self._lock_refresco:
+            return self.refresh_teams(self.equipos_caducados())
+
+    # DataFrame combinado con las últimas filas buenas de cada equipo (no debe modificarse en el sitio)
+    def dataframe(self):
+        return self._df
+
+    # VistaDatos del DataFrame actual: se construye una sola vez por cada DataFrame nuevo y la comparten todas las sesiones
+    def vista(self):
+        df, vista = self._df, self._vista
+        if vista is None or vista.df is not df:
+            vista = VistaDatos(df)
+            self._vista = vista
+        return vista
+
+    # Estado persistible de cada equipo con datos: validadores HTTP, huella de la página y último refresco correcto.
+    # Se guarda junto a cada snapshot para poder restaurarlo con cargar_dataframe
+    def estado_equipos(self):
+        estados = {}
+        for equipo, estado in self._estados.items():
+            entrada = self.revalidacion.get(equipo)
+            if entrada is None or estado.ultimo_ok is None: continue
+            estados[equipo] = {"etag": entrada.etag, "last_modified": entrada.last_modified,
+                               "hash_cuerpo": entrada.hash_cuerpo, "ultimo_ok": estado.ultimo_ok}
+        return estados
+
+    # Inicializa la caché con un DataFrame guardado (p. ej. un snapshot). Con `estados` (ver estado_equipos) se
+    # restauran los validadores, la huella y el último refresco de cada equipo, de modo que la primera revalidación
+    # no vuelve a parsear las páginas que no han cambiado; sin ellos los equipos se consideran refrescados en `momento`
+    def cargar_dataframe(self, df, momento, estados=None):
+        estados = estados or {}
+        with self._lock_refresco:
+            columnas = [c for c in df.columns if c != "Probabilidad_num"]
+            for equipo, grupo in df.groupby("Equipo", sort=False):
+                if equipo not in self.urls: continue
+                estado = estados.get(equipo, {})
+                ultimo_ok = estado.get("ultimo_ok") or momento
+                self.revalidacion.sembrar(equipo, grupo[columnas].to_dict("records"), ultimo_ok, estado.get("etag"),
+                                          estado.get("last_modified"), estado.get("hash_cuerpo"))
+                self._estados[equipo].ultimo_ok = ultimo_ok
+            # Se recompone igual que tras un refresco para que los tipos coincidan con los del siguiente parseo
+            self._df = self._componer()
+
+    # Registra una función f(df, momento) que se llama cada vez que el DataFrame combinado cambia
+    def suscribir(self, funcion):
+        self.suscriptores.append(funcion)
+
+    def _notificar(self, df, momento):
+        for funcion in self.suscriptores:
+            try:
+                funcion(df, momento)
+            except Exception:
+                logger.exception("Error al notificar una actualización de los datos de LaLiga")
+
+    # Resumen del estado de los datos: antigüedad, equipos con datos y equipos con errores
+    def estado_datos(self, ahora=None):
+        ahora = time.time() if ahora is None else ahora
+        exitos = [e.ultimo_ok for e in self._estados.values() if e.ultimo_ok is not None]
+        return {
+            "antiguedad_max": ahora - min(exitos) if exitos else None,
+            "antiguedad_min": ahora - max(exitos) if exitos else None,
+            "equipos_con_datos": len(exitos),
+            "equipos_totales": len(self._estados),
+            "equipos_con_error": {equipo: e.ultimo_error for equipo, e in self._estados.items() if e.fallos},
+            "ttl": self.ttl,
+        }
+
+    def _componer(self):
+        all_rows = []
+        for equipo in self.urls:
+            entrada = self.revalidacion.get(equipo)
+            if entrada is not None: all_rows.extend(entrada.filas)
+        return construir_dataframe(all_rows)
+
+
+# Caché por equipo compartida por todas las sesiones del proceso y su hilo de refresco en segundo plano
+_CACHE_EQUIPOS = CacheEquipos()
+_REFRESCO = None
+_LOCK_REFRESCO = threading.Lock()
+
+
+# Clave de df.attrs con la que se guarda en cada snapshot el estado de los equipos (validadores, huellas, refrescos)
+ATTR_ESTADO_EQUIPOS = "estado_equipos"
+
+
+# Guarda un snapshot Parquet en el esquema compacto cada vez que cambian los datos, con el estado de los equipos en sus
+# metadatos (los errores de disco no deben romper el refresco)
+def _guardar_snapshot(df, momento):
+    try:
+        compacto = compactar_dataframe(df)
+        compacto.attrs[ATTR_ESTADO_EQUIPOS] = _CACHE_EQUIPOS.estado_equipos()
+        guardar_snapshot(compacto, datetime.fromtimestamp(momento, timezone.utc))
+    except OSError:
+        logger.exception("No se pudo guardar el snapshot de los datos de LaLiga")
+
+
+# Carga el snapshot más reciente en la caché (arranque en milisegundos) y activa el guardado de nuevos snapshots
+def _inicializar_snapshots():
+    try:
+        df, fecha = cargar_ultimo_snapshot()
+    except Exception:
+        logger.exception("No se pudo cargar el último snapshot de los datos de LaLiga")
+        df, fecha = None, None
+    if df is not None and not df.empty:
+        estados = df.attrs.pop(ATTR_ESTADO_EQUIPOS, None)
+        _CACHE_EQUIPOS.cargar_dataframe(expandir_dataframe(df), fecha.timestamp(), estados)
+    _CACHE_EQUIPOS.suscribir(_guardar_snapshot)
+
+
+# Arranca (una sola vez por proceso) el hilo que mantiene caliente la caché. `cadencia` permite ajustar el ritmo de refresco
+def iniciar_refresco_segundo_plano(cadencia=cadencia_por_defecto, margen=MARGEN_REFRESCO):
+    global _REFRESCO
+    with _LOCK_REFRESCO:
+        if _REFRESCO is None:
+            _inicializar_snapshots()
+        if _REFRESCO is None or not _REFRESCO.is_alive():
+            _REFRESCO = RefrescoSegundoPlano(_CACHE_EQUIPOS, cadencia=cadencia, margen=margen)
+            _REFRESCO.start()
+    return _REFRESCO
+
+
+# Fuerza el refresco de los equipos indicados en la caché compartida. Devuelve {equipo: error}
+def refresh_teams(equipos):
+    return _CACHE_EQUIPOS.refresh_teams(equipos)
+
+
+# Registra una función f(df, momento) que se llama cada vez que cambian los datos compartidos
+def suscribir_actualizaciones(funcion):
+    _CACHE_EQUIPOS.suscribir(funcion)
+
+
+# Estado de los datos compartidos (antigüedad, errores...) para mostrarlo en la interfaz
+def estado_datos():
+    return _CACHE_EQUIPOS.estado_datos()
+
+
+# Devuelve los datos de probabilidad de los jugadores de LaLiga. Solo bloquea en el primer arranque sin datos ni snapshot;
+# después los equipos se refrescan en segundo plano y la página siempre usa el último DataFrame disponible
+def scrape_laliga():
+    iniciar_refresco_segundo_plano()
+    if _CACHE_EQUIPOS.dataframe().empty:
+        with st.spinner("Cargando datos de jugadores de LaLiga (puede tardar unos segundos)..."):
+            errores = _CACHE_EQUIPOS.refrescar_caducados()
+        for equipo, error in errores.items():
+            st.toast(f"Error al cargar datos de {equipo}: {error}", icon="⚠️")
+    return _CACHE_EQUIPOS.dataframe()
+
+
+# Igual que scrape_laliga, pero devuelve la VistaDatos compartida del DataFrame actual (registros por nombre,
+# nombres ordenados, índices...) en lugar de recalcularla en cada recarga
+def vista_laliga():
+    scrape_laliga()
+    return _CACHE_EQUIPOS.vista()
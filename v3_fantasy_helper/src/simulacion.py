@@ -0,0 +1,97 @@
+# LIBRERIAS EXTERNAS (numpy para el muestreo vectorizado y las convoluciones, pandas para manejo de datos)
+import threading
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+# LIBRERIAS INTERNAS
+from .data_utils import normalizar_posiciones, esta_normalizado
+from .output_generators import huella_alineacion
+
+POSICIONES = ("POR", "DEF", "CEN", "DEL")
+# Número de jornadas simuladas por defecto en el modo Monte Carlo
+NUM_ESCENARIOS = 100_000
+# Resultados de la simulación por huella de la alineación y parámetros (cada rerun de Streamlit no vuelve a simular)
+_CACHE_SIMULACION = LRUCache(maxsize=32)
+_LOCK_SIMULACION = threading.Lock()
+
+
+# Probabilidades (0-1) de los jugadores de cada posición: {pos: (probs del XI, probs del banquillo)}
+def _probabilidades_por_posicion(df_xi, df_banca=None):
+    def por_pos(df):
+        if df is None or df.empty: return {pos: np.zeros(0) for pos in POSICIONES}
+        posiciones = df["Posicion"] if esta_normalizado(df) else normalizar_posiciones(df["Posicion"])
+        probs = pd.to_numeric(df["Probabilidad_num"], errors="coerce").fillna(0.0).clip(0, 100).to_numpy() / 100.0
+        return {pos: probs[(posiciones == pos).to_numpy()] for pos in POSICIONES}
+    xi, banca = por_pos(df_xi), por_pos(df_banca)
+    return {pos: (xi[pos], banca[pos]) for pos in POSICIONES}
+
+
+# Distribución del número de éxitos de ensayos de Bernoulli independientes (Poisson-binomial) por convolución
+def _poisson_binomial(probs):
+    dist = np.ones(1)
+    for p in probs:
+        dist = np.convolve(dist, [1.0 - p, p])
+    return dist
+
+
+# Resumen común a los dos modos a partir de la distribución de jugadores alineados
+def _resumen(distribucion, esperados_xi, total, modo):
+    distribucion = np.pad(distribucion, (0, max(0, total + 1 - len(distribucion))))[:total + 1]
+    return {
+        "modo": modo,
+        "titulares_esperados": float(esperados_xi),
+        "alineados_esperados": float(np.dot(np.arange(len(distribucion)), distribucion)),
+        "prob_xi_completo": float(distribucion[total]),
+        "prob_menos_de_11": float(1.0 - distribucion[total]),
+        "distribucion": distribucion,
+    }
+
+
+# Cálculo exacto: por posición, los alineados son min(huecos, titulares que juegan + suplentes que juegan),
+# con la suma de jugadores que juegan distribuida como Poisson-binomial; las posiciones se combinan por convolución
+def riesgo_analitico(df_xi, df_banca=None):
+    grupos = _probabilidades_por_posicion(df_xi, df_banca)
+    total = len(df_xi)
+    distribucion = np.ones(1)
+    for pos in POSICIONES:
+        xi, banca = grupos[pos]
+        huecos = len(xi)
+        juegan = _poisson_binomial(np.concatenate([xi, banca]))
+        alineados = np.zeros(huecos + 1)
+        alineados[:] = juegan[:huecos + 1]
+        alineados[huecos] += juegan[huecos + 1:].sum()
+        distribucion = np.convolve(distribucion, alineados)
+    esperados = sum(g[0].sum() for g in grupos.values())
+    return _resumen(distribucion, esperados, total, "analitico")
+
+
+# Simulación Monte Carlo: matriz escenarios x jugadores de Bernoulli y cambios automáticos por posición desde el banquillo
+def simular_alineacion(df_xi, df_banca=None, num_escenarios=NUM_ESCENARIOS, semilla=None):
+    grupos = _probabilidades_por_posicion(df_xi, df_banca)
+    total = len(df_xi)
+    rng = np.random.default_rng(semilla)
+    alineados = np.zeros(num_escenarios, dtype=np.int16)
+    titulares = np.zeros(num_escenarios, dtype=np.int16)
+    for pos in POSICIONES:
+        xi, banca = grupos[pos]
+        if len(xi) == 0: continue
+        juegan = rng.random((num_escenarios, len(xi) + len(banca)), dtype=np.float32) < np.concatenate([xi, banca]).astype(np.float32)
+        juegan_xi = juegan[:, :len(xi)].sum(axis=1, dtype=np.int16)
+        titulares += juegan_xi
+        alineados += np.minimum(len(xi), juegan.sum(axis=1, dtype=np.int16))
+    distribucion = np.bincount(alineados, minlength=total + 1) / num_escenarios
+    return _resumen(distribucion, titulares.mean(), total, "montecarlo")
+
+
+# Simulación Monte Carlo memoizada por huella de la alineación y parámetros: mientras no cambien el XI, el banquillo,
+# el número de escenarios o la semilla, se devuelve el mismo resultado sin volver a simular
+def simular_alineacion_memoizada(df_xi, df_banca=None, num_escenarios=NUM_ESCENARIOS, semilla=None):
+    clave = (huella_alineacion(df_xi, df_banca), num_escenarios, semilla)
+    with _LOCK_SIMULACION:
+        riesgo = _CACHE_SIMULACION.get(clave)
+    if riesgo is None:
+        riesgo = simular_alineacion(df_xi, df_banca, num_escenarios, semilla)
+        with _LOCK_SIMULACION:
+            _CACHE_SIMULACION[clave] = riesgo
+    return riesgo
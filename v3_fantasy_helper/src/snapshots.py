@@ -0,0 +1,79 @@
+# LIBRERIAS EXTERNAS (os y glob para ficheros, datetime para marcas de tiempo, pandas/pyarrow para Parquet)
+import os, glob
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+
+# Directorio de snapshots (configurable con la variable de entorno FANTASY_SNAPSHOTS_DIR)
+DIR_SNAPSHOTS = os.environ.get(
+    "FANTASY_SNAPSHOTS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "snapshots")
+)
+# Retención: días que se conservan los snapshots y número máximo de ficheros
+RETENCION_DIAS = 14
+MAX_SNAPSHOTS = 500
+
+PREFIJO = "laliga_"
+FORMATO_FECHA = "%Y%m%dT%H%M%SZ"
+
+
+# Ruta del snapshot correspondiente a un instante (UTC)
+def _ruta_snapshot(momento, directorio):
+    return os.path.join(directorio, f"{PREFIJO}{momento.strftime(FORMATO_FECHA)}.parquet")
+
+
+# Lista los snapshots disponibles como [(fecha UTC, ruta)] ordenados del más antiguo al más reciente
+def listar_snapshots(directorio=DIR_SNAPSHOTS):
+    snapshots = []
+    for ruta in glob.glob(os.path.join(directorio, f"{PREFIJO}*.parquet")):
+        try:
+            momento = datetime.strptime(os.path.basename(ruta)[len(PREFIJO):-len(".parquet")], FORMATO_FECHA)
+        except ValueError:
+            continue
+        snapshots.append((momento.replace(tzinfo=timezone.utc), ruta))
+    return sorted(snapshots)
+
+
+# Guarda el DataFrame como snapshot Parquet con marca de tiempo (escritura atómica) y aplica la retención
+def guardar_snapshot(df, momento=None, directorio=DIR_SNAPSHOTS, retencion_dias=RETENCION_DIAS, max_snapshots=MAX_SNAPSHOTS):
+    momento = (momento or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    os.makedirs(directorio, exist_ok=True)
+    ruta = _ruta_snapshot(momento, directorio)
+    temporal = ruta + ".tmp"
+    df.to_parquet(temporal, index=False)
+    os.replace(temporal, ruta)
+    aplicar_retencion(directorio, retencion_dias, max_snapshots, ahora=momento)
+    return ruta
+
+
+# Borra los snapshots más antiguos que la retención o que excedan el número máximo (nunca el más reciente)
+def aplicar_retencion(directorio=DIR_SNAPSHOTS, retencion_dias=RETENCION_DIAS, max_snapshots=MAX_SNAPSHOTS, ahora=None):
+    snapshots = listar_snapshots(directorio)
+    if not snapshots: return []
+    ahora = ahora or datetime.now(timezone.utc)
+    limite = ahora - timedelta(days=retencion_dias) if retencion_dias is not None else None
+    sobrantes = len(snapshots) - max_snapshots if max_snapshots is not None else 0
+    borrados = []
+    for i, (momento, ruta) in enumerate(snapshots[:-1]):
+        if i < sobrantes or (limite is not None and momento < limite):
+            try:
+                os.remove(ruta)
+                borrados.append(ruta)
+            except OSError:
+                pass
+    return borrados
+
+
+# Carga el snapshot más reciente anterior o igual a `momento` (el último si es None). Devuelve (DataFrame, fecha) o (None, None)
+def cargar_snapshot(momento=None, directorio=DIR_SNAPSHOTS):
+    snapshots = listar_snapshots(directorio)
+    if momento is not None:
+        momento = momento.astimezone(timezone.utc) if momento.tzinfo else momento.replace(tzinfo=timezone.utc)
+        snapshots = [s for s in snapshots if s[0] <= momento]
+    if not snapshots: return None, None
+    fecha, ruta = snapshots[-1]
+    return pd.read_parquet(ruta), fecha
+
+
+# Atajo para cargar el snapshot más reciente
+def cargar_ultimo_snapshot(directorio=DIR_SNAPSHOTS):
+    return cargar_snapshot(None, directorio)
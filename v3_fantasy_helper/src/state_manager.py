@@ -33,6 +33,40 @@ def initialize_session_state(localS):
         st.session_state.previous_plantilla = st.session_state.plantilla_bloques.copy()
 
 
+# Valor de una clave de localStorage que aún no se puede leer: en la primera ejecución de la sesión el componente
+# todavía no ha respondido y localStorage se ve vacío (distinto de None, que es "la clave no existe")
+LECTURA_PENDIENTE = object()
+
+
+# Valor de una clave de localStorage, None si no existe o LECTURA_PENDIENTE si el componente aún no ha respondido. Se
+# considera leído cuando trae algún dato o a partir del primer rerun de la sesión (la respuesta del componente lo provoca)
+def _leer_local(localS, clave):
+    valor = localS.getItem(clave)
+    if valor is not None or localS.getAll(): return valor
+    if not st.session_state.get("local_storage_esperado"):
+        st.session_state.local_storage_esperado = True
+        return LECTURA_PENDIENTE
+    return None
+
+
+def registrar_visita(localS):
+    """
+    Guarda en el estado de la sesión el momento de la visita anterior (leído de
+    localStorage al empezar la sesión) y anota la visita actual, para poder
+    mostrar los cambios de probabilidad desde la última vez que se usó la app.
+    La visita actual solo se escribe después de haber leído la anterior: mientras
+    localStorage no ha respondido no se toca, para no sobrescribirla.
+    """
+    if "ultima_visita" not in st.session_state:
+        guardada = _leer_local(localS, "fantasy_ultima_visita")
+        if guardada is LECTURA_PENDIENTE: return
+        try:
+            st.session_state.ultima_visita = float(guardada)
+        except (TypeError, ValueError):
+            st.session_state.ultima_visita = None
+        localS.setItem("fantasy_ultima_visita", str(time.time()), key="set_ultima_visita")
+
+
 def autosave_plantilla(localS):
     """
     Compara la plantilla actual con la guardada previamente y, si hay cambios,
@@ -4,14 +4,16 @@ import pandas as pd
 import time
 
 # FUNCIONES INTERNAS
-from src.data_utils import parsear_plantilla_pegada, df_desde_csv_subido
+from src.data_utils import analizar_plantilla_pegada, df_desde_csv_subido
 from src.core import emparejar_con_datos, buscar_nombre_mas_cercano
 from src.state_manager import handle_player_deletion_from_url, confirm_player_delete_dialog
+from src.media import src_imagen
 
 # FUNCIONES PRINCIPALES DE RENDERIZADO DE LA PESTAÑA DE ENTRADA
-def render_input_tabs(nombres_laliga, df_laliga, cutoff):
+def render_input_tabs(nombres_laliga, vista, cutoff):
     """
     Renderiza la pestaña "Introduce tu Plantilla" con sus tres métodos de entrada.
+    `vista` es la VistaDatos compartida de los datos de LaLiga.
     Devuelve el DataFrame de la plantilla del usuario.
     """
     st.header("Añade los jugadores de tu equipo")
@@ -23,13 +25,16 @@ def render_input_tabs(nombres_laliga, df_laliga, cutoff):
 
     # MÉTODO 1: UNO A UNO
     with input_method_tab1:
-        df_plantilla = render_manual_input_method(nombres_laliga, df_laliga)
+        df_plantilla = render_manual_input_method(nombres_laliga, vista)
 
     # MÉTODO 2: Pegar lista
     with input_method_tab2:
         texto_plantilla = st.text_area("Pega tu plantilla aquí (Ej: `Courtois, POR`)", height=250, help="Formato: Nombre, Posición. Un jugador por línea.")
         if texto_plantilla:
-            df_plantilla = parsear_plantilla_pegada(texto_plantilla)
+            df_plantilla, errores = analizar_plantilla_pegada(texto_plantilla)
+            if errores:
+                with st.expander(f"⚠️ {len(errores)} líneas no se han podido usar", expanded=len(errores) <= 5):
+                    st.markdown("\n".join(f"- **Línea {num}:** `{linea}` — {motivo}" for num, linea, motivo in errores))
 
     # MÉTODO 3: SUBIR ARCHIVO
     with input_method_tab3:
@@ -43,7 +48,7 @@ def render_input_tabs(nombres_laliga, df_laliga, cutoff):
 
     # PROCESAMIENTO COMÚN para métodos 2 y 3
     if not df_plantilla.empty and (input_method_tab2 or input_method_tab3):
-        process_and_display_pasted_or_uploaded(df_plantilla, df_laliga, cutoff)
+        process_and_display_pasted_or_uploaded(df_plantilla, vista, cutoff)
 
     # Comprobación general del número de jugadores
     if not df_plantilla.empty and len(df_plantilla) < 11:
@@ -54,7 +59,7 @@ def render_input_tabs(nombres_laliga, df_laliga, cutoff):
     return df_plantilla
 
 
-def render_manual_input_method(nombres_laliga, df_laliga):
+def render_manual_input_method(nombres_laliga, vista):
     """
     Renderiza la UI y gestiona la lógica para el método de entrada "Uno a uno".
     """
@@ -88,7 +93,7 @@ def render_manual_input_method(nombres_laliga, df_laliga):
         st.success("✅ Plantilla guardada automáticamente")
         st.divider()
         st.header("Mi plantilla")
-        render_player_cards(st.session_state.plantilla_bloques, df_laliga)
+        render_player_cards(st.session_state.plantilla_bloques, vista)
         
         df_plantilla = pd.DataFrame(st.session_state.plantilla_bloques)
         if not df_plantilla.empty:
@@ -99,13 +104,11 @@ def render_manual_input_method(nombres_laliga, df_laliga):
     return pd.DataFrame()
 
 
-def render_player_cards(plantilla_bloques, df_laliga):
+def render_player_cards(plantilla_bloques, vista):
     """
     Renderiza las tarjetas de jugador para la lista de plantilla manual.
+    Los datos de cada jugador salen de los registros ya precalculados de la vista.
     """
-    # Asegurar que no hay duplicados por nombre antes de crear el dict
-    df_laliga = df_laliga.drop_duplicates(subset=['Nombre'], keep='first')
-    df_laliga_data = df_laliga.set_index('Nombre').to_dict('index')
     pos_order = ["POR", "DEF", "CEN", "DEL"]
     pos_names = {"POR": "Porteros", "DEF": "Defensas", "CEN": "Centrocampistas", "DEL": "Delanteros"}
     pos_colors = {
@@ -122,7 +125,7 @@ def render_player_cards(plantilla_bloques, df_laliga):
             for jugador in players_in_pos:
                 nombre_jugador = jugador.get('Nombre', 'N/A')
                 posicion = jugador.get('Posicion', 'N/A')
-                laliga_info = df_laliga_data.get(nombre_jugador, {})
+                laliga_info = vista.registros.get(nombre_jugador, {})
                 
                 nombre_display = nombre_jugador
                 if len(nombre_display) > 12:
@@ -138,7 +141,7 @@ def render_player_cards(plantilla_bloques, df_laliga):
                             f'<svg xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke-width="2.5" stroke="currentColor"><path stroke-linecap="round" stroke-linejoin="round" d="M6 18L18 6M6 6l12 12" /></svg>'
                         f'</a>'
                         f'<div class="player-card-plantilla">'
-                            f'<div class="player-image-small"><img src="{laliga_info.get("Imagen_URL", "https://static.futbolfantasy.com/images/default-black.jpg")}" alt="{nombre_display}" onerror="this.onerror=null;this.src=\'https://static.futbolfantasy.com/images/default-black.jpg\';"></div>'
+                            f'<div class="player-image-small"><img src="{src_imagen(laliga_info.get("Imagen_URL"))}" alt="{nombre_display}" onerror="this.onerror=null;this.src=\'https://static.futbolfantasy.com/images/default-black.jpg\';"></div>'
                             f'<div class="card-body"><div class="p-name">{nombre_display}</div><div class="p-team">{laliga_info.get("Equipo", "")}</div></div>'
                             f'<div class="pos-pill-footer" style="background-color: {bg_color}; color: {text_color};">{posicion}</div>'
                         f'</div>'
@@ -149,7 +152,7 @@ def render_player_cards(plantilla_bloques, df_laliga):
             st.markdown(f'<div style="display:flex; flex-wrap:wrap; gap:12px; justify-content:flex-start; padding: 10px 0;">{" ".join(cards_html_list)}</div>', unsafe_allow_html=True)
 
 
-def process_and_display_pasted_or_uploaded(df_plantilla, df_laliga, cutoff):
+def process_and_display_pasted_or_uploaded(df_plantilla, vista, cutoff):
     """
     Procesa y muestra los resultados para los métodos de pegar o subir archivo.
     """
@@ -160,14 +163,14 @@ def process_and_display_pasted_or_uploaded(df_plantilla, df_laliga, cutoff):
     st.divider()
     st.success(f"✅ Plantilla cargada con **{len(df_plantilla)}** jugadores. Comprueba las coincidencias a continuación:")
     
-    df_encontrados, no_encontrados = emparejar_con_datos(df_plantilla, df_laliga, cutoff)
+    df_encontrados, no_encontrados = emparejar_con_datos(df_plantilla, vista, cutoff)
 
     if not df_encontrados.empty:
         st.dataframe(df_encontrados[['Mi_nombre', 'Posicion', 'Equipo', 'Probabilidad']], use_container_width=True)
 
     if no_encontrados:
         st.warning(f"⚠️ **{len(no_encontrados)} Jugadores no encontrados:** " + ", ".join(sorted(set(no_encontrados))))
-        sugerencias = [f"Para '{n}', ¿quizás quisiste decir **{sug}**?" for n in no_encontrados if (sug := buscar_nombre_mas_cercano(n, df_laliga['Nombre'], 0.5))]
+        sugerencias = [f"Para '{n}', ¿quizás quisiste decir **{sug}**?" for n in no_encontrados if (sug := buscar_nombre_mas_cercano(n, vista, 0.5))]
         if sugerencias: st.info("💡 Sugerencias:\n- " + "\n- ".join(sugerencias))
 
     if df_encontrados.empty and not df_plantilla.empty:
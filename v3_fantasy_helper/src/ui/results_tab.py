@@ -1,17 +1,27 @@
-# LIBRERIAS EXTERNAS (streamlit para UI, pandas para datos, base64 para codificación)
+# LIBRERIAS EXTERNAS (streamlit para UI, pandas para datos, time para la fecha de la última visita)
+import time
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
-import base64
 
 # FUNCIONES INTERNAS
 from src.core import emparejar_con_datos, seleccionar_mejor_xi, buscar_nombre_mas_cercano
-from src.output_generators import generar_pdf_xi, generar_html_alineacion_completa
+from src.optimizer import mejores_xi, barrer_formaciones
+from src.simulacion import riesgo_analitico, simular_alineacion_memoizada, NUM_ESCENARIOS
+from src.output_generators import pdf_alineacion, huella_alineacion, generar_html_alineacion_completa
+from src.imagen_alineacion import generar_png_alineacion
+
+# Número de alineaciones alternativas que se muestran además del XI ideal
+NUM_ALTERNATIVAS = 5
+# Periodo (s) con el que se comparan las probabilidades si no hay una visita anterior registrada
+PERIODO_SIN_VISITA = 24*3600
 
 # FUNCIONES PRINCIPALES DE RENDERIZADO DE LA PESTAÑA DE RESULTADOS
-def render_results_tab(df_plantilla, df_laliga, cutoff, tactica):
+def render_results_tab(df_plantilla, vista, cutoff, tactica, historial=None):
     """
     Renderiza la pestaña "Tu XI Ideal y Banquillo".
+    `vista` es la VistaDatos compartida de los datos de LaLiga y `historial` el
+    histórico de probabilidades (si se pasa, se señalan los jugadores que suben o bajan).
     """
     min_def, max_def, min_cen, max_cen, min_del, max_del, num_por, total = tactica
 
@@ -21,7 +31,7 @@ def render_results_tab(df_plantilla, df_laliga, cutoff, tactica):
 
     if st.button("Calcular mi XI ideal", type="primary", use_container_width=True):
         with st.spinner("Buscando coincidencias y optimizando tu alineación..."):
-            df_encontrados, no_encontrados = emparejar_con_datos(df_plantilla, df_laliga, cutoff)
+            df_encontrados, no_encontrados = emparejar_con_datos(df_plantilla, vista, cutoff)
 
         if df_encontrados.empty:
             st.error("No se pudo emparejar ningún jugador. Revisa los nombres o baja la 'Sensibilidad' en la barra lateral.")
@@ -34,24 +44,27 @@ def render_results_tab(df_plantilla, df_laliga, cutoff, tactica):
                 st.error("No se pudo construir un XI con las restricciones tácticas. Intenta flexibilizar los mínimos/máximos.")
             else:
                 st.session_state.df_xi = pd.DataFrame(xi_lista)
+                st.session_state.version_datos_xi = vista.version
                 st.session_state.banca = df_encontrados[~df_encontrados["Mi_nombre"].isin(st.session_state.df_xi["Mi_nombre"])].sort_values("Probabilidad_num", ascending=False)
                 st.session_state.no_encontrados = no_encontrados
                 st.session_state.df_encontrados = df_encontrados
+                ideal = set(st.session_state.df_xi["Mi_nombre"])
+                alternativas = mejores_xi(df_encontrados, NUM_ALTERNATIVAS + 1, min_def, max_def, min_cen, max_cen, min_del, max_del, num_por, total)
+                st.session_state.alternativas = [s for s in alternativas if {j["Mi_nombre"] for j in s.xi} != ideal][:NUM_ALTERNATIVAS]
+                st.session_state.formaciones = barrer_formaciones(df_encontrados, num_por=num_por, total=total)
 
     if "df_xi" in st.session_state:
         df_xi = st.session_state.df_xi
         banca = st.session_state.banca
         df_encontrados = st.session_state.df_encontrados
+        if st.session_state.get("version_datos_xi", vista.version) != vista.version:
+            st.info("🔄 Las probabilidades se han actualizado desde que calculaste este XI. Pulsa **Calcular mi XI ideal** para recalcularlo con los datos nuevos.")
 
         st.header("Tu XI Ideal Recomendado")
         c1, c2 = st.columns(2)
         c1.metric("Jugadores Encontrados", f"{len(df_encontrados)} / {len(df_plantilla)}")
         c2.metric("Probabilidad Media del XI", f"{df_xi['Probabilidad_num'].mean():.1f}%")
 
-        with st.spinner("Generando enlaces de descarga..."):
-            pdf_bytes = generar_pdf_xi(df_xi)
-            pdf_base64 = base64.b64encode(pdf_bytes).decode("utf-8")
-
         url_app = "https://xi-fantasy.streamlit.app/"
         texto_twitter = f"¡Este es mi XI ideal para la jornada, calculado con el Asistente Fantasy! 🔥 ¿Puedes superarlo? 😏 {url_app} #FantasyLaLiga #LALIGAFANTASY"
         texto_whatsapp = f"¡Este es mi XI ideal para la jornada, calculado con el Asistente Fantasy! 🔥 Échale un ojo: {url_app}"
@@ -68,13 +81,164 @@ def render_results_tab(df_plantilla, df_laliga, cutoff, tactica):
             altura_total = altura_base
 
         components.html(
-            generar_html_alineacion_completa(df_xi, banca, pdf_base64, link_twitter, link_whatsapp),
+            generar_html_alineacion_completa(df_xi, banca, link_twitter, link_whatsapp),
             height=altura_total, 
             scrolling=False
         )
 
+        render_descargas(df_xi, banca)
+
+        render_riesgo(df_xi, banca)
+
+        if historial is not None:
+            render_tendencias(df_encontrados, df_xi, historial, st.session_state.get("ultima_visita"))
+
+        if st.session_state.get("formaciones"):
+            render_formaciones(df_xi, st.session_state.formaciones)
+
+        if st.session_state.get("alternativas"):
+            render_alternativas(df_xi, st.session_state.alternativas)
+
         if st.session_state.no_encontrados:
             with st.expander("⚠️ Algunos jugadores no fueron encontrados", expanded=True):
                 st.warning("No se encontraron coincidencias para: " + ", ".join(sorted(set(st.session_state.no_encontrados))))
-                sugerencias = [f"Para '{n}', ¿quizás quisiste decir **{sug}**?" for n in st.session_state.no_encontrados if (sug := buscar_nombre_mas_cercano(n, df_laliga['Nombre'], 0.5))]
-                if sugerencias: st.info("💡 Sugerencias:\n- " + "\n- ".join(sugerencias))
\ No newline at end of file
+                sugerencias = [f"Para '{n}', ¿quizás quisiste decir **{sug}**?" for n in st.session_state.no_encontrados if (sug := buscar_nombre_mas_cercano(n, vista, 0.5))]
+                if sugerencias: st.info("💡 Sugerencias:\n- " + "\n- ".join(sugerencias))
+
+
+def render_descargas(df_xi, banca):
+    """
+    Descargas del XI bajo demanda: el PDF y la imagen PNG para compartir solo se
+    generan cuando el usuario pulsa "Preparar" (y quedan en caché por huella de la
+    alineación), en lugar de incrustarlos en el HTML del campo en cada recarga.
+    """
+    huella = huella_alineacion(df_xi, banca)
+    c1, c2 = st.columns(2)
+    with c1:
+        if _preparado("pdf_preparado", huella, "📄 Preparar PDF"):
+            st.download_button("⬇️ Descargar XI en PDF", data=pdf_alineacion(df_xi), file_name="fantasy_xi.pdf",
+                               mime="application/pdf", use_container_width=True)
+    with c2:
+        if _preparado("imagen_preparada", huella, "🖼️ Preparar imagen para compartir"):
+            with st.spinner("Dibujando tu alineación..."):
+                png = generar_png_alineacion(df_xi, banca)
+            st.download_button("⬇️ Descargar imagen (PNG)", data=png, file_name="fantasy_xi.png",
+                               mime="image/png", use_container_width=True)
+
+
+# Muestra el botón "Preparar" hasta que el usuario lo pulsa para la alineación actual; después devuelve True
+def _preparado(clave, huella, etiqueta):
+    if st.session_state.get(clave) == huella: return True
+    if st.button(etiqueta, use_container_width=True):
+        st.session_state[clave] = huella
+        st.rerun()
+    return False
+
+
+def render_formaciones(df_xi, formaciones):
+    """
+    Compara el mejor XI de cada formación habitual con tu plantilla y destaca la
+    mejor, para no tener que ir cambiando la táctica y recalculando.
+    """
+    mejor = formaciones[0]
+    actual = df_xi["Probabilidad_num"].sum()
+    cuenta = df_xi["Posicion"].value_counts()
+    tuya = f"{cuenta.get('DEF', 0)}-{cuenta.get('CEN', 0)}-{cuenta.get('DEL', 0)}"
+    with st.expander("📊 Comparativa de formaciones"):
+        if mejor.puntuacion > actual + 1e-9:
+            st.info(f"💡 La mejor formación para tu plantilla es **{mejor.formacion}**: "
+                    f"{mejor.puntuacion / len(mejor.xi):.1f}% de probabilidad media (+{(mejor.puntuacion - actual) / len(df_xi):.1f} puntos sobre tu XI en {tuya}).")
+        elif actual > mejor.puntuacion + 1e-9:
+            st.success(f"✅ Tu XI en **{tuya}** supera a todas las formaciones habituales.")
+        elif tuya == mejor.formacion:
+            st.success(f"✅ Tu táctica ya consigue el mejor XI posible (**{tuya}**).")
+        else:
+            st.success(f"✅ Tu XI en **{tuya}** empata con la mejor formación habitual (**{mejor.formacion}**): no ganas nada cambiando de táctica.")
+        filas = [{
+            "Formación": solucion.formacion + (" (tu XI)" if solucion.formacion == tuya else ""),
+            "Prob. media": f"{solucion.puntuacion / len(solucion.xi):.1f}%",
+            "Diferencia": f"{(solucion.puntuacion - mejor.puntuacion) / len(solucion.xi):+.1f}",
+        } for solucion in formaciones]
+        st.dataframe(pd.DataFrame(filas), hide_index=True, use_container_width=True)
+
+
+def render_alternativas(df_xi, alternativas):
+    """
+    Muestra las siguientes mejores alineaciones (formación, probabilidad media y
+    cambios respecto al XI ideal) para responder a "¿y si X no juega?".
+    """
+    ideal = set(df_xi["Mi_nombre"])
+    filas = []
+    for i, solucion in enumerate(alternativas, start=2):
+        nombres = {j["Mi_nombre"] for j in solucion.xi}
+        filas.append({
+            "Opción": i,
+            "Formación": solucion.formacion,
+            "Prob. media": f"{solucion.puntuacion / len(solucion.xi):.1f}%",
+            "Entran": ", ".join(sorted(nombres - ideal)),
+            "Salen": ", ".join(sorted(ideal - nombres)),
+        })
+    with st.expander("🔁 Alineaciones alternativas"):
+        st.dataframe(pd.DataFrame(filas), hide_index=True, use_container_width=True)
+
+
+def render_riesgo(df_xi, banca):
+    """
+    Muestra el riesgo de la alineación: titulares esperados, probabilidad de
+    alinear 11 contando con los cambios automáticos desde el banquillo y la
+    distribución de jugadores alineados. El cálculo exacto es instantáneo; la
+    simulación Monte Carlo se ofrece como contraste y se guarda por huella de la
+    alineación, de modo que los reruns no vuelven a simular.
+    """
+    with st.expander("🎲 Riesgo de la alineación"):
+        riesgo = riesgo_analitico(df_xi, banca)
+        if st.checkbox(f"Simular {NUM_ESCENARIOS:,} jornadas (Monte Carlo)".replace(",", "."), key="simular_riesgo"):
+            riesgo = simular_alineacion_memoizada(df_xi, banca)
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Titulares esperados", f"{riesgo['titulares_esperados']:.2f} / {len(df_xi)}")
+        c2.metric("Alineados con suplentes", f"{riesgo['alineados_esperados']:.2f} / {len(df_xi)}")
+        c3.metric("Prob. de alinear 11", f"{riesgo['prob_xi_completo'] * 100:.1f}%")
+        distribucion = pd.DataFrame({"Jugadores alineados": range(len(riesgo["distribucion"])), "Probabilidad": riesgo["distribucion"]})
+        st.bar_chart(distribucion[distribucion["Probabilidad"] > 0.0005], x="Jugadores alineados", y="Probabilidad")
+
+
+# Texto de un momento pasado relativo a ahora (ej: 'hace 3 h', 'hace 2 días')
+def _texto_hace(momento):
+    segundos = max(time.time() - momento, 0)
+    if segundos < 3600: return f"hace {int(segundos // 60)} min"
+    if segundos < 48*3600: return f"hace {int(segundos // 3600)} h"
+    return f"hace {int(segundos // 86400)} días"
+
+
+def render_tendencias(df_encontrados, df_xi, historial, ultima_visita=None):
+    """
+    Señala los jugadores de tu plantilla cuya probabilidad ha subido o bajado desde
+    tu última visita (o en las últimas 24 h), con su evolución en un minigráfico.
+    Las consultas van al histórico de cambios, sin releer snapshots completos.
+    """
+    desde = ultima_visita or time.time() - PERIODO_SIN_VISITA
+    cambios = df_encontrados[["Mi_nombre", "Nombre_web", "Equipo"]].merge(
+        historial.cambios_desde(desde), left_on=["Nombre_web", "Equipo"], right_on=["Nombre", "Equipo"])
+    bajan_xi = cambios[(cambios["Cambio"] < 0) & cambios["Mi_nombre"].isin(df_xi["Mi_nombre"])]
+    periodo = f"desde tu última visita ({_texto_hace(desde)})" if ultima_visita else "en las últimas 24 h"
+
+    with st.expander(f"📈 Cambios de probabilidad {periodo}", expanded=not bajan_xi.empty):
+        if cambios.empty:
+            st.caption("Ningún jugador de tu plantilla ha cambiado de probabilidad en este periodo.")
+            return
+        if not bajan_xi.empty:
+            st.warning("⚠️ Bajan en tu XI: " + ", ".join(
+                f"**{fila.Mi_nombre}** ({fila.Antes}% → {fila.Ahora}%)" for fila in bajan_xi.sort_values("Cambio").itertuples()))
+        cambios = cambios.sort_values(["Cambio", "Mi_nombre"], kind="stable")
+        series = historial.sparklines(zip(cambios["Nombre_web"], cambios["Equipo"]), desde=desde)
+        filas = pd.DataFrame({
+            "Jugador": cambios["Mi_nombre"],
+            "Equipo": cambios["Equipo"],
+            "Antes": cambios["Antes"].astype(str) + "%",
+            "Ahora": cambios["Ahora"].astype(str) + "%",
+            "Cambio": [f"{'🔺' if c > 0 else '🔻'} {c:+d}" for c in cambios["Cambio"]],
+            "Evolución": [series[clave] for clave in zip(cambios["Nombre_web"], cambios["Equipo"])],
+        })
+        st.dataframe(filas, hide_index=True, use_container_width=True, column_config={
+            "Evolución": st.column_config.LineChartColumn("Evolución", y_min=0, y_max=100),
+        })
@@ -1,6 +1,30 @@
 # LIBRERIAS EXTERNAS (streamlit para UI)
 import streamlit as st
 
+# FUNCIONES INTERNAS
+from src.scraper import estado_datos
+
+
+# Convierte una antigüedad en segundos a un texto legible (ej: 'hace 3 min')
+def _texto_antiguedad(segundos):
+    if segundos is None: return "sin datos"
+    if segundos < 60: return "hace menos de 1 min"
+    if segundos < 3600: return f"hace {int(segundos // 60)} min"
+    return f"hace {segundos / 3600:.1f} h"
+
+
+def render_estado_datos():
+    """
+    Muestra la antigüedad de los datos de LaLiga y los equipos que no se han
+    podido refrescar en el último intento.
+    """
+    estado = estado_datos()
+    st.caption(f"🕒 Datos actualizados {_texto_antiguedad(estado['antiguedad_min'])} "
+               f"(el equipo más antiguo, {_texto_antiguedad(estado['antiguedad_max'])}) · "
+               f"{estado['equipos_con_datos']}/{estado['equipos_totales']} equipos")
+    if estado["equipos_con_error"]:
+        st.caption("⚠️ Sin refrescar: " + ", ".join(sorted(estado["equipos_con_error"])))
+
 def render_sidebar(df_laliga):
     """
     Renderiza la barra lateral de configuración y devuelve los parámetros
@@ -40,6 +64,7 @@ def render_sidebar(df_laliga):
         num_por, total = 1, 11
 
         with st.expander("Ver todos los datos de LaLiga"):
+            render_estado_datos()
             st.caption(f"Datos cargados: {len(df_laliga)} registros únicos.")
             st.dataframe(df_laliga, use_container_width=True)
             
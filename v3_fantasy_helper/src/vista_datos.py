@@ -0,0 +1,37 @@
+# LIBRERIAS EXTERNAS (pandas para el DataFrame de origen, hashlib para la versión del dataset)
+import hashlib
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from .name_index import indice_nombres
+from .esquema import expandir_dataframe
+
+
+class VistaDatos:
+    """
+    Vista derivada de un DataFrame de LaLiga que se construye una sola vez por
+    scrape y se comparte entre sesiones: registros por nombre (primera aparición),
+    lista ordenada de nombres, el índice de búsqueda aproximada y una versión
+    (huella del contenido, clave de los emparejamientos memoizados en src.core).
+    La interfaz y el núcleo la consultan en lugar de recalcular todo esto en cada
+    recarga, de modo que el coste por rerun no crece con el tamaño del dataset.
+    El DataFrame de origen puede estar en el esquema compacto (src.esquema): los
+    registros se expanden al formato clásico una sola vez al construir la vista.
+    El DataFrame de origen no debe modificarse en el sitio.
+    """
+    def __init__(self, df):
+        self.df = df
+        self.datos = expandir_dataframe(df.drop_duplicates(subset=["Nombre"], keep="first")) if "Nombre" in df.columns else df
+        self.registros = self.datos.set_index("Nombre").to_dict("index") if "Nombre" in df.columns else {}
+        self.exactos = set(self.registros)
+        self.nombres = sorted(n for n in self.registros if isinstance(n, str))
+        self.indice = indice_nombres(df["Nombre"]) if self.nombres else None
+        self.version = hashlib.blake2b(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes(), digest_size=8).hexdigest()
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def empty(self):
+        return self.df.empty
+
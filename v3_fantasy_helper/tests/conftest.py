@@ -0,0 +1,4 @@
+# Permite importar src y benchmarks al ejecutar pytest desde cualquier directorio
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+# LIBRERIAS EXTERNAS
+import pytest
+
+# LIBRERIAS INTERNAS
+from src import scraper
+from src.scraper import CacheEquipos
+
+URLS = {"Equipo A": "http://local/equipo-a", "Equipo B": "http://local/equipo-b"}
+JUGADOR = ("<div class='jugador'><img data-src='https://static.local/{0}.jpg'><a href='/jugadores/{0}'>"
+           "<span class='nombre'>{0}</span></a><span class='probabilidad'>{1}%</span></div>")
+PAGINA_A = JUGADOR.format("Ana", 80)
+PAGINA_B = JUGADOR.format("Bea", 60)
+
+
+class Respuesta:
+    def __init__(self, texto):
+        self.status_code, self.text, self.content, self.headers = 200, texto, texto.encode("utf-8"), {}
+
+
+# Sustituye la descarga por páginas fijas ({equipo: html}); cambiarlas simula un nuevo contenido en la web
+@pytest.fixture
+def paginas(monkeypatch):
+    paginas = {"Equipo A": PAGINA_A, "Equipo B": PAGINA_B}
+    monkeypatch.setattr(scraper, "descargar_paginas",
+                        lambda urls, **kw: ({e: Respuesta(paginas[e]) for e in urls}, {}))
+    return paginas
+
+
+def test_pagina_sin_jugadores_conserva_las_filas_buenas(paginas):
+    cache = CacheEquipos(URLS, backoff_base=30)
+    assert cache.refresh_teams() == {}
+    paginas["Equipo A"] = "<html><body>Mantenimiento</body></html>"
+
+    errores = cache.refresh_teams()
+
+    assert set(errores) == {"Equipo A"}
+    assert sorted(cache.dataframe()["Nombre"]) == ["Ana", "Bea"]
+    estado = cache.estado("Equipo A")
+    assert estado.fallos == 1 and estado.reintentar_desde > 0 and estado.ultimo_error
+    assert cache.estado("Equipo B").fallos == 0
+
+
+def test_error_del_parser_no_corta_el_refresco(paginas, monkeypatch):
+    cache = CacheEquipos(URLS)
+    cache.refresh_teams()
+    paginas["Equipo A"], paginas["Equipo B"] = PAGINA_A + " ", PAGINA_B.replace("Bea", "Berta")
+    original = scraper.parsear_equipo
+
+    def parsear(html, equipo, motor=None):
+        if equipo == "Equipo A": raise ValueError("marcado inesperado")
+        return original(html, equipo, motor)
+    monkeypatch.setattr(scraper, "parsear_equipo", parsear)
+
+    errores = cache.refresh_teams()
+
+    assert set(errores) == {"Equipo A"} and "marcado inesperado" in errores["Equipo A"]
+    assert sorted(cache.dataframe()["Nombre"]) == ["Ana", "Berta"]
+    assert cache.estado("Equipo A").fallos == 1 and cache.estado("Equipo B").fallos == 0
@@ -0,0 +1,21 @@
+# LIBRERIAS EXTERNAS
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from src.data_utils import con_posiciones_normalizadas, marcar_normalizado, esta_normalizado
+
+
+def test_marca_normalizado_se_reutiliza_sin_copiar():
+    df = marcar_normalizado(pd.DataFrame({"Mi_nombre": ["A", "B"], "Posicion": ["POR", None]}))
+    assert con_posiciones_normalizadas(df) is df
+
+
+def test_derivado_con_alias_sin_normalizar_se_vuelve_a_normalizar():
+    df = marcar_normalizado(pd.DataFrame({"Mi_nombre": ["A", "B"], "Posicion": ["POR", "DEF"]}))
+    # pandas copia df.attrs (y con ellos la marca) al DataFrame derivado, aunque su Posicion traiga alias
+    derivado = df[df["Mi_nombre"] != "X"].copy()
+    derivado.loc[1, "Posicion"] = "mc "
+    assert derivado.attrs and not esta_normalizado(derivado)
+    assert con_posiciones_normalizadas(derivado)["Posicion"].tolist() == ["POR", "CEN"]
+    asignado = df.assign(Posicion=["GK", "DF"])
+    assert con_posiciones_normalizadas(asignado)["Posicion"].tolist() == ["POR", "DEF"]
@@ -0,0 +1,12 @@
+# LIBRERIAS EXTERNAS
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from src.esquema import compactar_dataframe, expandir_dataframe
+
+
+def test_ida_y_vuelta_con_una_columna_de_urls_sin_ninguna_url():
+    df = pd.DataFrame({"Equipo": ["A", "B"], "Nombre": ["Ana", "Bea"], "Probabilidad": ["50%", "60%"],
+                       "Imagen_URL": [None, None], "Perfil_URL": ["https://web/jugadores/ana", None],
+                       "Probabilidad_num": [50.0, 60.0]})
+    pd.testing.assert_frame_equal(expandir_dataframe(compactar_dataframe(df)), df)
@@ -0,0 +1,49 @@
+# LIBRERIAS EXTERNAS
+import pytest
+
+# LIBRERIAS INTERNAS
+from src.html_parsers import MOTORES
+from src.scraper import parsear_equipo
+from benchmarks.bench_parser import PAGINA_CASOS_LIMITE, cargar_paginas_reales
+from benchmarks.servidor_local import cargar_paginas
+from benchmarks.fixtures.generar_fixtures import DIR_REALES
+
+SINTETICAS = {slug: html.decode("utf-8") for slug, html in cargar_paginas().items()}
+REALES = cargar_paginas_reales()
+
+
+# Mismas filas y en el mismo orden con los dos motores (el de BeautifulSoup es la referencia)
+def comprobar_equivalencia(html, equipo):
+    referencia = MOTORES["bs4"](html, equipo)
+    obtenido = MOTORES["lxml"](html, equipo)
+    assert obtenido == referencia, ([f for f in referencia if f not in obtenido], [f for f in obtenido if f not in referencia])
+    return referencia
+
+
+def test_equivalencia_en_la_pagina_de_casos_limite():
+    filas = comprobar_equivalencia(PAGINA_CASOS_LIMITE, "Casos límite")
+    assert [f["Nombre"] for f in filas] == ["Nombre Secundario", "PepeReina", "Ana Gómez 55% perfil x", "Dentro De Media Body",
+                                            "Luis", "Kanji Prueba 5 %", "Anidado", "Anidado"]
+
+
+@pytest.mark.parametrize("slug", sorted(SINTETICAS))
+def test_equivalencia_en_las_paginas_sinteticas(slug):
+    assert comprobar_equivalencia(SINTETICAS[slug], slug)
+
+
+# Las páginas reales se graban con `python -m benchmarks.bench_parser --grabar`; sin ellas la prueba se omite
+@pytest.mark.parametrize("slug", sorted(REALES) or [pytest.param(None, marks=pytest.mark.skip(
+    reason=f"no hay páginas reales grabadas en {DIR_REALES}"))])
+def test_equivalencia_en_las_paginas_reales(slug):
+    assert comprobar_equivalencia(REALES[slug], slug), f"{slug}: BeautifulSoup no extrae ningún jugador"
+
+
+def test_parsear_equipo_recurre_a_bs4_si_lxml_no_extrae_jugadores(monkeypatch):
+    monkeypatch.setitem(MOTORES, "lxml", lambda html, equipo: [])
+    assert parsear_equipo(PAGINA_CASOS_LIMITE, "Casos límite", motor="lxml") == MOTORES["bs4"](PAGINA_CASOS_LIMITE, "Casos límite")
+
+
+def test_parsear_equipo_recurre_a_bs4_si_lxml_falla(monkeypatch):
+    def fallo(html, equipo): raise ValueError("marcado inesperado")
+    monkeypatch.setitem(MOTORES, "lxml", fallo)
+    assert parsear_equipo(PAGINA_CASOS_LIMITE, "Casos límite", motor="lxml") == MOTORES["bs4"](PAGINA_CASOS_LIMITE, "Casos límite")
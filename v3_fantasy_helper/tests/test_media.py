@@ -0,0 +1,52 @@
+# LIBRERIAS EXTERNAS
+import threading
+import pytest
+
+# LIBRERIAS INTERNAS
+from src import media
+from src.media import AlmacenMiniaturas
+
+
+# Almacén en un directorio temporal cuya "descarga" devuelve bytes fijos; `bloqueo` retiene las descargas hasta que se
+# libera (simula una tanda de precarga en curso)
+@pytest.fixture
+def almacen(tmp_path, monkeypatch):
+    almacen = AlmacenMiniaturas(directorio=str(tmp_path))
+    almacen.bloqueo = threading.Event()
+    almacen.descargadas = []
+
+    def descargar(url):
+        almacen.bloqueo.wait(5)
+        almacen.descargadas.append(url)
+        return url.encode()
+    monkeypatch.setattr(almacen, "_descargar", descargar)
+    monkeypatch.setattr(media, "_ALMACEN", almacen)
+    monkeypatch.setattr(media, "_PENDIENTES", {})
+    monkeypatch.setattr(media, "_PRECARGA", None)
+    return almacen
+
+
+def test_precargar_con_una_tanda_en_curso_no_pierde_urls(almacen):
+    hilo = media.precargar(["http://fotos/1.jpg"])
+    # Mientras la primera tanda está bloqueada llegan más fotos: se encargan al mismo hilo
+    assert media.precargar(["http://fotos/2.jpg"]) is hilo
+    assert media.src_imagen("http://fotos/3.jpg") == "http://fotos/3.jpg"
+    almacen.bloqueo.set()
+    hilo.join(5)
+    assert sorted(almacen.descargadas) == ["http://fotos/1.jpg", "http://fotos/2.jpg", "http://fotos/3.jpg"]
+    assert media.src_imagen("http://fotos/3.jpg").startswith("data:")
+    assert media._PRECARGA is None and not media._PENDIENTES
+
+
+def test_acierto_en_memoria_sin_cambio_de_uso_no_ensucia_el_indice(almacen):
+    almacen.bloqueo.set()
+    almacen.obtener_varias(["http://fotos/1.jpg"])
+    assert not almacen._indice_sucio
+    # Sin entrada en el índice y con un uso reciente, servir la foto desde memoria no obliga a reescribir el índice
+    almacen._memoria["http://fotos/sin-indice.jpg"] = b"x"
+    almacen.local("http://fotos/sin-indice.jpg")
+    almacen.local("http://fotos/1.jpg")
+    assert not almacen._indice_sucio
+    almacen._indice["http://fotos/1.jpg"]["usado"] -= media.RESOLUCION_USO
+    almacen.local("http://fotos/1.jpg")
+    assert almacen._indice_sucio
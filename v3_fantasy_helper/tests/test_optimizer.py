@@ -0,0 +1,44 @@
+# LIBRERIAS EXTERNAS
+import random
+import pandas as pd
+import pytest
+
+# LIBRERIAS INTERNAS
+from src.core import seleccionar_mejor_xi
+from src.data_utils import normaliza_pos
+from src.optimizer import mejores_xi, resolver_xi
+from benchmarks.bench_optimizer import plantilla_sintetica
+
+TACTICAS = [(3, 5, 3, 5, 1, 3, 1, 11), (4, 4, 3, 5, 1, 3, 1, 11), (3, 5, 2, 6, 1, 3, 1, 11)]
+
+
+# Selección voraz original (antes del optimizador exacto), como referencia del XI y de su desempate
+def seleccion_original(df, min_def=3, max_def=5, min_cen=3, max_cen=5, min_del=1, max_del=3, num_por=1, total=11):
+    df = df.copy()
+    df["Posicion"] = df["Posicion"].apply(normaliza_pos)
+    df = df.dropna(subset=["Posicion", "Probabilidad_num"])
+    por, defn, cen, deln = (df[df["Posicion"] == p].sort_values("Probabilidad_num", ascending=False) for p in ("POR", "DEF", "CEN", "DEL"))
+    eleccion = []
+    for grupo, minimo in ((por, num_por), (defn, min_def), (cen, min_cen), (deln, min_del)):
+        eleccion.extend(grupo.head(minimo).to_dict("records"))
+    restos = pd.concat([defn.iloc[min_def:max_def], cen.iloc[min_cen:max_cen], deln.iloc[min_del:max_del]]).sort_values("Probabilidad_num", ascending=False)
+    eleccion.extend(restos.head(total - len(eleccion)).to_dict("records"))
+    orden_pos = {"POR": 0, "DEF": 1, "CEN": 2, "DEL": 3}
+    return sorted(eleccion, key=lambda x: orden_pos.get(x.get("Posicion", ""), 99))[:total]
+
+
+@pytest.mark.parametrize("tactica", TACTICAS)
+def test_mismo_xi_que_la_seleccion_original_tambien_en_empates(tactica):
+    for semilla in range(300):
+        # Probabilidades en pasos de 5 puntos: hay empates en casi todas las plantillas
+        df = plantilla_sintetica(random.Random(semilla).randint(15, 30), semilla)
+        xi, error = seleccionar_mejor_xi(df, *tactica)
+        assert error is None
+        assert [j["Mi_nombre"] for j in xi] == [j["Mi_nombre"] for j in seleccion_original(df, *tactica)], semilla
+
+
+def test_mejores_xi_empieza_por_la_puntuacion_del_ideal():
+    for semilla in range(100):
+        df = plantilla_sintetica(20, semilla)
+        solucion, _ = resolver_xi(df)
+        assert mejores_xi(df, k=1)[0].puntuacion == pytest.approx(solucion.puntuacion), semilla
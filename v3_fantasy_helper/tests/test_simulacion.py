@@ -0,0 +1,30 @@
+# LIBRERIAS EXTERNAS
+import pandas as pd
+
+# LIBRERIAS INTERNAS
+from src import simulacion
+from src.optimizer import resolver_xi
+from benchmarks.bench_optimizer import plantilla_sintetica
+
+
+# XI ideal y banquillo de una plantilla sintética
+def alineacion(semilla):
+    df = plantilla_sintetica(22, semilla)
+    xi = pd.DataFrame(resolver_xi(df)[0].xi)
+    return xi, df[~df["Mi_nombre"].isin(xi["Mi_nombre"])]
+
+
+def test_simulacion_memoizada_no_vuelve_a_simular(monkeypatch):
+    simulacion._CACHE_SIMULACION.clear()
+    llamadas = []
+    original = simulacion.simular_alineacion
+    monkeypatch.setattr(simulacion, "simular_alineacion", lambda *args: llamadas.append(args) or original(*args))
+    xi, banca = alineacion(1)
+    primero = simulacion.simular_alineacion_memoizada(xi, banca, num_escenarios=1_000)
+    # Un rerun reconstruye los DataFrames con el mismo contenido: mismo resultado sin simular otra vez
+    assert simulacion.simular_alineacion_memoizada(xi.copy(), banca.copy(), num_escenarios=1_000) is primero
+    assert len(llamadas) == 1
+    # Otros parámetros u otra alineación sí vuelven a simular
+    simulacion.simular_alineacion_memoizada(xi, banca, num_escenarios=2_000)
+    simulacion.simular_alineacion_memoizada(*alineacion(2), num_escenarios=1_000)
+    assert len(llamadas) == 3
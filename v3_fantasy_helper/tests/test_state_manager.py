@@ -0,0 +1,52 @@
+# LIBRERIAS EXTERNAS
+import pytest
+
+# LIBRERIAS INTERNAS
+from src import state_manager
+
+
+class EstadoSesion(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+# Imita streamlit_local_storage.LocalStorage: `items` es lo que ya ha llegado del navegador ({} hasta que responde)
+class LocalStorageFalso:
+    def __init__(self, items):
+        self.items, self.escrituras = items, []
+
+    def getItem(self, clave): return self.items.get(clave)
+    def getAll(self): return self.items
+
+    def setItem(self, clave, valor, key="set"):
+        self.escrituras.append((clave, valor))
+        self.items[clave] = valor
+
+
+@pytest.fixture
+def sesion(monkeypatch):
+    sesion = EstadoSesion()
+    monkeypatch.setattr(state_manager.st, "session_state", sesion)
+    return sesion
+
+
+def test_no_se_sobrescribe_la_visita_antes_de_leerla(sesion):
+    navegador = {"fantasy_ultima_visita": "1000.0", "fantasy_plantilla": "[]"}
+    local = LocalStorageFalso({})
+    # Primera ejecución: el componente aún no ha respondido
+    state_manager.registrar_visita(local)
+    assert "ultima_visita" not in sesion and local.escrituras == []
+    # Rerun con la respuesta del navegador: se lee la visita anterior y solo entonces se anota la actual
+    local.items.update(navegador)
+    state_manager.registrar_visita(local)
+    assert sesion.ultima_visita == 1000.0 and [c for c, _ in local.escrituras] == ["fantasy_ultima_visita"]
+
+
+def test_sin_visita_anterior_se_anota_la_actual_tras_el_primer_rerun(sesion):
+    local = LocalStorageFalso({})
+    state_manager.registrar_visita(local)
+    assert local.escrituras == []
+    state_manager.registrar_visita(local)
+    assert sesion.ultima_visita is None and [c for c, _ in local.escrituras] == ["fantasy_ultima_visita"]
+    state_manager.registrar_visita(local)
+    assert len(local.escrituras) == 1